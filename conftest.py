@@ -10,15 +10,31 @@
 import sys
 import os
 import pytest
-import allure
 import logging
+import sqlite3
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException
 from utils.config_manager import ConfigManager
+from utils.log_manager import LogManager
+from utils.session_cache import SessionCache
+from utils.driver_pool import DriverPool
+from utils.process_reaper import ProcessReaper, service_popen_kwargs
+from utils.browser_cache import BrowserCache
+from utils.profile_template import ProfileTemplate
+from utils.api_client import CmsApiClient
+from utils.data_seeder import DataSeeder, with_unique_names
+from utils.entity_registry import EntityRegistry
+from utils.screenshot_manager import screenshot
+from utils.test_durations import DurationHistory, split_group
+from utils.test_dependencies import chain_groups, order_items, resolve_dependencies
+from utils.run_history import RunHistory, StepTimer
+from utils.page_performance import PerformanceRecorder
+from utils.api_cassette import Cassette, FetchInterceptor, cassette_path
+from data.test_data import GIFT_TEST_DATA
 from page_objects.login_page import LoginPage
 
 # 确保项目根目录被正确添加到 PYTHONPATH
@@ -28,15 +44,11 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 for dir_path in ['logs', 'screenshots', 'reports/allure-results']:
     Path(dir_path).mkdir(parents=True, exist_ok=True)
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'logs/test_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# 配置日志：与 LogManager 共用同一条异步日志管道
+log_manager = LogManager.get_instance()
+
+# 注册 allure 步骤计时
+StepTimer.get_instance()
 
 def pytest_addoption(parser):
     """添加命令行参数"""
@@ -48,25 +60,227 @@ def pytest_addoption(parser):
                     help="是否使用无头模式: True, False")
     parser.addoption("--fast-close", action="store", default="False",
                     help="是否启用快速关闭模式: True, False")
+    parser.addoption("--shard", action="store", default=None,
+                    help="按历史耗时分片，只运行第 i 片: i/N")
+    parser.addoption("--balance", action="store_true", default=False,
+                    help="按历史耗时用 LPT 装箱把用例分配到 xdist worker(配合 -n 使用)")
+    parser.addoption("--cassette", action="store", default=None, choices=["off", "record", "replay"],
+                    help="接口录制回放: record 录制页面的 XHR/fetch 响应到每个用例的录制文件，replay 从录制文件回放；"
+                         "页面、脚本与会话级登录仍访问真实环境，回放不能离线运行")
+
+def pytest_unconfigure(config):
+    """xdist 主进程在所有 worker 结束后合并各 worker 的日志"""
+    if not hasattr(config, "workerinput"):
+        log_manager.merge_worker_logs()
+
+# 本次运行各用例的耗时(setup+call+teardown)，会话结束时写入耗时历史
+_test_durations = {}
+# 本次运行各用例的结果与耗时 {nodeid: [结果, 秒]}，会话结束时写入 SQLite 运行历史
+_test_results = {}
+_session_started_at = None
+
+def duration_history():
+    """用例耗时历史"""
+    path = ConfigManager.get_instance().get_test_config().get("durations_file", "reports/test_durations.json")
+    return DurationHistory(path)
+
+# 用例的前置用例、所属依赖链与是否通过，存放在 item.stash 中
+# （Item 按 nodeid 计算哈希，xdist loadgroup 会给 nodeid 加后缀，不能作为字典的键）
+PREREQUISITES_KEY = pytest.StashKey[list]()
+CHAIN_KEY = pytest.StashKey[str]()
+PASSED_KEY = pytest.StashKey[bool]()
+
+def pytest_configure(config):
+    """并行运行时让同一依赖链的用例在同一个 worker 上执行"""
+    if hasattr(config, "workerinput"):
+        # worker 重新解析命令行参数，由主进程通过 workerinput 告知是否按 xdist_group 分组
+        if config.workerinput.get("cms_loadgroup"):
+            config.option.loadgroup = True
+        return
+    if not config.getoption("numprocesses", None):
+        return
+    if config.getoption("--balance"):
+        # 让 xdist 为依赖链用例的 nodeid 加上 "@链名" 后缀，LptScheduling 按链整体装箱
+        config.option.loadgroup = True
+    elif config.getoption("dist", None) == "load":
+        logging.info("并行模式切换为 --dist loadgroup，依赖链在同一 worker 上执行")
+        config.option.dist = "loadgroup"
+        config.option.loadgroup = True
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """把分组设置传给 xdist worker"""
+    node.workerinput["cms_loadgroup"] = bool(getattr(node.config.option, "loadgroup", False))
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    收集完成后：
+    1. 按 depends_on 标记把前置用例排在前面，并给依赖链打上 xdist_group 标记
+    2. --shard i/N：按历史耗时 LPT 装箱，只保留第 i 片（在 -m/-k 过滤之后执行，各分片划分一致，依赖链不拆开）
+    """
+    dependencies = resolve_dependencies(items)
+    if dependencies:
+        try:
+            items[:] = order_items(items, dependencies)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+        for item, prerequisites in dependencies.items():
+            item.stash[PREREQUISITES_KEY] = prerequisites
+        for item, chain in chain_groups(items, dependencies).items():
+            item.stash[CHAIN_KEY] = chain
+            if config.pluginmanager.hasplugin("xdist"):
+                item.add_marker(pytest.mark.xdist_group(chain))
+
+    yield
+
+    shard = DurationHistory.parse_shard(config.getoption("--shard"))
+    if not shard:
+        return
+    index, total = shard
+    groups = {item.nodeid: item.stash[CHAIN_KEY] for item in items if CHAIN_KEY in item.stash}
+    selected = set(duration_history().partition([item.nodeid for item in items], total, groups)[index - 1])
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
+    logging.info(f"分片 {index}/{total}: 运行 {len(items)} 个用例")
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """
+    前置用例未通过时直接跳过依赖它的用例，不再等待界面超时
+    pytest-rerunfailures 重跑时丢弃之前各次执行的步骤耗时；filmstrip.on_rerun 时为重跑的用例记录失败前的缩略帧
+    """
+    if getattr(item, "execution_count", 1) > 1:
+        StepTimer.get_instance().discard(split_group(item.nodeid)[0])
+        if screenshot.frames_on_rerun:
+            screenshot.enable_frames(item.nodeid)
+    for prerequisite in item.stash.get(PREREQUISITES_KEY, []):
+        if prerequisite.stash.get(PASSED_KEY, None) is False:
+            pytest.skip(f"前置用例 {prerequisite.name} 未通过")
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """--balance：使用按历史耗时分组的调度器"""
+    if config.getoption("--balance"):
+        from utils.xdist_scheduling import LptScheduling
+        return LptScheduling(config, log, history=duration_history())
+    return None
+
+def pytest_runtest_logreport(report):
+    """
+    累计用例耗时（xdist 下由主进程统一记录，去掉 loadgroup 的 "@分组" 后缀）
+    pytest-rerunfailures 重跑时每次都从 setup 开始，只保留最后一次执行的结果与耗时
+    """
+    test_id = split_group(report.nodeid)[0]
+    if report.when == "setup":
+        _test_results.pop(test_id, None)
+        _test_durations.pop(test_id, None)
+    result = _test_results.setdefault(test_id, ["passed", 0.0])
+    result[1] += report.duration
+    if report.failed:
+        result[0] = "failed"
+    elif report.skipped and result[0] != "failed":
+        result[0] = "skipped"
+    if report.skipped:
+        _test_durations[test_id] = None
+    elif _test_durations.get(test_id, 0) is not None:
+        _test_durations[test_id] = _test_durations.get(test_id, 0) + report.duration
+
+def save_test_durations(pytest_config):
+    """把本次运行的用例耗时写入历史，跳过的用例不记录"""
+    if hasattr(pytest_config, "workerinput"):
+        return
+    durations = {test_id: seconds for test_id, seconds in _test_durations.items() if seconds is not None}
+    if not durations:
+        return
+    history = duration_history()
+    for test_id, seconds in durations.items():
+        history.record(test_id, seconds)
+    try:
+        history.save()
+    except OSError as e:
+        logging.warning(f"保存用例耗时历史失败: {str(e)}")
+
+def save_run_history(session, exitstatus):
+    """
+    写入 SQLite 运行历史：主进程(或非并行模式)写运行与用例结果，执行用例的进程(worker)写步骤耗时
+    """
+    pytest_config = session.config
+    history_config = ConfigManager.get_instance().get_test_config().get("history", {})
+    if not history_config.get("enabled", True) or pytest_config.option.collectonly:
+        return
+    is_worker = hasattr(pytest_config, "workerinput")
+    is_controller = not is_worker and getattr(pytest_config.option, "numprocesses", None)
+    try:
+        history = RunHistory(history_config.get("db", "reports/history.db"))
+        if not is_controller:
+            history.save_steps(log_manager.run_id, StepTimer.get_instance().drain())
+        if not is_worker:
+            history.save_run(
+                log_manager.run_id,
+                _session_started_at,
+                datetime.now().isoformat(timespec="seconds"),
+                pytest_config.getoption("--env"),
+                exitstatus,
+                {test_id: tuple(result) for test_id, result in _test_results.items()}
+            )
+    except sqlite3.Error as e:
+        logging.warning(f"保存运行历史失败: {str(e)}")
 
 @pytest.fixture(scope="session")
 def config():
     """加载配置文件"""
     return ConfigManager.get_instance()._config
 
-def create_driver(request, config):
+# 浏览器驱动池，在 pytest_sessionstart 中按配置创建
+_driver_pool = None
+
+# 提供浏览器的 fixture，失败截图时按顺序查找
+DRIVER_FIXTURES = ("driver", "logged_in_driver", "class_logged_in_driver", "session_logged_in_driver")
+
+def build_driver(pytest_config, config):
     """
-    创建 WebDriver 实例
+    按命令行参数启动一个新的 WebDriver 实例
     Args:
-        request: pytest request对象
+        pytest_config: pytest config对象
+        config: 配置对象
+    Returns:
+        WebDriver实例
+    """
+    # 启用模板 profile 时使用已登录的模板克隆，登录时只需确认登录态
+    profile_template = ProfileTemplate.get_instance()
+    profile_clone = profile_template.clone(pytest_config.getoption("--env")) if profile_template else None
+    try:
+        driver = launch_driver(
+            pytest_config.getoption("--browser"),
+            pytest_config.getoption("--headless").lower() == "true",
+            config,
+            user_data_dir=profile_clone
+        )
+    except Exception:
+        if profile_clone:
+            profile_template.remove_clone(profile_clone)
+        raise
+    driver.profile_clone = profile_clone
+    # 模板的登录态只在第一次登录时使用，驱动池重置浏览器时会清除 cookies
+    driver.profile_logged_in = profile_clone is not None
+    return driver
+
+def launch_driver(browser, headless, config, user_data_dir=None):
+    """
+    启动一个新的 WebDriver 实例（不依赖 pytest，压测模式直接调用）
+    Args:
+        browser: 浏览器类型
+        headless: 是否无头模式，配置中 browser.headless 为 true 时总是无头
         config: 配置对象
+        user_data_dir: 浏览器 profile 目录，默认使用 chromedriver 创建的临时 profile
     Returns:
         WebDriver实例
     """
     try:
         logging.info("开始创建浏览器实例")
-        browser = request.config.getoption("--browser")
-        headless = request.config.getoption("--headless")
         browser_config = config.get('browser', {})
         
         logging.info(f"浏览器类型: {browser}, 无头模式: {headless}")
@@ -74,7 +288,7 @@ def create_driver(request, config):
         options = Options()
         
         # 配置无头模式
-        if headless.lower() == "true" or browser_config.get('headless', False):
+        if headless or browser_config.get('headless', False):
             options.add_argument("--headless=new")
             
         # 性能优化选项 - 优化关闭速度的配置
@@ -107,10 +321,35 @@ def create_driver(request, config):
         options.add_argument('--window-size=1920,1080')
         options.add_argument('--start-maximized')
         
+        # 指定 profile 时关闭首次运行与保存密码的提示
+        if user_data_dir:
+            options.add_argument(f'--user-data-dir={user_data_dir}')
+            options.add_argument('--no-first-run')
+            options.add_argument('--no-default-browser-check')
+            options.add_experimental_option('prefs', {
+                'credentials_enable_service': False,
+                'profile.password_manager_enabled': False,
+            })
+        
         logging.info("浏览器选项配置完成")
         
         if browser.lower() == "chrome":
-            driver = webdriver.Chrome(options=options)
+            # 启用共享磁盘缓存时独占一个缓存槽位，浏览器进程退出后在 safe_close_driver 中释放
+            browser_cache = BrowserCache.get_instance()
+            cache_slot = browser_cache.acquire() if browser_cache else None
+            if cache_slot:
+                for argument in browser_cache.chrome_arguments(cache_slot):
+                    options.add_argument(argument)
+            # chromedriver 放入独立进程组，关闭时可以只回收本 driver 的进程树
+            service = Service(popen_kw=service_popen_kwargs())
+            try:
+                driver = webdriver.Chrome(options=options, service=service)
+            except Exception:
+                if cache_slot:
+                    browser_cache.release(cache_slot)
+                raise
+            driver.cache_slot = cache_slot
+            ProcessReaper.get_instance().register(driver)
             logging.info("Chrome浏览器实例创建成功")
         else:
             raise ValueError(f"不支持的浏览器类型: {browser}")
@@ -130,114 +369,210 @@ def create_driver(request, config):
         logging.error(f"创建浏览器实例失败: {str(e)}")
         raise
 
-def safe_close_driver(driver, fast_close=False):
+def create_driver(request, config):
     """
-    安全地关闭浏览器驱动
+    创建 WebDriver 实例，启用驱动池时从池中获取预热好的浏览器
+    Args:
+        request: pytest request对象
+        config: 配置对象
+    Returns:
+        WebDriver实例
+    """
+    if _driver_pool is not None:
+        return _driver_pool.acquire()
+    return build_driver(request.config, config)
+
+def release_driver(driver, fast_close=False):
+    """
+    释放浏览器驱动：池中的浏览器重置后归还，其余直接关闭
     Args:
         driver: WebDriver实例
         fast_close: 是否启用快速关闭模式
     """
     if not driver:
         return
-        
+    if _driver_pool is not None and _driver_pool.owns(driver):
+        _driver_pool.release(driver)
+    else:
+        safe_close_driver(driver, fast_close)
+
+def runs_tests_here(pytest_config):
+    """本进程是否执行用例：仅收集用例与 xdist 主进程不执行"""
+    if pytest_config.option.collectonly:
+        return False
+    return not (getattr(pytest_config.option, "numprocesses", None) and not hasattr(pytest_config, "workerinput"))
+
+def pytest_sessionstart(session):
+    """按配置创建驱动池（收集完成后确认有用例需要浏览器时才预热）"""
+    global _driver_pool, _session_started_at
+    _session_started_at = datetime.now().isoformat(timespec="seconds")
+    if not runs_tests_here(session.config):
+        return
+    config = ConfigManager.get_instance()._config
+    pool_config = config.get('browser', {}).get('pool', {})
+    if not pool_config.get('enabled', False):
+        return
+    fast_close = os.environ.get("PYTEST_FAST_CLOSE", "false").lower() == "true"
+    _driver_pool = DriverPool(
+        factory=lambda: build_driver(session.config, config),
+        closer=lambda driver: safe_close_driver(driver, fast_close),
+        size=pool_config.get('size', 1),
+        max_uses=pool_config.get('max_uses', 20)
+    )
+
+def pytest_collection_finish(session):
+    """
+    选中的用例中有使用浏览器夹具的，才构建模板 profile 并在后台预热浏览器
+    只运行离线单元测试(如 -m framework)时不启动 Chrome
+    """
+    if not runs_tests_here(session.config):
+        return
+    if not any(set(DRIVER_FIXTURES) & set(getattr(item, "fixturenames", ())) for item in session.items):
+        return
+    prepare_profile_template(session.config, ConfigManager.get_instance()._config)
+    if _driver_pool is not None:
+        _driver_pool.warm_up()
+
+def prepare_profile_template(pytest_config, config):
+    """启用模板 profile 时，模板过期或登录态失效则重建（多个 worker 中只有一个构建，其余等待）"""
+    profile_template = ProfileTemplate.get_instance()
+    if profile_template is None:
+        return
+    env = pytest_config.getoption("--env")
+    env_config = ConfigManager.get_instance().get_env_config(env)
+
+    def build(user_data_dir):
+        driver = launch_driver(
+            pytest_config.getoption("--browser"),
+            pytest_config.getoption("--headless").lower() == "true",
+            config,
+            user_data_dir=user_data_dir
+        )
+        try:
+            if not LoginPage(driver).login(env_config.get('username'), env_config.get('password')):
+                return None
+            # 重新打开首页，预热 JS/字体/图片缓存
+            driver.get(env_config.get('url'))
+            cookies = driver.get_cookies()
+        finally:
+            # 同步退出，确保 profile 写入磁盘后再作为模板
+            driver.quit()
+            cache_slot = getattr(driver, 'cache_slot', None)
+            if cache_slot:
+                BrowserCache.get_instance().release(cache_slot)
+        return cookies
+
+    profile_template.ensure(env, build)
+
+def pytest_sessionfinish(session, exitstatus):
+    """关闭驱动池中的所有浏览器，xdist worker 还会写完日志队列"""
+    global _driver_pool
+    if _driver_pool is not None:
+        _driver_pool.shutdown()
+        _driver_pool = None
+    # 等待后台关闭任务完成，避免会话结束后遗留浏览器进程
+    ProcessReaper.get_instance().wait_all()
+    browser_cache = BrowserCache.get_instance()
+    if browser_cache:
+        browser_cache.evict()
+    # 等待后台截图写入完成
+    screenshot.wait_all()
+    save_test_durations(session.config)
+    save_run_history(session, exitstatus)
     try:
-        if fast_close:
-            # 快速关闭模式：直接quit，不等待
-            logging.info("快速关闭模式：直接终止浏览器")
-            # 设置较短的超时时间
-            import signal
-            import threading
-            
-            def force_quit():
-                try:
-                    # driver.quit()
-                    pass
-                except:
-                    pass
-            
-            # 在单独线程中执行quit，如果超时则强制终止
-            quit_thread = threading.Thread(target=force_quit)
-            quit_thread.daemon = True
-            quit_thread.start()
-            quit_thread.join(timeout=2)  # 最多等待2秒
-            
-            if quit_thread.is_alive():
-                # 如果quit没有在2秒内完成，强制终止进程
-                logging.warning("quit操作超时，强制终止进程")
-                try:
-                    import subprocess
-                    if sys.platform.startswith('win'):
-                        subprocess.run(["taskkill", "/F", "/IM", "chrome.exe"], 
-                                     capture_output=True, check=False, timeout=3)
-                        subprocess.run(["taskkill", "/F", "/IM", "chromedriver.exe"], 
-                                     capture_output=True, check=False, timeout=3)
-                    else:
-                        subprocess.run(["pkill", "-f", "chrome"], 
-                                     capture_output=True, check=False, timeout=3)
-                        subprocess.run(["pkill", "-f", "chromedriver"], 
-                                     capture_output=True, check=False, timeout=3)
-                    logging.info("已强制终止浏览器进程")
-                except Exception as kill_error:
-                    logging.error(f"强制终止进程失败: {str(kill_error)}")
-        else:
-            # 标准关闭模式：先关闭窗口再quit
-            logging.info("标准关闭模式：逐步关闭浏览器")
-            try:
-                # 快速关闭所有窗口，不逐个切换
-                # driver.quit()
-                pass
-            except Exception as e:
-                logging.warning(f"关闭浏览器时出错: {str(e)}")
-                # 标准模式失败时也尝试强制终止
-                try:
-                    import subprocess
-                    if sys.platform.startswith('win'):
-                        subprocess.run(["taskkill", "/F", "/IM", "chrome.exe"], 
-                                     capture_output=True, check=False, timeout=3)
-                        subprocess.run(["taskkill", "/F", "/IM", "chromedriver.exe"], 
-                                     capture_output=True, check=False, timeout=3)
-                    logging.info("已强制终止Chrome相关进程")
-                except Exception as kill_error:
-                    logging.error(f"强制终止进程失败: {str(kill_error)}")
-            
-        logging.info("浏览器已成功关闭")
-        
+        PerformanceRecorder.get_instance().save(log_manager.run_id, log_manager.worker_id)
+    except OSError as e:
+        logging.warning(f"保存页面性能数据失败: {str(e)}")
+    cleanup_test_entities(session.config)
+    if hasattr(session.config, "workerinput"):
+        # worker 结束前写完日志队列，主进程在 pytest_unconfigure 中合并时文件已完整
+        log_manager.stop()
+
+def cleanup_test_entities(pytest_config):
+    """按配置通过接口批量删除本次会话登记的测试数据"""
+    cleanup_config = ConfigManager.get_instance()._config.get('api', {}).get('cleanup', {})
+    registry = EntityRegistry.get_instance()
+    if not cleanup_config.get('enabled', False) or not registry.entities():
+        return
+    client = CmsApiClient.from_config(pytest_config.getoption("--env"))
+    try:
+        registry.cleanup(
+            client,
+            batch_size=cleanup_config.get('batch_size', 20),
+            max_workers=cleanup_config.get('max_workers', 5)
+        )
     except Exception as e:
-        logging.error(f"关闭浏览器失败: {str(e)}")
-        # 强制终止进程作为最后手段
-        try:
-            import subprocess
-            if sys.platform.startswith('win'):
-                subprocess.run(["taskkill", "/F", "/IM", "chrome.exe"], 
-                             capture_output=True, check=False, timeout=3)
-                subprocess.run(["taskkill", "/F", "/IM", "chromedriver.exe"], 
-                             capture_output=True, check=False, timeout=3)
-            else:
-                subprocess.run(["pkill", "-f", "chrome"], 
-                             capture_output=True, check=False, timeout=3)
-                subprocess.run(["pkill", "-f", "chromedriver"], 
-                             capture_output=True, check=False, timeout=3)
-            logging.info("已强制终止浏览器相关进程")
-        except Exception as kill_error:
-            logging.error(f"强制终止进程失败: {str(kill_error)}")
-
-def safe_screenshot(driver, name):
-    """
-    安全地获取截图
+        logging.error(f"清理测试数据失败: {str(e)}")
+    finally:
+        client.close()
+
+def login_driver(request, driver):
+    """
+    使 driver 进入已登录状态
+    使用模板 profile 克隆的浏览器直接确认登录态；否则优先注入磁盘缓存的登录态，服务端拒绝该会话时才回退到界面登录，并在成功后刷新缓存
     Args:
+        request: pytest request对象
         driver: WebDriver实例
-        name: 截图名称
     Returns:
-        bytes或None: 截图数据
+        bool: 是否登录成功
+    """
+    env = request.config.getoption("--env")
+    # 根據命令行參數--env加載對應環境的配置（如UAT或QA環境的用戶名/密碼）
+    env_config = ConfigManager.get_instance().get_env_config(env)
+    username = env_config.get('username')
+    session_cache = SessionCache.get_instance()
+    login_page = LoginPage(driver)
+
+    if getattr(driver, 'profile_logged_in', False):
+        driver.profile_logged_in = False
+        driver.get(env_config.get('url'))
+        if login_page.is_logged_in():
+            logging.info("使用模板 profile 的登录态登录成功")
+            return True
+        logging.info("模板 profile 的登录态已失效，下次会话开始时重建")
+        ProfileTemplate.get_instance().invalidate(env)
+
+    if session_cache.restore(driver, env, username, env_config.get('url')):
+        if login_page.is_logged_in():
+            logging.info("使用缓存登录态登录成功")
+            return True
+        logging.info("缓存登录态已失效，回退到界面登录")
+        session_cache.invalidate(env, username)
+        # 注入的 token 也写入了 localStorage，不清除时 SPA 仍会带着失效的 token 认为已登录
+        driver.delete_all_cookies()
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+
+    if not login_page.login(username, env_config.get('password')):
+        return False
+    session_cache.save(driver, env, username)
+    return True
+
+def safe_close_driver(driver, fast_close=False):
+    """
+    安全地关闭浏览器驱动
+    在后台线程中限时执行 quit，超时后只终止该 driver 自己的 chromedriver/Chrome 进程树，
+    不会影响并行运行中其他 worker 的浏览器
+    Args:
+        driver: WebDriver实例
+        fast_close: 是否启用快速关闭模式（缩短 quit 的等待时间）
     """
+    if not driver:
+        return
+
+    timeout = 2 if fast_close else 10
+    logging.info(f"{'快速' if fast_close else '标准'}关闭模式：后台关闭浏览器(最多等待{timeout}秒)")
     try:
-        return driver.get_screenshot_as_png()
-    except WebDriverException as e:
-        logging.error(f"截图失败: {str(e)}")
-        return None
+        future = ProcessReaper.get_instance().close(driver, timeout=timeout)
     except Exception as e:
-        logging.error(f"截图时发生未知错误: {str(e)}")
-        return None
+        logging.error(f"关闭浏览器失败: {str(e)}")
+        return
+    cache_slot = getattr(driver, 'cache_slot', None)
+    if cache_slot:
+        # 浏览器进程退出后才能把缓存槽位交给下一个浏览器
+        future.add_done_callback(lambda _: BrowserCache.get_instance().release(cache_slot))
+    profile_clone = getattr(driver, 'profile_clone', None)
+    if profile_clone:
+        future.add_done_callback(lambda _: ProfileTemplate.get_instance().remove_clone(profile_clone))
 
 @pytest.fixture(scope="session")  # 优化为会话级别，所有用例共享同一driver实例
 def driver(request, config):  # 接收pytest的request對象和config配置
@@ -248,6 +583,14 @@ def driver(request, config):  # 接收pytest的request對象和config配置
     driver = None  # 初始化driver為None，確保finally塊能安全判斷
     try:
         driver = create_driver(request, config)
+        if getattr(driver, 'profile_logged_in', False):
+            # 模板 profile 自带登录态，未登录用例需要清除
+            driver.profile_logged_in = False
+            base_url = urlsplit(ConfigManager.get_instance().get_base_url(request.config.getoption("--env")))
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": f"{base_url.scheme}://{base_url.netloc}",
+                "storageTypes": "cookies,local_storage,session_storage"
+            })
         # 仅在类用例时设置 request.instance.driver，函数用例跳过
         if hasattr(request, 'instance') and request.instance is not None:
             request.instance.driver = driver
@@ -255,7 +598,7 @@ def driver(request, config):  # 接收pytest的request對象和config配置
     finally:
         # 检查是否启用快速关闭模式（通过环境变量获取）
         fast_close = os.environ.get("PYTEST_FAST_CLOSE", "false").lower() == "true"
-        safe_close_driver(driver, fast_close)
+        release_driver(driver, fast_close)
                 
 @pytest.fixture(scope="session")  # 优化为会话级别，所有用例共享同一driver实例
 def logged_in_driver(request, config):  # 接收request和config
@@ -267,18 +610,14 @@ def logged_in_driver(request, config):  # 接收request和config
     try:
         # 創建瀏覽器實例（與driver fixture相同）
         driver = create_driver(request, config)  
-        # 根據命令行參數--env加載對應環境的配置（如UAT或QA環境的用戶名/密碼）
-        env_config = ConfigManager.get_instance().get_env_config(request.config.getoption("--env"))  
-        login_page = LoginPage(driver)
-        login_result = login_page.login(env_config.get('username'), env_config.get('password'))
-        if not login_result:
+        if not login_driver(request, driver):
             pytest.fail("前置登录失败，无法继续测试")
         request.instance.driver = driver
         yield driver
     finally:
         # 检查是否启用快速关闭模式（通过环境变量获取）
         fast_close = os.environ.get("PYTEST_FAST_CLOSE", "false").lower() == "true"
-        safe_close_driver(driver, fast_close)
+        release_driver(driver, fast_close)
 
 @pytest.fixture(scope="class")
 def class_logged_in_driver(request, config):
@@ -290,14 +629,8 @@ def class_logged_in_driver(request, config):
     try:
         # 创建浏览器实例
         driver = create_driver(request, config)
-        # 根据命令行参数--env加载对应环境的配置
-        env_config = ConfigManager.get_instance().get_env_config(request.config.getoption("--env"))
-        # 初始化登录页面对象
-        login_page = LoginPage(driver)
-        # 执行登录操作
-        login_result = login_page.login(env_config.get('username'), env_config.get('password'))
-        # 登录失败处理
-        if not login_result:
+        # 执行登录操作，登录失败处理
+        if not login_driver(request, driver):
             pytest.fail("前置登录失败，无法继续测试")
         # 绑定driver到测试类实例
         request.cls.driver = driver
@@ -305,7 +638,7 @@ def class_logged_in_driver(request, config):
     finally:
         # 检查是否启用快速关闭模式（通过环境变量获取）
         fast_close = os.environ.get("PYTEST_FAST_CLOSE", "false").lower() == "true"
-        safe_close_driver(driver, fast_close)
+        release_driver(driver, fast_close)
 
 @pytest.fixture(scope="session")
 def session_logged_in_driver(request, config):
@@ -315,10 +648,7 @@ def session_logged_in_driver(request, config):
     driver = None
     try:
         driver = create_driver(request, config)
-        env_config = ConfigManager.get_instance().get_env_config(request.config.getoption("--env"))
-        login_page = LoginPage(driver)
-        login_result = login_page.login(env_config.get('username'), env_config.get('password'))
-        if not login_result:
+        if not login_driver(request, driver):
             pytest.fail("前置登录失败，无法继续测试")
         # 绑定driver到request.session，供不同文件共享
         request.session.driver = driver
@@ -326,7 +656,85 @@ def session_logged_in_driver(request, config):
     finally:
         # 检查是否启用快速关闭模式（通过环境变量获取）
         fast_close = os.environ.get("PYTEST_FAST_CLOSE", "false").lower() == "true"
-        safe_close_driver(driver, fast_close)
+        release_driver(driver, fast_close)
+
+@pytest.fixture(scope="session")
+def api_client(request):
+    """CMS 后台接口客户端，整个会话复用同一个连接池"""
+    client = CmsApiClient.from_config(request.config.getoption("--env"))
+    try:
+        yield client
+    finally:
+        client.close()
+
+@pytest.fixture(scope="session")
+def entity_registry():
+    """测试数据登记表，用例创建的数据登记后在会话结束时统一清理"""
+    return EntityRegistry.get_instance()
+
+@pytest.fixture(scope="session")
+def data_seeder(api_client, entity_registry):
+    """测试数据准备器"""
+    return DataSeeder(api_client, entity_registry)
+
+@pytest.fixture
+def page_performance():
+    """页面性能记录器，performance 用例通过 records() 读取本用例的采集结果，assert_budgets() 断言预算"""
+    return PerformanceRecorder.get_instance()
+
+@pytest.fixture(autouse=True)
+def api_cassette(request, config):
+    """
+    按 --cassette(默认取 cassette.mode)录制或回放本用例页面发出的 XHR/fetch 请求
+    只对使用浏览器夹具的用例生效，回放时没有录制文件则照常访问真实后台
+    页面文档、脚本与浏览器夹具中的登录不经过录制文件，回放时仍需要环境可用，只省去用例内的接口耗时与数据依赖
+    """
+    cassette_config = config.get('cassette', {})
+    mode = request.config.getoption("--cassette") or cassette_config.get('mode', 'off')
+    driver_name = next((name for name in DRIVER_FIXTURES if name in request.fixturenames), None)
+    if mode == "off" or driver_name is None:
+        yield None
+        return
+    path = cassette_path(
+        cassette_config.get('dir', 'cassettes'),
+        request.config.getoption("--env"),
+        split_group(request.node.nodeid)[0]
+    )
+    if mode == "replay" and not os.path.exists(path):
+        logging.warning(f"未找到录制文件，访问真实后台: {path}")
+        yield None
+        return
+    # 录制时总是重新录制，避免与旧的响应混在一起
+    cassette = Cassette(path, cassette_config.get('ignore_params'), load=mode == "replay")
+    interceptor = FetchInterceptor(
+        request.getfixturevalue(driver_name),
+        cassette,
+        mode,
+        url_patterns=cassette_config.get('url_patterns'),
+        passthrough_on_miss=cassette_config.get('passthrough_on_miss', False)
+    )
+    if not interceptor.start():
+        yield None
+        return
+    try:
+        yield interceptor
+    finally:
+        interceptor.stop()
+
+@pytest.fixture(scope="session")
+def ui_gift_data():
+    """界面创建的Gift测试数据，名称带本次会话唯一的后缀，按名称清理时不会删除其他运行创建的同名数据"""
+    return with_unique_names(GIFT_TEST_DATA["add_auto_gift"])
+
+@pytest.fixture
+def seeded_gift(request, config):
+    """
+    Copy/Edit 用例所需的已存在Gift
+    启用 api.seed 时通过接口创建，否则沿用 test_add_gift 在界面创建的数据
+    """
+    if not config.get('api', {}).get('seed', {}).get('enabled', False):
+        return request.getfixturevalue("ui_gift_data")
+    return request.getfixturevalue("data_seeder").seed_gift(GIFT_TEST_DATA["add_auto_gift"])
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -336,24 +744,31 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
     
+    # 记录用例是否通过，供 depends_on 判断
+    if report.when == "call" or (report.when == "setup" and not report.passed):
+        item.stash[PASSED_KEY] = report.passed
+    
     if report.when == "call" or report.when == "setup":
         xfail = hasattr(report, "wasxfail")
         if (report.skipped and xfail) or (report.failed and not xfail):
-            for fixture_name in ["driver", "logged_in_driver"]:
+            for fixture_name in DRIVER_FIXTURES:
                 try:
                     driver = item.funcargs.get(fixture_name)
                     if driver:
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        screenshot_name = f"failure_{item.name}_{timestamp}"
-                        screenshot = safe_screenshot(driver, screenshot_name)
-                        if screenshot:
-                            allure.attach(
-                                screenshot,
-                                name=screenshot_name,
-                                attachment_type=allure.attachment_type.PNG
-                            )
+                        # 页面操作异常时已截过图的用例不再重复截图
+                        screenshot.take_screenshot(driver, f"failure_{item.name}",
+                                                   test_id=item.nodeid, once_per_test=True)
+                        break
                 except Exception as e:
                     logging.error(f"处理测试失败截图时发生错误: {str(e)}")
+            # 失败前关键操作的缩略帧
+            try:
+                screenshot.dump_frames(item.nodeid, f"failure_{item.name}")
+            except Exception as e:
+                logging.error(f"保存失败前操作截图时发生错误: {str(e)}")
+        screenshot.attach_pending(item.nodeid)
+    elif report.when == "teardown":
+        screenshot.finish_test(item.nodeid)
 
 @pytest.fixture(autouse=True)
 def logging_test_name(request):
@@ -0,0 +1,63 @@
+// Ant Design 3 日历弹层的最小复刻：结构与 class 与真实组件一致，供 AntDatePicker/AntRangePicker 驱动
+var MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+              'August', 'September', 'October', 'November', 'December'];
+
+function calendarTitle(date) {
+    return MONTHS[date.getMonth()] + ' ' + date.getDate() + ', ' + date.getFullYear();
+}
+
+function renderCalendar(popup, year, month) {
+    var first = new Date(year, month, 1), cells = [];
+    var start = new Date(year, month, 1 - first.getDay());
+    for (var i = 0; i < 42; i++) {
+        var day = new Date(start.getFullYear(), start.getMonth(), start.getDate() + i);
+        cells.push('<td title="' + calendarTitle(day) + '"><div class="ant-calendar-date">' + day.getDate() + '</div></td>');
+    }
+    var rows = [];
+    for (var r = 0; r < 6; r++) { rows.push('<tr>' + cells.slice(r * 7, r * 7 + 7).join('') + '</tr>'); }
+    popup.innerHTML = '<div class="ant-calendar">' +
+        '<div class="ant-calendar-header"><a class="ant-calendar-prev-month-btn">&lt;</a>' +
+        '<span>' + MONTHS[month] + ' ' + year + '</span><a class="ant-calendar-next-month-btn">&gt;</a></div>' +
+        '<table class="ant-calendar-table"><tbody>' + rows.join('') + '</tbody></table>' +
+        (popup.dataset.showTime ? '<a class="ant-calendar-ok-btn" role="button">OK</a>' : '') + '</div>';
+    popup.dataset.year = year;
+    popup.dataset.month = month;
+}
+
+// picker: <span id="..." class="ant-calendar-picker" data-range data-show-time>，点击图标展开弹层
+function initPicker(picker) {
+    var input = picker.querySelector('input');
+    var popup = document.createElement('div');
+    popup.className = 'ant-calendar-picker-container ant-calendar-picker-container-hidden';
+    popup.id = picker.id + '-popup';
+    popup.dataset.showTime = picker.dataset.showTime || '';
+    picker.setAttribute('aria-controls', popup.id);
+    document.body.appendChild(popup);
+    var picked = [], needed = picker.dataset.range ? 2 : 1;
+
+    function hide() { popup.className = 'ant-calendar-picker-container ant-calendar-picker-container-hidden'; }
+    picker.querySelector('.ant-calendar-picker-icon').onclick = function () {
+        var now = new Date();
+        picked = [];
+        renderCalendar(popup, now.getFullYear(), now.getMonth());
+        var rect = picker.getBoundingClientRect();
+        popup.style.top = (rect.bottom + window.scrollY) + 'px';
+        popup.style.left = rect.left + 'px';
+        popup.className = 'ant-calendar-picker-container';
+    };
+    popup.onclick = function (e) {
+        var target = e.target, year = +popup.dataset.year, month = +popup.dataset.month;
+        if (target.classList.contains('ant-calendar-prev-month-btn')) { renderCalendar(popup, month === 0 ? year - 1 : year, (month + 11) % 12); }
+        if (target.classList.contains('ant-calendar-next-month-btn')) { renderCalendar(popup, month === 11 ? year + 1 : year, (month + 1) % 12); }
+        if (target.classList.contains('ant-calendar-ok-btn')) { hide(); return; }
+        var cell = target.closest('td[title]');
+        if (!cell) { return; }
+        picked.push(cell.getAttribute('title'));
+        input.value = picked.join(' ~ ');
+        if (picked.length >= needed && !popup.dataset.showTime) { hide(); }
+    };
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('.ant-calendar-picker').forEach(initPicker);
+});
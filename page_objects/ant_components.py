@@ -0,0 +1,295 @@
+from datetime import datetime
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from utils.log_manager import logger
+
+
+# 公共脚本：定位触发器对应的弹层、判断弹层是否完成显示动画、轮询直到条件满足
+_HELPERS_JS = """
+var TRANSITION = /(^|\\s)[\\w-]+-(enter|appear|leave)(-active)?(\\s|$)/;
+function isVisible(el) {
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+}
+function isHidden(el) {
+    return /-hidden(\\s|$)/.test(el.className) || !isVisible(el);
+}
+function isReady(el) {
+    return !isHidden(el) && !TRANSITION.test(el.className);
+}
+function findPopup(trigger, cls) {
+    var holder = trigger && (trigger.closest('[aria-controls]') || trigger.querySelector('[aria-controls]'));
+    var id = holder && holder.getAttribute('aria-controls');
+    var target = id && document.getElementById(id);
+    var popup = target && target.closest('.' + cls);
+    if (popup) { return popup; }
+    var all = document.querySelectorAll('.' + cls), last = null;
+    for (var i = 0; i < all.length; i++) { if (!isHidden(all[i])) { last = all[i]; } }
+    return last;
+}
+function poll(step, timeoutMs, done) {
+    var start = Date.now();
+    (function tick() {
+        var result;
+        try { result = step(); } catch (e) { done({ ok: false, error: String(e) }); return; }
+        if (result) { done(result); return; }
+        if (Date.now() - start >= timeoutMs) { done({ ok: false, error: 'timeout' }); return; }
+        setTimeout(tick, 50);
+    })();
+}
+function matchOption(nodes, label, attr) {
+    var i, text;
+    for (i = 0; i < nodes.length; i++) {
+        text = (nodes[i].getAttribute('title') || nodes[i].textContent || '').trim();
+        if (text === label) { return nodes[i]; }
+    }
+    if (attr) {
+        for (i = 0; i < nodes.length; i++) { if (nodes[i].getAttribute(attr) === label) { return nodes[i]; } }
+    }
+    for (i = 0; i < nodes.length; i++) {
+        if ((nodes[i].textContent || '').indexOf(label) !== -1) { return nodes[i]; }
+    }
+    return null;
+}
+// 选中后等待弹层收起(单选)或动画结束后保持展开(多选)
+function settle(popup) {
+    if (isHidden(popup)) { return { ok: true, open: false }; }
+    if (isReady(popup)) { return { ok: true, open: true }; }
+    return null;
+}
+"""
+
+# 下拉选项选择：等待弹层动画结束后点击匹配的选项
+_SELECT_JS = _HELPERS_JS + """
+var trigger = arguments[0], cls = arguments[1], optionSelector = arguments[2], label = arguments[3],
+    attr = arguments[4], timeoutMs = arguments[5], done = arguments[arguments.length - 1];
+var popup = null, picked = false;
+poll(function () {
+    if (picked) { return settle(popup); }
+    popup = findPopup(trigger, cls);
+    if (!popup || !isReady(popup)) { return null; }
+    var option = matchOption(popup.querySelectorAll(optionSelector), label, attr);
+    if (!option) { return null; }
+    option.click();
+    picked = true;
+    return null;
+}, timeoutMs, done);
+"""
+
+# 树形选择：目标节点不存在时展开(路径上的)折叠节点，直到目标出现后点击
+_TREE_SELECT_JS = _HELPERS_JS + """
+var trigger = arguments[0], cls = arguments[1], label = arguments[2], path = arguments[3],
+    timeoutMs = arguments[4], done = arguments[arguments.length - 1];
+var popup = null, picked = false, expanded = [];
+poll(function () {
+    if (picked) { return settle(popup); }
+    popup = findPopup(trigger, cls);
+    if (!popup || !isReady(popup)) { return null; }
+    var option = matchOption(popup.querySelectorAll('.ant-select-tree-node-content-wrapper'), label, null);
+    if (option) { option.click(); picked = true; return null; }
+    var switchers = popup.querySelectorAll('.ant-select-tree-switcher_close');
+    for (var i = 0; i < switchers.length; i++) {
+        var wrapper = switchers[i].parentNode.querySelector('.ant-select-tree-node-content-wrapper');
+        var title = wrapper ? (wrapper.getAttribute('title') || wrapper.textContent || '').trim() : '';
+        if (expanded.indexOf(switchers[i]) !== -1 || (path && path.indexOf(title) === -1)) { continue; }
+        expanded.push(switchers[i]);
+        switchers[i].click();
+    }
+    return null;
+}, timeoutMs, done);
+"""
+
+# 日历选择：依次点击目标日期单元格，不在当前面板时翻月，可选点击OK按钮确认
+_CALENDAR_JS = _HELPERS_JS + """
+var trigger = arguments[0], titles = arguments[1], confirm = arguments[2],
+    timeoutMs = arguments[3], done = arguments[arguments.length - 1];
+var popup = null, index = 0, confirmed = !confirm;
+poll(function () {
+    if (index >= titles.length && confirmed) { return popup ? settle(popup) : null; }
+    popup = findPopup(trigger, 'ant-calendar-picker-container');
+    if (!popup || !isReady(popup)) { return null; }
+    if (index >= titles.length) {
+        var ok = popup.querySelector('.ant-calendar-ok-btn:not(.ant-calendar-ok-btn-disabled)');
+        if (ok) { ok.click(); confirmed = true; }
+        return null;
+    }
+    var title = titles[index];
+    var cell = popup.querySelector('td[title="' + title + '"]:not(.ant-calendar-disabled-cell)');
+    if (cell) {
+        (cell.querySelector('.ant-calendar-date') || cell).click();
+        index++;
+        return null;
+    }
+    var cells = popup.querySelectorAll('td[title]');
+    if (!cells.length) { return null; }
+    var target = Date.parse(title);
+    var buttons = target < Date.parse(cells[0].getAttribute('title'))
+        ? popup.querySelectorAll('.ant-calendar-prev-month-btn')
+        : popup.querySelectorAll('.ant-calendar-next-month-btn');
+    if (!buttons.length) { return { ok: false, error: 'no month navigation for ' + title }; }
+    buttons[target < Date.parse(cells[0].getAttribute('title')) ? 0 : buttons.length - 1].click();
+    return null;
+}, timeoutMs, done);
+"""
+
+# 等待弹层收起
+_WAIT_CLOSED_JS = _HELPERS_JS + """
+var trigger = arguments[0], cls = arguments[1], timeoutMs = arguments[2], done = arguments[arguments.length - 1];
+poll(function () {
+    var popup = findPopup(trigger, cls);
+    return !popup || isHidden(popup) ? { ok: true } : null;
+}, timeoutMs, done);
+"""
+
+
+def calendar_title(date_str: str) -> str:
+    """
+    将 YYYY-MM-DD 转换为 Ant Design 日历单元格的 title，如 "October 8, 2025"
+    """
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    return f"{date_obj.strftime('%B')} {date_obj.day}, {date_obj.year}"
+
+
+class AntComponent:
+    """Ant Design 组件驱动基类：点击触发器展开弹层，在一次异步脚本中等待动画并完成选择"""
+
+    # 弹层容器的 class
+    POPUP_CLASS = None
+
+    def __init__(self, page, locator, timeout=None):
+        """
+        Args:
+            page: 页面对象(BasePage子类)
+            locator: 触发器定位器（点击后展开弹层的元素）
+            timeout: 超时时间(秒)，默认使用页面的等待时间
+        """
+        self.page = page
+        self.driver = page.driver
+        self.locator = locator
+        self.timeout = timeout or page.timeout
+        self.trigger = None
+
+    def _open(self):
+        """点击触发器展开弹层"""
+        self.trigger = WebDriverWait(self.driver, self.timeout).until(EC.element_to_be_clickable(self.locator))
+        self.trigger.click()
+
+    def _run(self, script, *args):
+        """执行异步脚本，返回脚本结果"""
+        with self.page._script_timeout(self.timeout + 1):
+            result = self.driver.execute_async_script(script, *args, int(self.timeout * 1000))
+        result = result or {"ok": False, "error": "no result"}
+        if not result.get("ok"):
+            logger.warning(f"{type(self).__name__} 操作失败 {self.locator}: {result.get('error')}")
+        return result
+
+    def close(self):
+        """按 Esc 收起仍然展开的弹层，并等待收起动画结束"""
+        ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
+        return self._run(_WAIT_CLOSED_JS, self.trigger, self.POPUP_CLASS).get("ok", False)
+
+
+class AntSelect(AntComponent):
+    """Ant Design Select 驱动"""
+
+    POPUP_CLASS = "ant-select-dropdown"
+    OPTION_SELECTOR = "li[role='option']:not(.ant-select-dropdown-menu-item-disabled)"
+
+    def __init__(self, page, locator, timeout=None, match_attribute=None):
+        """
+        Args:
+            match_attribute: 文本不匹配时用于匹配选项的属性名（如 value、en）
+        """
+        super().__init__(page, locator, timeout)
+        self.match_attribute = match_attribute
+
+    def select(self, labels):
+        """
+        选择一个或多个选项（按文本、title 或 match_attribute 匹配），多选时选择完成后收起下拉框
+        Args:
+            labels: 选项文本或文本列表
+        Returns:
+            bool: 是否全部选择成功
+        """
+        labels = labels if isinstance(labels, (list, tuple)) else [labels]
+        self._open()
+        result = {"ok": True, "open": False}
+        for label in labels:
+            logger.info(f"选择下拉选项: {label}")
+            result = self._run(_SELECT_JS, self.trigger, self.POPUP_CLASS, self.OPTION_SELECTOR,
+                               str(label), self.match_attribute)
+            if not result.get("ok"):
+                return False
+        if result.get("open"):
+            return self.close()
+        return True
+
+
+class AntTreeSelect(AntComponent):
+    """Ant Design TreeSelect 驱动"""
+
+    POPUP_CLASS = "ant-select-tree-dropdown"
+
+    def select(self, label, path=None):
+        """
+        选择树节点，目标节点未渲染时自动展开折叠节点
+        Args:
+            label: 节点 title
+            path: 仅展开这些祖先节点(title列表)，为None时展开全部折叠节点
+        Returns:
+            bool: 是否选择成功
+        """
+        logger.info(f"选择树节点: {label}")
+        self._open()
+        result = self._run(_TREE_SELECT_JS, self.trigger, self.POPUP_CLASS, str(label), path)
+        if not result.get("ok"):
+            return False
+        if result.get("open"):
+            return self.close()
+        return True
+
+
+class AntDatePicker(AntComponent):
+    """Ant Design DatePicker 驱动"""
+
+    POPUP_CLASS = "ant-calendar-picker-container"
+
+    def __init__(self, page, locator, timeout=None, confirm=False):
+        """
+        Args:
+            confirm: 选择日期后是否点击OK按钮（showTime 模式需要）
+        """
+        super().__init__(page, locator, timeout)
+        self.confirm = confirm
+
+    def pick(self, date_str):
+        """
+        选择日期
+        Args:
+            date_str: YYYY-MM-DD 格式的日期
+        Returns:
+            bool: 是否选择成功
+        """
+        logger.info(f"设置 DatePicker 日期: {date_str}")
+        self._open()
+        return self._run(_CALENDAR_JS, self.trigger, [calendar_title(date_str)], self.confirm).get("ok", False)
+
+
+class AntRangePicker(AntDatePicker):
+    """Ant Design RangePicker 驱动"""
+
+    def pick(self, start_date, end_date):
+        """
+        选择日期范围
+        Args:
+            start_date: YYYY-MM-DD 格式的开始日期
+            end_date: YYYY-MM-DD 格式的结束日期
+        Returns:
+            bool: 是否选择成功
+        """
+        logger.info(f"设置 RangePicker 日期范围: {start_date} - {end_date}")
+        self._open()
+        titles = [calendar_title(start_date), calendar_title(end_date)]
+        return self._run(_CALENDAR_JS, self.trigger, titles, self.confirm).get("ok", False)
@@ -5,20 +5,163 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 from utils.log_manager import logger
+from utils.run_history import timed_action
 from utils.config_manager import ConfigManager
+from page_objects.ant_components import AntDatePicker, AntRangePicker
+from contextlib import contextmanager
 from datetime import datetime
 import time
 import os
 
+
+# 注入页面的 MutationObserver 脚本：DOM 在 quiet_ms 内无变化即返回 true，超时返回 false
+_DOM_STABLE_SCRIPT = """
+var quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var start = Date.now(), last = Date.now();
+var observer = new MutationObserver(function () { last = Date.now(); });
+observer.observe(document.documentElement || document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+(function check() {
+    var now = Date.now();
+    if (now - last >= quietMs) { observer.disconnect(); done(true); return; }
+    if (now - start >= timeoutMs) { observer.disconnect(); done(false); return; }
+    setTimeout(check, Math.min(50, quietMs));
+})();
+"""
+
+# 在页面中挂载 fetch/XHR 计数钩子，window.__cmsNetwork.pending 为进行中的请求数，
+# idleAt 为请求数最近一次归零的 performance.now()，页面性能采集以此作为页面可交互时刻；
+# fromStart 表示钩子在文档解析时已挂载，页面加载后才注入的钩子统计不到首屏请求
+_NETWORK_HOOK_SCRIPT = """
+(function () {
+    if (window.__cmsNetwork) { return; }
+    var state = window.__cmsNetwork = {
+        pending: 0, lastChange: Date.now(), idleAt: performance.now(), fromStart: document.readyState === 'loading'
+    };
+    function inc() { state.pending++; state.lastChange = Date.now(); state.idleAt = null; }
+    function dec() {
+        state.pending = Math.max(0, state.pending - 1);
+        state.lastChange = Date.now();
+        if (state.pending === 0) { state.idleAt = performance.now(); }
+    }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            inc();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { dec(); return response; },
+                function (error) { dec(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        inc();
+        this.addEventListener('loadend', dec);
+        try {
+            return originalSend.apply(this, arguments);
+        } catch (error) {
+            dec();
+            throw error;
+        }
+    };
+})();
+"""
+
+# 进行中的请求数归零并保持 idle_ms 毫秒后返回 true，超时返回 false
+_NETWORK_IDLE_SCRIPT = _NETWORK_HOOK_SCRIPT + """
+var idleMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var state = window.__cmsNetwork, start = Date.now();
+(function check() {
+    var now = Date.now();
+    if (state.pending === 0 && now - state.lastChange >= idleMs) { done(true); return; }
+    if (now - start >= timeoutMs) { done(false); return; }
+    setTimeout(check, 50);
+})();
+"""
+
+# 在页面内按定位器查找元素的公共函数，支持常用的 By 定位方式
+LOCATE_JS = """
+function locate(by, value) {
+    switch (by) {
+        case 'xpath':
+            return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        case 'id': return document.getElementById(value);
+        case 'name': return document.querySelector('[name="' + value + '"]');
+        case 'tag name': return document.getElementsByTagName(value)[0] || null;
+        case 'class name': return document.getElementsByClassName(value)[0] || null;
+        default: return document.querySelector(value);
+    }
+}
+function isDisplayed(el) {
+    if (!el) { return false; }
+    var rect = el.getBoundingClientRect(), style = getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+}
+"""
+
+# 一次往返查找多个定位器，返回 [元素, 是否可见] 列表
+_FIND_BATCH_SCRIPT = LOCATE_JS + """
+return arguments[0].map(function (locator) {
+    var el = locate(locator[0], locator[1]);
+    return [el, isDisplayed(el)];
+});
+"""
+
+# 轮询直到所有定位器的元素可见，返回仍不可见的定位器下标
+_WAIT_ALL_VISIBLE_SCRIPT = LOCATE_JS + """
+var locators = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var start = Date.now();
+(function check() {
+    var missing = [];
+    locators.forEach(function (locator, i) {
+        if (!isDisplayed(locate(locator[0], locator[1]))) { missing.push(i); }
+    });
+    if (!missing.length || Date.now() - start >= timeoutMs) { done(missing); return; }
+    setTimeout(check, 50);
+})();
+"""
+
+# 批量脚本支持的定位方式
+BATCH_LOCATOR_TYPES = {By.XPATH, By.CSS_SELECTOR, By.ID, By.NAME, By.TAG_NAME, By.CLASS_NAME}
+
+# 通过原生 value setter 赋值（绕过 React 对 value 属性的拦截），派发 input/change 事件后回读实际值
+_SET_INPUT_VALUE_SCRIPT = """
+var el = arguments[0], text = arguments[1];
+// contenteditable 与自定义元素没有原生 value setter，返回 null 由调用方回退到键盘输入
+if (!(el instanceof HTMLInputElement) && !(el instanceof HTMLTextAreaElement)) { return null; }
+var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+el.focus();
+setter.call(el, text);
+el.dispatchEvent(new Event('input', { bubbles: true }));
+el.dispatchEvent(new Event('change', { bubbles: true }));
+el.blur();
+return el.value;
+"""
+
+
 class BasePage:
     def __init__(self, driver):
         self.driver = driver
         self.config = ConfigManager.get_instance()
         self.timeout = self.config.get_wait_time('medium')
         self.base_url = self.config.get_base_url()
+        self.dom_quiet_ms = self.config.get_test_config().get('wait', {}).get('dom_quiet_ms', 300)
+        self.network_idle_ms = self.config.get_test_config().get('wait', {}).get('network_idle_ms', 500)
         
+    @timed_action
     def open(self):
-        self.driver.get(self.base_url)
+        self.navigate(self.base_url)
+        self.capture_performance()
+
+    def navigate(self, url):
+        """整页导航到 url；页面就绪后由调用方 capture_performance 采集性能数据"""
+        # 导航前注册请求计数钩子，保证首屏请求也能被 wait_for_network_idle 与性能采集统计
+        self._install_network_hook()
+        self.driver.get(url)
+        self.record_frame("打开页面")
         
     def find_element(self, locator, timeout=None):
         """等待并查找元素"""
@@ -44,9 +187,59 @@ class BasePage:
             logger.error(f"元素定位失败: {locator}")
             return []
             
+    def find_elements_batch(self, locators):
+        """
+        一次脚本调用查找多个元素
+        Args:
+            locators: 定位器列表，支持 xpath/css/id/name/tag/class，其余方式单独查找
+        Returns:
+            list: 与 locators 顺序一致的 (元素或None, 是否可见) 列表
+        """
+        batch = [locator for locator in locators if locator[0] in BATCH_LOCATOR_TYPES]
+        found = dict(zip(batch, self.driver.execute_script(_FIND_BATCH_SCRIPT, [list(l) for l in batch]))) if batch else {}
+        results = []
+        for locator in locators:
+            if locator in found:
+                element, visible = found[locator]
+                results.append((element, bool(visible)))
+                continue
+            elements = self.driver.find_elements(*locator)
+            results.append((elements[0], elements[0].is_displayed()) if elements else (None, False))
+        return results
+
+    @timed_action
+    def wait_all_visible(self, locators, timeout=None):
+        """
+        在一次异步脚本中等待多个元素全部可见
+        Args:
+            locators: 定位器列表，仅支持批量脚本支持的定位方式
+            timeout: 超时时间(秒)
+        Returns:
+            bool: 是否全部可见，超时时记录仍不可见的定位器
+        """
+        timeout = timeout or self.timeout
+        unsupported = [locator for locator in locators if locator[0] not in BATCH_LOCATOR_TYPES]
+        if unsupported:
+            raise ValueError(f"wait_all_visible 不支持的定位方式: {unsupported}")
+        try:
+            with self._script_timeout(timeout + 1):
+                missing = self.driver.execute_async_script(
+                    _WAIT_ALL_VISIBLE_SCRIPT, [list(l) for l in locators], int(timeout * 1000)
+                )
+        except WebDriverException as e:
+            logger.error(f"等待元素可见失败: {str(e)}")
+            return False
+        if missing:
+            logger.error(f"等待元素可见超时({timeout}秒): {[locators[i] for i in missing]}")
+            return False
+        return True
+
+    @timed_action
     def click(self, locator, timeout=None):
         """点击元素"""
-        self.find_element(locator, timeout).click()
+        element = self.find_element(locator, timeout)
+        self.record_frame(f"点击 {locator[1]}")
+        element.click()
         
     # def clear_input(self, locator, timeout=None):
     #     """仅清空输入框"""
@@ -61,57 +254,74 @@ class BasePage:
 
 
     # 清空文本后输入文本
-    def clear_and_input_text(self, locator, text, timeout=10):
+    @timed_action
+    def clear_and_input_text(self, locator, text, timeout=10, fast=True):
         """清空输入框并输入文本 - 增强版，适用于Ant Design组件
         Args:
             locator: 元素定位器
             text: 要输入的文本
             timeout: 超时时间(秒)，默认10秒
+            fast: 是否先尝试一次 execute_script 完成赋值，组件拒绝脚本赋值时再回退到键盘输入
         """
         try:
             element = WebDriverWait(self.driver, timeout).until(EC.element_to_be_clickable(locator))
-            
-            # 方法1: 先点击元素获得焦点
-            element.click()
-            time.sleep(0.5)
-            
-            # 方法2: 多种清空方式组合使用
-            # 2.1 使用Ctrl+A全选然后删除
-            element.send_keys(Keys.CONTROL + "a")
-            time.sleep(0.3)
-            element.send_keys(Keys.DELETE)
-            time.sleep(0.3)
-            
-            # 2.2 使用clear()方法
-            element.clear()
-            time.sleep(0.5)
-            
-            # 2.3 如果还有内容，使用JavaScript强制清空
-            current_value = element.get_attribute('value')
-            if current_value:
-                logger.info(f"检测到残留文本: {current_value}，使用JavaScript清空")
-                self.driver.execute_script("arguments[0].value = '';", element)
-                # 触发input事件，确保React组件状态更新
-                self.driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", element)
-                time.sleep(0.5)
-            
-            # 输入新文本
-            element.send_keys(text)
-            time.sleep(0.5)
-            
-            # 验证输入是否成功
-            final_value = element.get_attribute('value')
-            if final_value == text:
-                logger.info(f"输入文本成功: {text}")
-                return True
-            else:
-                logger.warning(f"输入验证失败，期望: {text}, 实际: {final_value}")
-                return False
-                
+
+            if fast:
+                # 通过原生 value setter 赋值并派发 input/change 事件，一次往返完成清空、输入与回读
+                try:
+                    final_value = self.driver.execute_script(_SET_INPUT_VALUE_SCRIPT, element, text)
+                except WebDriverException as e:
+                    final_value = None
+                    logger.info(f"脚本赋值失败: {e.msg}")
+                if final_value == text:
+                    logger.info(f"输入文本成功: {text}")
+                    return True
+                logger.info(f"脚本赋值未生效(实际: {final_value})，回退到键盘输入")
+
+            return self._type_text(element, text)
+
         except Exception as e:
             logger.error(f"输入文本失败: {str(e)}")
         return False
 
+    def _type_text(self, element, text):
+        """通过键盘事件清空并输入文本，用于拒绝脚本赋值的组件"""
+        # 方法1: 先点击元素获得焦点
+        element.click()
+        time.sleep(0.5)
+
+        # 方法2: 多种清空方式组合使用
+        # 2.1 使用Ctrl+A全选然后删除
+        element.send_keys(Keys.CONTROL + "a")
+        time.sleep(0.3)
+        element.send_keys(Keys.DELETE)
+        time.sleep(0.3)
+
+        # 2.2 使用clear()方法
+        element.clear()
+        time.sleep(0.5)
+
+        # 2.3 如果还有内容，使用JavaScript强制清空
+        current_value = element.get_attribute('value')
+        if current_value:
+            logger.info(f"检测到残留文本: {current_value}，使用JavaScript清空")
+            self.driver.execute_script("arguments[0].value = '';", element)
+            # 触发input事件，确保React组件状态更新
+            self.driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", element)
+            time.sleep(0.5)
+
+        # 输入新文本
+        element.send_keys(text)
+        time.sleep(0.5)
+
+        # 验证输入是否成功
+        final_value = element.get_attribute('value')
+        if final_value == text:
+            logger.info(f"输入文本成功: {text}")
+            return True
+        logger.warning(f"输入验证失败，期望: {text}, 实际: {final_value}")
+        return False
+
     def get_text(self, locator, timeout=None):
         """获取元素文本"""
         return self.find_element(locator, timeout).text
@@ -136,13 +346,116 @@ class BasePage:
             logger.error(f"等待元素可点击失败: {locator} - {str(e)}")
             return False
 
-    def take_screenshot(self, name):
+    @contextmanager
+    def _script_timeout(self, seconds):
+        """临时放宽异步脚本超时，退出时恢复原值"""
+        previous = self.driver.timeouts.script
+        self.driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            self.driver.set_script_timeout(previous)
+
+    @timed_action
+    def wait_for_dom_stable(self, quiet_ms=None, timeout=None):
+        """
+        等待 DOM 静止：注入 MutationObserver，在 quiet_ms 毫秒内没有任何节点/属性变化时返回
+        用于替代固定 time.sleep，等待时间随页面实际渲染速度变化
+        Args:
+            quiet_ms: 判定静止所需的无变化时长(毫秒)，默认取配置 test.wait.dom_quiet_ms
+            timeout: 最长等待时间(秒)
+        Returns:
+            bool: DOM 是否在超时前静止
+        """
+        quiet_ms = self.dom_quiet_ms if quiet_ms is None else quiet_ms
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            with self._script_timeout(timeout + 1):
+                stable = self.driver.execute_async_script(_DOM_STABLE_SCRIPT, quiet_ms, int(timeout * 1000))
+            if not stable:
+                logger.warning(f"等待 DOM 静止超时({timeout}秒)，继续执行")
+            return bool(stable)
+        except WebDriverException as e:
+            # 页面跳转等情况会中断脚本，视为未静止但不影响后续流程
+            logger.warning(f"等待 DOM 静止失败: {str(e)}")
+            return False
+
+    def _install_network_hook(self):
+        """
+        通过 CDP 在每个新文档加载前注入请求计数钩子（每个 driver 只注册一次）
+        非 Chromium 驱动不支持 CDP，此时仅在调用 wait_for_network_idle 时注入当前文档
+        """
+        if getattr(self.driver, '_cms_network_hook_installed', False):
+            return
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            try:
+                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _NETWORK_HOOK_SCRIPT})
+                self.driver._cms_network_hook_installed = True
+            except WebDriverException as e:
+                logger.warning(f"注册网络请求钩子失败: {str(e)}")
+
+    @timed_action
+    def wait_for_network_idle(self, idle_ms=None, timeout=None):
+        """
+        等待网络空闲：统计进行中的 fetch/XHR 请求，数量归零并保持 idle_ms 毫秒后返回
+        钩子通过 CDP 在文档加载前注入，首次调用前已发出的请求无法统计
+        Args:
+            idle_ms: 判定空闲所需的无请求时长(毫秒)，默认取配置 test.wait.network_idle_ms
+            timeout: 最长等待时间(秒)
+        Returns:
+            bool: 网络是否在超时前空闲
+        """
+        idle_ms = self.network_idle_ms if idle_ms is None else idle_ms
+        timeout = self.timeout if timeout is None else timeout
+        self._install_network_hook()
+        try:
+            with self._script_timeout(timeout + 1):
+                idle = self.driver.execute_async_script(_NETWORK_IDLE_SCRIPT, idle_ms, int(timeout * 1000))
+            if not idle:
+                logger.warning(f"等待网络空闲超时({timeout}秒)，继续执行")
+            return bool(idle)
+        except WebDriverException as e:
+            logger.warning(f"等待网络空闲失败: {str(e)}")
+            return False
+
+    def take_screenshot(self, name, locator=None):
         """
         调用全局 screenshot 管理器进行截图
+        :param locator: 指定时只截取该元素所在区域
         """
         from utils.screenshot_manager import screenshot
-        screenshot.take_screenshot(self.driver, name)
+        element = None
+        if locator is not None:
+            try:
+                element = self.driver.find_element(*locator)
+            except WebDriverException as e:
+                logger.warning(f"截图元素未找到，截取整个可视区域: {str(e)}")
+        screenshot.take_screenshot(self.driver, name, element=element)
         
+    def record_frame(self, label):
+        """在内存中记录关键操作前后的缩略帧，用例失败时输出为胶片条"""
+        from utils.screenshot_manager import screenshot
+        screenshot.record_frame(self.driver, label)
+
+    def mark_route_start(self):
+        """SPA 路由切换前记录起点(performance.now())，传给 capture_performance 的 since"""
+        try:
+            return self.driver.execute_script("return performance.now();")
+        except WebDriverException:
+            return None
+
+    def capture_performance(self, label=None, since=None):
+        """
+        采集当前页面的 Navigation/Resource/Paint Timing
+        Args:
+            label: 页面标签，用于匹配性能预算，默认使用页面路径
+            since: mark_route_start 的返回值，为空时按整页导航采集(SPA 路由切换未取得起点时不要调用)
+        Returns:
+            dict: 性能记录，未启用或采集失败时返回None
+        """
+        from utils.page_performance import PerformanceRecorder
+        return PerformanceRecorder.get_instance().capture(self.driver, label, since)
+
     def wait_and_click(self, locator, timeout=None):
         """等待元素出现并点击"""
         if self.wait_for_element_clickable(locator, timeout):
@@ -151,13 +464,14 @@ class BasePage:
         return False
     
     
+    @timed_action
     def wait_loading_disappear(self, timeout=15):
         """
-        等待全局 loading 遮罩消失（适配 element-ui/el-loading-mask)
+        等待全局 loading 遮罩消失（适配 element-ui/el-loading-mask 与 ant-design/ant-spin)
         """
         try:
             WebDriverWait(self.driver, timeout).until_not(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.el-loading-mask'))
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.el-loading-mask, .ant-spin-spinning'))
             )
             return True
         except Exception as e:
@@ -186,79 +500,26 @@ class BasePage:
 
         return False
 
-    def set_form_value(self, value, date_icon_locator, picker_type):
+    @timed_action
+    def set_form_value(self, value, date_icon_locator, picker_type, confirm=False):
         """
         设置表单字段的值
-        :param value: 要设置的值
-        :param type: 字段类型
+        :param value: 要设置的值，YYYY-MM-DD 格式的日期列表
+        :param date_icon_locator: 日期选择器图标定位器
+        :param picker_type: 字段类型 RangePicker/DatePicker
+        :param confirm: 选择后是否点击OK按钮确认(showTime 模式)
         """
         try:
             if picker_type == 'RangePicker':
-                logger.info("设置 RangePicker 日期范围: %s", value)
-                # 先点击日期选择器图标激活组件
-                self.driver.find_element(*date_icon_locator).click()
-                # 等待日期选择器激活
-                time.sleep(2)
-
-                # 產生當前日期的字串
-                now = datetime.now()
-                today_str = now.strftime("%B %d, %Y").replace(' 0', ' ')
-
-                # 如果選擇的範圍包含今天，則直接選擇今天的日期
-                if value[0] <= today_str <= value[1]:
-                    logger.info("選擇的日期範圍包含今天，直接選擇今天的日期")
-                    today_button = (By.XPATH, "//table[@class='ant-calendar-table']//td[contains(@title, '" + today_str + "')]")
-                    self.driver.find_element(*today_button).click()
-                else:
-                    # 後期優化 -----------
-                    start_date = value[0]
-                    end_date = value[1]  
-
-                    # 解析为 datetime 对象（注意格式匹配）
-                    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
-                    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
-
-
-                    # 格式化为目标字符串 (Windows兼容格式)
-                    start_date_formatted_date = start_date_obj.strftime("%B %d, %Y").replace(' 0', ' ')
-                    end_date_formatted_date = end_date_obj.strftime("%B %d, %Y").replace(' 0', ' ')
-
-                    logger.info(f"设置 RangePicker 日期范围: {start_date_formatted_date} - {end_date_formatted_date}")
-                
-                    # 当天日期按钮的 XPath，点击当天日期按钮
-                    start_date_button = (By.XPATH, "//table[@class='ant-calendar-table']//td[contains(@title, '" + start_date_formatted_date + "')]")
-                    end_date_button = (By.XPATH, "//table[@class='ant-calendar-table']//td[contains(@title, '" + end_date_formatted_date + "')]")
-
-                    logger.info(f"点击开始日期按钮: {start_date_button}, 结束日期按钮: {end_date_button}")
-                    self.driver.find_element(*start_date_button).click()
-                    self.driver.find_element(*end_date_button).click()
-
+                return AntRangePicker(self, date_icon_locator, confirm=confirm).pick(value[0], value[1])
             elif picker_type == 'DatePicker':
-                logger.info("设置 DatePicker 日期: %s", value)
-                # 先点击日期选择器图标激活组件
-                self.driver.find_element(*date_icon_locator).click()
-                # 等待日期选择器激活
-                time.sleep(2)
-                date_obj = value[0]
-
-                # 解析为 datetime 对象（注意格式匹配）
-                date_obj = datetime.strptime(date_obj, "%Y-%m-%d")
-
-                # 格式化为目标字符串 (Windows兼容格式)
-                date_formatted = date_obj.strftime("%B %d, %Y").replace(' 0', ' ')
-
-                logger.info(f"设置 DatePicker 日期: {date_formatted}")
-
-                # 当天日期按钮的 XPath，点击当天日期按钮
-                date_button = (By.XPATH, "//table[@class='ant-calendar-table']//td[contains(@title, '" + date_formatted + "')]")
-
-                logger.info(f"点击日期按钮: {date_button}")
-                self.driver.find_element(*date_button).click()
-            return True
+                return AntDatePicker(self, date_icon_locator, confirm=confirm).pick(value[0])
+            raise ValueError(f"不支持的日期选择器类型: {picker_type}")
         except Exception as e:
             self.handle_exception(e, f"设置{picker_type}值")
             return False
         
+    @timed_action
     def scroll_to_element(
         self,
         locator=None,
@@ -339,6 +600,7 @@ class BasePage:
         
 
    
+    @timed_action
     def upload_thumbnail(self, file_path: str, element_id: str = "thumbnailImage") -> bool:
         """
         上传图片到指定元素
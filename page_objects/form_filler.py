@@ -0,0 +1,190 @@
+import ntpath
+import os
+from page_objects.ant_components import AntDatePicker, AntRangePicker, AntSelect, AntTreeSelect
+from page_objects.base_page import BATCH_LOCATOR_TYPES, LOCATE_JS
+from utils.log_manager import logger
+
+
+# 上传字段的相对路径相对于项目的 data 目录
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# 批量赋值脚本：逐个定位字段，通过原生 value setter 赋值并派发 input/change 事件，返回每个字段的回读值
+_BATCH_FILL_SCRIPT = LOCATE_JS + """
+var fields = arguments[0], results = [];
+fields.forEach(function (field) {
+    var el = locate(field[0], field[1]);
+    if (!el) { results.push({ found: false, value: null }); return; }
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    el.focus();
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, field[2]);
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    el.blur();
+    results.push({ found: true, value: el.value });
+});
+return results;
+"""
+
+
+class FormField:
+    """表单字段描述：字段名、定位器、组件类型与测试数据中的键"""
+
+    # 可在一次脚本调用中批量赋值的组件类型
+    BATCH_WIDGETS = ("input", "textarea", "number")
+
+    def __init__(self, name, locator, widget="input", data_key=None, default=None, handler=None, options=None,
+                 required=True):
+        """
+        Args:
+            name: 字段名称，用于日志与失败报告
+            locator: 元素定位器
+            widget: 组件类型 input/textarea/number/file/checkbox/select/tree_select/date/range/custom
+            data_key: 测试数据中对应的键，为None时使用 default
+            default: 测试数据缺少该键时使用的默认值，可以是无参函数（如当天日期）
+            handler: custom 组件的处理方法名（页面对象上的方法，签名为 handler(field, value) -> bool）
+            options: 传给 Ant Design 组件驱动的额外参数，如 {"confirm": True}
+            required: 为 False 时无法填写(如上传文件不存在)只记录日志并跳过，不算填写失败
+        """
+        self.name = name
+        self.locator = locator
+        self.widget = widget
+        self.data_key = data_key
+        self.default = default
+        self.handler = handler
+        self.options = options or {}
+        self.required = required
+
+    def resolve(self, data):
+        """从测试数据中取出字段值"""
+        value = data.get(self.data_key) if self.data_key is not None else None
+        if value is None:
+            value = self.default() if callable(self.default) else self.default
+        return value
+
+    @property
+    def batchable(self):
+        """是否可以批量赋值"""
+        return self.widget in self.BATCH_WIDGETS and self.locator[0] in BATCH_LOCATOR_TYPES
+
+    def __repr__(self):
+        return f"FormField({self.name!r}, widget={self.widget!r})"
+
+
+class FormFiller:
+    """
+    声明式表单填充引擎
+    按表单描述的顺序处理字段：相邻的普通输入框合并为一次脚本调用，复杂组件逐个处理，
+    并记录未能成功赋值的字段
+    """
+
+    def __init__(self, page):
+        """
+        Args:
+            page: 页面对象(BasePage子类)，复杂组件的处理方法在该对象上查找
+        """
+        self.page = page
+        self.driver = page.driver
+        self.failures = {}
+
+    def fill(self, fields, data):
+        """
+        按表单描述填充表单
+        Args:
+            fields: FormField 列表
+            data: 测试数据字典
+        Returns:
+            dict: 填写失败的字段 {字段名: 原因}，全部成功时为空
+        """
+        self.failures = {}
+        batch = []
+        for field in fields:
+            value = field.resolve(data)
+            if value is None and field.widget != "custom":
+                logger.info(f"字段 {field.name} 无测试数据，跳过")
+                continue
+            if field.batchable:
+                batch.append((field, str(value)))
+                continue
+            self._fill_batch(batch)
+            batch = []
+            self._fill_single(field, value)
+        self._fill_batch(batch)
+
+        if self.failures:
+            logger.error(f"以下表单字段填写失败: {self.failures}")
+        return self.failures
+
+    def _fill_batch(self, batch):
+        """一次脚本调用填充多个普通输入框，未生效的字段回退到逐个输入"""
+        if not batch:
+            return
+        logger.info(f"批量填写字段: {[field.name for field, _ in batch]}")
+        try:
+            results = self.driver.execute_script(
+                _BATCH_FILL_SCRIPT,
+                [[field.locator[0], field.locator[1], value] for field, value in batch]
+            )
+        except Exception as e:
+            logger.warning(f"批量填写失败，逐个填写: {str(e)}")
+            results = [{"found": False, "value": None}] * len(batch)
+
+        for (field, value), result in zip(batch, results):
+            if result.get("found") and result.get("value") == value:
+                continue
+            logger.info(f"字段 {field.name} 批量赋值未生效(实际: {result.get('value')})，回退到键盘输入")
+            if not self.page.clear_and_input_text(field.locator, value, fast=False):
+                self.failures[field.name] = f"输入未生效，期望: {value}"
+
+    def _fill_single(self, field, value):
+        """处理单个非批量字段"""
+        logger.info(f"填写字段: {field.name}")
+        try:
+            if field.widget == "file":
+                ok = self._upload(field, value)
+            elif field.widget == "checkbox":
+                ok = self._check(field, value)
+            elif field.widget == "select":
+                ok = AntSelect(self.page, field.locator, **field.options).select(value)
+            elif field.widget == "tree_select":
+                ok = AntTreeSelect(self.page, field.locator).select(value, **field.options)
+            elif field.widget == "date":
+                ok = AntDatePicker(self.page, field.locator, **field.options).pick(value)
+            elif field.widget == "range":
+                ok = AntRangePicker(self.page, field.locator, **field.options).pick(value[0], value[1])
+            elif field.widget == "custom":
+                ok = getattr(self.page, field.handler)(field, value)
+            else:
+                ok = self.page.clear_and_input_text(field.locator, str(value))
+        except Exception as e:
+            self.failures[field.name] = str(e)
+            return
+        if not ok:
+            self.failures[field.name] = "组件未接受该值"
+
+    def _upload(self, field, file_path):
+        """
+        文件上传字段，上传控件通常隐藏，直接向 input[type=file] 发送路径
+        相对路径按 data 目录解析；非必填字段的文件不存在时跳过上传
+        """
+        # 测试数据中的 Windows 绝对路径在其他平台上同样按绝对路径处理
+        if not (os.path.isabs(file_path) or ntpath.isabs(file_path)):
+            file_path = os.path.join(_DATA_DIR, file_path)
+        if not os.path.exists(file_path):
+            if not field.required:
+                logger.warning(f"文件不存在，跳过上传 {field.name}: {file_path}")
+                return True
+            logger.error(f"文件不存在: {file_path}")
+            return False
+        self.driver.find_element(*field.locator).send_keys(file_path)
+        logger.info(f"成功上传图片: {os.path.basename(file_path)}")
+        return True
+
+    def _check(self, field, checked):
+        """复选框字段：状态与期望不一致时通过脚本点击"""
+        return bool(self.driver.execute_script(
+            "var el = arguments[0];"
+            "if (el.checked !== arguments[1]) { el.click(); }"
+            "return el.checked === arguments[1];",
+            self.driver.find_element(*field.locator),
+            bool(checked)
+        ))
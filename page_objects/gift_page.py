@@ -10,7 +10,6 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 import pytest
 from page_objects.base_page import BasePage
-from data.test_data import GIFT_TEST_DATA, COPY_GIFT_TEST_DATA
 
 
 
@@ -21,8 +20,16 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from page_objects.base_page import BasePage
+from page_objects.form_filler import FormField, FormFiller
 from page_objects.login_page import LoginPage
 from utils.log_manager import logger
+from utils.run_history import timed_action
+
+
+def today():
+    """当天日期(YYYY-MM-DD)，作为表单日期字段的默认值"""
+    return BasePage.get_timestamp_suffix(fmt='shortdate')
+
 
 class GiftPage(BasePage):
     """Gift页面对象,包含所有Gift相关操作"""
@@ -112,10 +119,8 @@ class GiftPage(BasePage):
     # Gift  提交按钮
     SUBMIT_BUTTON = (By.XPATH, '//section[@id="main-layout"]//button[contains(@class, "ant-btn sino-btn") and @type="submit"]')
 
-    # 已添加的Gift名称
-    gift_name = GIFT_TEST_DATA["add_auto_gift"]["gift_name_en"]
-    ADDED_GIFT_NAME = (By.XPATH, f'//tbody[@class="ant-table-tbody"]//td[contains(@class, "ant-table-column-has-actions")]//p[text()="{gift_name}"]')
-    logger.info(f"ADDED_GIFT_NAME定位器: {ADDED_GIFT_NAME}")
+    # 列表中指定名称的Gift，测试数据名称带唯一后缀，按实际名称生成定位器
+    GIFT_NAME_CELL = '//tbody[@class="ant-table-tbody"]//td[contains(@class, "ant-table-column-has-actions")]//p[text()="{}"]'
 
 
     # Copy Gift元素
@@ -125,112 +130,104 @@ class GiftPage(BasePage):
     SEARCH_BUTTON = (By.XPATH, '//button[@type="submit"]')
     # Copy按钮
     COPY_BUTTON = (By.CSS_SELECTOR, "#main-layout > main > div > div > div > div.sc-kGXeez.dQAJzQ > div.isoInvoiceTable > div > div > div > div > div > div > table > tbody > tr > td:nth-child(15) > div > a:nth-child(3) > button")
-    # 已Copy的Gift名称
-    copy_gift_name = COPY_GIFT_TEST_DATA["copy_auto_gift"]["gift_name_en"]
-    COPIED_GIFT_NAME = (By.XPATH, f'//tbody[@class="ant-table-tbody"]//td[contains(@class, "ant-table-column-has-actions")]//p[text()="{copy_gift_name}"]')
-    logger.info(f"ADDED_GIFT_NAME定位器: {COPIED_GIFT_NAME}")
+
+    # Gift表单描述：按页面顺序排列，相邻的普通输入框会合并为一次脚本调用
+    GIFT_FORM = [
+        FormField("thumbnail", THUMBNAIL, "file", "thumbnail_file", required=False),
+        FormField("content", CONTENT, "file", "content_file", required=False),
+        FormField("remarks", REMARKS, "textarea", "remarks", default="自动化测试备注"),
+        FormField("points", POINTS_REQUIRED, "number", "points", default=100),
+        FormField("category", CATEGORY, "select", "category", default="Hotel"),
+        FormField("showing_date", SHOWING_DATE_ICON, "range", "showing_date", default=lambda: [today()] * 2),
+        FormField("redemption_date", REDEMPTION_DATE_ICON, "range", "redemption_date", default=lambda: [today()] * 2),
+        FormField("expiry_date", EXPIRY_DATE_ICON, "date", "expiry_date", default=today, options={"confirm": True}),
+        FormField("highlighted", HIGHLIGHTED, "checkbox", "highlighted", default=True),
+        FormField("gift_source", GIFT_SOURCE, "select", "gift_source", default="Purchase"),
+        FormField("value", VALUE, "number", "value"),
+        FormField("cost", COST, "number", "cost"),
+        FormField("gift_name_en", GIFT_NAME_EN, "input", "gift_name_en"),
+        FormField("gift_name_zh_hk", GIFT_NAME_ZH_HK, "input", "gift_name_zh_hk"),
+        FormField("gift_name_zh", GIFT_NAME_ZH_CN, "input", "gift_name_zh"),
+    ]
+
+    # SKU弹窗表单描述
+    SKU_FORM = [
+        FormField("mall", MALL_OPTION, "select", "mall", default="Citywalk", options={"match_attribute": "en"}),
+        FormField("location", SHOP_OPTION, "tree_select", "location", default="BSX"),
+        FormField("stock", STOCK, "number", "stock"),
+        FormField("tag_en", TAG_EN, "select", "tag_en", default="Citywalk"),
+        FormField("tag_tc", TAG_ZH, "select", "tag_tc", default="荃新天地"),
+        FormField("tag_sc", TAG_ZH_HK, "select", "tag_sc", default="荃新天地"),
+    ]
+
+    # Copy Gift需要修改的字段
+    COPY_GIFT_FORM = [
+        FormField("gift_name_en", GIFT_NAME_EN, "input", "gift_name_en"),
+        FormField("gift_name_zh_hk", GIFT_NAME_ZH_HK, "input", "gift_name_zh_hk"),
+        FormField("gift_name_zh", GIFT_NAME_ZH_CN, "input", "gift_name_zh"),
+    ]
+
+    # SKU提交后才出现的字段
+    SKU_QUOTA_FORM = [
+        FormField("sku_number", MAXIMUM_NUMBER_OF_SKU, "number", "sku_number"),
+    ]
+
+    def open_create_page(self, url):
+        """
+        打开Gift创建页面，表单可交互后采集页面性能数据(gift/create)
+        Returns:
+            bool: 表单是否在超时前可见
+        """
+        self.navigate(url)
+        logger.info(f"导航到Gift创建页面: {url}")
+        logger.info("等待页面加载完成")
+        ready = self.wait_all_visible([(By.TAG_NAME, "form"), self.REMARKS, self.POINTS_REQUIRED], timeout=10)
+        self.wait_for_network_idle()
+        self.capture_performance("gift/create")
+        return ready
+
+    def gift_name_cell(self, gift_name):
+        """列表中名称为 gift_name 的单元格定位器"""
+        return (By.XPATH, self.GIFT_NAME_CELL.format(gift_name))
+
+    def search_gift(self, url, gift_name):
+        """
+        打开Gift列表页面并按名称搜索
+        Args:
+            url: Gift列表页面URL
+            gift_name: 搜索的Gift英文名称
+        Returns:
+            bool: 列表页面是否在超时前可见
+        """
+        self.navigate(url)
+        logger.info(f"导航到Gift列表页面: {url}")
+
+        # 等待页面加载完成
+        logger.info("等待页面加载完成")
+        ready = self.wait_all_visible([(By.TAG_NAME, "form"), self.GIFT_NAME_SEARCH, self.SEARCH_BUTTON], timeout=10)
+        self.wait_for_network_idle()
+        self.capture_performance("gift/list")
+        (search_input, _), (search_button, _) = self.find_elements_batch([self.GIFT_NAME_SEARCH, self.SEARCH_BUTTON])
+
+        # 输入gift name
+        logger.info("输入gift name")
+        search_input.send_keys(gift_name)
+        # 点击Search按钮
+        logger.info("点击Search按钮")
+        search_button.click()
+        # 等待搜索请求返回
+        self.wait_for_network_idle()
+        return ready
 
     @allure.step("创建Gift")
     def add_gift(self, add_gift_info):
         """创建Gift"""
         try:
-            # 导航到Gift创建页面
-            self.driver.get(add_gift_info.get("gift_create_url"))
-            logger.info(f"导航到Gift创建页面: {add_gift_info.get('gift_create_url')}")
-
-            # 等待页面加载完成
-            logger.info("等待页面加载完成")
-            self.wait_for_element((By.TAG_NAME, "form"), timeout=10)
-            time.sleep(2)
-
-            # # 上传缩略图
-            logger.info("上传缩略图")
-            self.upload_thumbnail(add_gift_info.get("thumbnail_file"), "thumbnailImage")
-
-            # 上传内容图
-            logger.info("上传内容图")
-            self.upload_thumbnail(add_gift_info.get("content_file"), "contentImage")
-        
-            # 输入remarks
-            logger.info("输入remarks信息")
-            self.clear_and_input_text(self.REMARKS, add_gift_info.get("remarks", "自动化测试备注"))
-            
-            # 输入Points Required
-            logger.info("输入Points Required信息")
-            self.clear_and_input_text(self.POINTS_REQUIRED, str(add_gift_info.get("points", 100)))
-
-            # 选择Category为Hotel
-            logger.info("选择Category为Hotel")
-            self.find_element(self.CATEGORY).click()
-            time.sleep(1) 
-            self.find_element(self.HOTEL_OPTION).click()
-            self.find_element(self.CATEGORY_LABEL).click()
-            time.sleep(2) 
-
-            # 设置日期信息
-            logger.info("开始设置日期信息,包括Showing Date, Redemption Date和Expiry Date")
-            current_date = self.get_timestamp_suffix(fmt='shortdate')
-            logger.info(f"当前日期: {current_date}")
-            self.set_form_value(value=[current_date, current_date], date_icon_locator=self.SHOWING_DATE_ICON, picker_type='RangePicker')
-            self.set_form_value(value=[current_date, current_date], date_icon_locator=self.REDEMPTION_DATE_ICON, picker_type='RangePicker')
-            self.set_form_value(value=[current_date], date_icon_locator=self.EXPIRY_DATE_ICON, picker_type='DatePicker')
-            time.sleep(3)
-            self.find_element(self.EXPIRY_DATE_BUTTON).click()
-            time.sleep(3)
-
-            # 勾选HIGHLIGHTED复选框
-            logger.info("勾选HIGHLIGHTED复选框")
-            self.scroll_to_element(locator=self.HIGHLIGHTED, direction='down', offset=100, timeout=10)
-            # 尝试JavaScript点击HIGHLIGHTED
-            self.driver.execute_script("document.querySelector('input#highlighted').click();")
-            logger.info("JavaScript点击HIGHLIGHTED成功")
-                
-            # 选择gift source
-            self.scroll_to_element(locator=self.GIFT_SOURCE)
-            # 点击展开gift source下拉框
-            gift_source_element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(self.GIFT_SOURCE)
-            )
-            gift_source_element.click()
-            logger.info("成功点击GIFT_SOURCE下拉框")
-            time.sleep(2)
-
-            # 选择Purchase选项,输入value、cost
-            purchase_option = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(self.GIFT_SOURCE_OPTION)
-            )
-            purchase_option.click()
-            time.sleep(1)
-            self.clear_and_input_text(self.VALUE, str(add_gift_info.get("value")))
-            self.clear_and_input_text(self.COST, str(add_gift_info.get("cost")))
-
-            # 输入gift name英文名称
-            logger.info("输入gift name英文名称")
-            self.scroll_to_element(locator=self.GIFT_NAME_EN)
-            # 等待gift name英文输入框可点击
-            gift_name_en_element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(self.GIFT_NAME_EN)
-            )
-            gift_name_en_element.send_keys(add_gift_info.get("gift_name_en"))
-
-            # 输入gift name繁体名称
-            logger.info("输入gift name繁体名称")
-            self.scroll_to_element(locator=self.GIFT_NAME_ZH_HK)
-            # 等待gift name繁体中文输入框可点击
-            gift_name_zh_hk_element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(self.GIFT_NAME_ZH_HK)
-            )
-            gift_name_zh_hk_element.send_keys(add_gift_info.get("gift_name_zh_hk"))
+            # 导航到Gift创建页面并等待加载完成
+            self.open_create_page(add_gift_info.get("gift_create_url"))
 
-
-            # 输入gift name简体名称
-            logger.info("输入gift name简体名称")
-            self.scroll_to_element(locator=self.GIFT_NAME_ZH_CN)
-            # 等待gift name简体中文输入框可点击
-            gift_name_zh_cn_element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(self.GIFT_NAME_ZH_CN)
-            )
-            gift_name_zh_cn_element.send_keys(add_gift_info.get("gift_name_zh"))
+            # 按表单描述填写Gift基本信息
+            self.fill_form(self.GIFT_FORM, add_gift_info)
 
             # 点击Add按钮
             logger.info("点击Add按钮添加SKU")
@@ -242,70 +239,35 @@ class GiftPage(BasePage):
             add_button.click()
 
             # Add SKU表单
-            # Mall下拉框
-            logger.info("选择Mall")
-            self.find_element(self.MALL_OPTION).click()
-            # Mall 选项值(Citywalk)
-            self.find_element(self.SELECTED_MALL).click()
-
-            # Shop下拉框
-            logger.info("选择Shop")
-            self.find_element(self.SHOP_OPTION).click()
-            # Shop 选项值(Citywalk)
-            self.find_element(self.SELECTED_SHOP).click()
-            # 选择Location
-            time.sleep(2)
-            self.find_element(self.SELECTED_LOCATION).click()
-            # 点击shop下拉框
-            self.find_element(self.SHOP_OPTION).click()
-
-            # 输入Stock
-            logger.info("输入Stock数量")
-            self.find_element(self.STOCK).clear()
-            # 输入Stock数量
-            self.clear_and_input_text(self.STOCK, str(add_gift_info.get("stock")))
-
-            # Tag下拉框EN
-            logger.info("选择Tag下拉框EN")
-            self.find_element(self.TAG_EN).click()
-            # Tag 选项值(Citywalk)
-            self.find_element(self.TAG_EN_ACTIVE).click()
-
-            # Tag下拉框繁体中文
-            self.find_element(self.TAG_ZH).click()
-            # Tag 繁体中文选项值(荃新天地)
-            self.find_element(self.TAG_ZH_ACTIVE).click()
-            time.sleep(2)
-
-            # Tag下拉框简体中文
-            self.find_element(self.TAG_ZH_HK).click()
-            time.sleep(2)
-            # Tag 简体中文选项值(荃新天地)
-            self.find_element(self.TAG_ZH_HK_ACTIVE).click()
-    
+            self.fill_form(self.SKU_FORM, add_gift_info)
+
             # 提交SKU表单信息
             logger.info("提交SKU表单信息")
             sku_submit_button = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable(self.SKU_SUBMIT_BUTTON)
             )
+            self.record_frame("提交SKU表单")
             sku_submit_button.click()
-            time.sleep(3)
+            self.wait_for_dom_stable()
 
             # Maximum Number of SKU to redeem
-            self.MAXIMUM_NUMBER_OF_SKU = self.find_element(self.MAXIMUM_NUMBER_OF_SKU).send_keys(add_gift_info.get("sku_number"))
+            self.fill_form(self.SKU_QUOTA_FORM, add_gift_info)
 
             # # 提交Gift表单信息
             logger.info("提交Gift表单信息")
             submit_button = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable(self.SUBMIT_BUTTON)
             )   
-            time.sleep(3)
+            self.wait_for_dom_stable()
+            self.record_frame("提交Gift表单")
             submit_button.click()
+            # 等待提交请求完成
+            self.wait_for_network_idle()
 
             # 验证是否成功创建Gift
             logger.info("验证是否成功创建Gift") 
-            WebDriverWait(self.driver, 10).until(EC.visibility_of_element_located(self.ADDED_GIFT_NAME))
-            time.sleep(3)
+            WebDriverWait(self.driver, 10).until(EC.visibility_of_element_located(self.gift_name_cell(add_gift_info.get("gift_name_en"))))
+            self.wait_for_dom_stable()
             logger.info("成功提交Gift信息")
             return True
         except Exception as e:
@@ -313,27 +275,20 @@ class GiftPage(BasePage):
             return self.handle_exception(e, "创建gift")
         
 
+    @timed_action
+    def fill_form(self, fields, data):
+        """按表单描述填写表单，有字段失败时抛出异常并列出失败字段"""
+        failures = FormFiller(self).fill(fields, data)
+        if failures:
+            raise ValueError(f"表单字段填写失败: {failures}")
+
     @allure.step("创建Gift")
     def copy_gift(self, copy_gift_info, add_gift_info):
         """复制Gift"""
         try:
 
-            # 导航到Gift创建页面
-            self.driver.get(copy_gift_info.get("gift_copy_url"))
-            logger.info(f"导航到Gift列表页面: {copy_gift_info.get('gift_copy_url')}")
-
-            # 等待页面加载完成
-            logger.info("等待页面加载完成")
-            self.wait_for_element((By.TAG_NAME, "form"), timeout=10)
-            time.sleep(2)
-
-            # 输入gift name
-            logger.info("输入gift name")
-            self.find_element(self.GIFT_NAME_SEARCH).send_keys(add_gift_info.get("gift_name_en"))
-            # 点击Search按钮
-            logger.info("点击Search按钮")
-            self.find_element(self.SEARCH_BUTTON).click()
-            time.sleep(2)
+            # 在Gift列表页面搜索要复制的Gift
+            self.search_gift(copy_gift_info.get("gift_copy_url"), add_gift_info.get("gift_name_en"))
             # 水平滚动到Copy按钮
             logger.info("水平滚动到Copy按钮可见")
             self.scroll_to_element(locator=self.COPY_BUTTON, direction='right', offset=100, timeout=10)
@@ -343,37 +298,32 @@ class GiftPage(BasePage):
             copy_button = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable(self.COPY_BUTTON)
             )
-            time.sleep(2)
+            self.wait_for_dom_stable()
+            route_start = self.mark_route_start()
             copy_button.click()
-            time.sleep(2)
-
-            # 输入gift name英文名称
-            logger.info("输入gift name英文名称")
-            self.scroll_to_element(locator=self.GIFT_NAME_EN, direction='down', offset=100, timeout=10)
-            # 等待gift name英文输入框可点击
-            self.clear_and_input_text(self.GIFT_NAME_EN, copy_gift_info.get("gift_name_en"))
-            # 输入gift name繁体名称
-            logger.info("输入gift name繁体名称")
-            self.scroll_to_element(locator=self.GIFT_NAME_ZH_HK, direction='down', offset=100, timeout=10)
-            # 等待gift name繁体中文输入框可点击
-            self.clear_and_input_text(self.GIFT_NAME_ZH_HK, copy_gift_info.get("gift_name_zh_hk"))
-            # 输入gift name简体名称
-            logger.info("输入gift name简体名称")
-            self.scroll_to_element(locator=self.GIFT_NAME_ZH_CN, direction='down', offset=100, timeout=10)
-            # 等待gift name简体中文输入框可点击
-            self.clear_and_input_text(self.GIFT_NAME_ZH_CN, copy_gift_info.get("gift_name_zh"))
+            # 等待Gift详情数据加载完成，SPA 路由切换不会重新导航，从点击时刻开始计时
+            self.wait_for_network_idle()
+            # 未取得起点时按整页导航计算会把页面打开以来的时间都算进去，跳过采集
+            if route_start is not None:
+                self.capture_performance("gift/copy", since=route_start)
+
+            # 输入gift name英文、繁体、简体名称
+            self.fill_form(self.COPY_GIFT_FORM, copy_gift_info)
 
             # 提交Gift表单信息
             submit_button = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable(self.SUBMIT_BUTTON)
             )   
-            time.sleep(3)
+            self.wait_for_dom_stable()
+            self.record_frame("提交Gift表单")
             submit_button.click()
+            # 等待提交请求完成
+            self.wait_for_network_idle()
 
             # 验证是否成功复制Gift
             logger.info("验证是否成功复制Gift")
-            self.wait_for_element(self.COPIED_GIFT_NAME, timeout=10)
-            time.sleep(3)
+            self.wait_for_element(self.gift_name_cell(copy_gift_info.get("gift_name_en")), timeout=10)
+            self.wait_for_dom_stable()
             logger.info("成功提交Gift信息")
             return True
         except Exception as e:
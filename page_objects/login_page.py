@@ -1,5 +1,4 @@
 import allure
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
@@ -24,7 +23,7 @@ class LoginPage(BasePage):
             self.open()
             
             # 等待页面完全加载
-            time.sleep(2)
+            self.wait_for_dom_stable()
 
             # 输入账号密码
             username_element = WebDriverWait(self.driver, 10).until(
@@ -43,4 +42,14 @@ class LoginPage(BasePage):
             self.wait_for_element(self.COLLECT_GIFT_BUTTON, timeout=timeout)
             return True
         except Exception as e:
-            return self.handle_exception(e, "登录操作")
\ No newline at end of file
+            return self.handle_exception(e, "登录操作")
+
+    def is_logged_in(self, timeout: int = 5) -> bool:
+        """检查当前页面是否处于已登录状态（Collect Gift按钮可见）"""
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.visibility_of_element_located(self.COLLECT_GIFT_BUTTON)
+            )
+            return True
+        except TimeoutException:
+            return False
@@ -27,7 +27,8 @@ class TestRunner:
         """配置日志记录"""
         self.logs_dir.mkdir(exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = self.logs_dir / f"test_{timestamp}.log"
+        # 运行器日志与 pytest 进程的 test_*.log 分开，避免同一秒启动时写入同一文件
+        log_file = self.logs_dir / f"runner_{timestamp}.log"
         
         logging.basicConfig(
             level=logging.INFO,
@@ -113,6 +114,12 @@ class TestRunner:
         # 测试控制参数
         if args.parallel:
             cmd.extend(["-n", str(args.parallel)])
+            if args.balance:
+                cmd.append("--balance")
+        if args.shard:
+            cmd.extend(["--shard", args.shard])
+        if args.cassette:
+            cmd.extend(["--cassette", args.cassette])
         if args.markers:
             cmd.extend(["-m", args.markers])
         if args.reruns:
@@ -191,6 +198,208 @@ class TestRunner:
             logger.error(f"测试执行异常: {str(e)}", exc_info=True)
             return 1
     
+    def sweep_orphans(self, env):
+        """按配置的名称前缀，通过接口清理共享环境中历史遗留的测试数据"""
+        from utils.api_client import CmsApiClient
+        from utils.config_manager import ConfigManager
+        from utils.entity_registry import EntityRegistry
+
+        logger = logging.getLogger(__name__)
+        cleanup_config = ConfigManager.get_instance()._config.get("api", {}).get("cleanup", {})
+        prefixes = cleanup_config.get("sweep_prefixes", [])
+        if not prefixes:
+            print("未配置 api.cleanup.sweep_prefixes，跳过清理")
+            return 0
+
+        print(f"开始清理 {env} 环境中名称以 {prefixes} 开头的测试数据...")
+        client = CmsApiClient.from_config(env)
+        try:
+            result = EntityRegistry().sweep_orphans(
+                client,
+                prefixes,
+                min_age=cleanup_config.get("sweep_min_age", 3600),
+                batch_size=cleanup_config.get("batch_size", 20),
+                max_workers=cleanup_config.get("max_workers", 5)
+            )
+        except Exception as e:
+            print(f"清理遗留数据失败: {str(e)}")
+            logger.error(f"清理遗留数据失败: {str(e)}", exc_info=True)
+            return 1
+        finally:
+            client.close()
+
+        print(f"清理完成！删除 {result['deleted']} 条，失败 {len(result['failed'])} 条，"
+              f"保留 {result['skipped']} 条较新的数据")
+        return 1 if result["failed"] else 0
+
+    def show_history(self, limit=10):
+        """展示最近的运行结果、用例耗时趋势以及步骤 p95 耗时退化"""
+        from utils.config_manager import ConfigManager
+        from utils.run_history import RunHistory
+
+        history_config = ConfigManager.get_instance().get_test_config().get("history", {})
+        db_path = self.project_root / history_config.get("db", "reports/history.db")
+        if not db_path.exists():
+            print(f"未找到运行历史: {db_path}")
+            return 1
+        history = RunHistory(str(db_path))
+
+        runs = history.recent_runs(limit)
+        print(f"最近 {len(runs)} 次运行:")
+        print(f"{'运行':<24}{'环境':<6}{'用例':>6}{'通过':>6}{'失败':>6}{'跳过':>6}{'总耗时(秒)':>12}")
+        for run in runs:
+            print(f"{run['run_id']:<24}{run['env'] or '-':<6}{run['total']:>6}{run['passed'] or 0:>6}"
+                  f"{run['failed'] or 0:>6}{run['skipped'] or 0:>6}{run['duration']:>12.1f}")
+        print("-" * 67)
+
+        print("用例耗时趋势(按平均耗时排序):")
+        print(f"{'平均(秒)':>10}{'最近(秒)':>10}{'失败次数':>10}  用例")
+        for trend in history.test_trends(limit):
+            print(f"{trend['average']:>10.2f}{trend['latest']:>10.2f}{trend['failed']:>10}  {trend['nodeid']}")
+        print("-" * 60)
+
+        baseline_runs = history_config.get("baseline_runs", 10)
+        ratio = history_config.get("regression_ratio", 1.2)
+        regressions = history.step_regressions(baseline_runs, ratio)
+        if not regressions:
+            print(f"最近一次运行没有 p95 耗时超过基线 {ratio} 倍的步骤")
+            return 0
+        print(f"p95 耗时退化的步骤(对比之前 {baseline_runs} 次运行):")
+        print(f"{'基线p95(秒)':>12}{'最近p95(秒)':>12}{'倍数':>8}  步骤")
+        for item in regressions:
+            print(f"{item['baseline_p95']:>12.3f}{item['latest_p95']:>12.3f}{item['ratio']:>8.2f}  {item['step']}")
+        return 0
+
+    def run_load(self, args):
+        """并发压测：多个无头浏览器同时执行登录、打开Gift创建页与Gift列表搜索流程"""
+        from conftest import launch_driver, safe_close_driver
+        from page_objects.gift_page import GiftPage
+        from page_objects.login_page import LoginPage
+        from utils.config_manager import ConfigManager
+        from utils.load_runner import LoadRunner
+        from utils.process_reaper import ProcessReaper
+        from utils.stub_server import CmsStubServer
+
+        config = ConfigManager.get_instance()
+        load_config = config._config.get("load", {})
+        stub = None
+        if args.stub:
+            # 本地后台页面替身，用于离线验证压测流程本身
+            stub = CmsStubServer(latency=load_config.get("stub_latency", 0)).start()
+            base_url, username, password = stub.site_url, "stub", "stub"
+        else:
+            env_config = config.get_env_config(args.env)
+            base_url, username, password = env_config.get("url", ""), env_config.get("username"), env_config.get("password")
+        base_url = base_url.rstrip("/") + "/"
+        keyword = load_config.get("search_keyword", "Auto Test Gift")
+
+        def login(driver, user, iteration):
+            page = LoginPage(driver)
+            page.base_url = base_url
+            return page.login(username, password)
+
+        def open_create_page(driver, user, iteration):
+            return GiftPage(driver).open_create_page(base_url + "gift/create")
+
+        def search_gift(driver, user, iteration):
+            return GiftPage(driver).search_gift(base_url + "gift", keyword)
+
+        if args.duration is not None:
+            iterations, duration = args.iterations, args.duration
+        else:
+            iterations, duration = args.iterations or load_config.get("iterations", 1), load_config.get("duration")
+        runner = LoadRunner(
+            driver_factory=lambda: launch_driver(args.browser, True, config._config),
+            setup_steps=[("login", login)],
+            steps=[("gift/create", open_create_page), ("gift/search", search_gift)],
+            users=args.load or load_config.get("users", 1),
+            ramp_up=args.ramp_up if args.ramp_up is not None else load_config.get("ramp_up", 0),
+            think_time=tuple(args.think_time or load_config.get("think_time", [0, 0])),
+            iterations=iterations,
+            duration=duration,
+            driver_closer=lambda driver: safe_close_driver(driver, args.fast_close)
+        )
+        print(f"开始压测: {runner.users} 个虚拟用户 -> {base_url}")
+        try:
+            result = runner.run()
+        finally:
+            ProcessReaper.get_instance().wait_all()
+            if stub:
+                stub.stop()
+        result["base_url"] = base_url
+        path = LoadRunner.save(result, str(self.project_root / load_config.get("output_dir", "reports/load")))
+
+        print("-" * 60)
+        print(f"迭代 {result['iterations']} 次(失败 {result['failed_iterations']})，"
+              f"耗时 {result['elapsed']:.1f} 秒，吞吐量 {result['throughput']:.2f} 次/秒，错误率 {result['error_rate']:.1%}")
+        print(f"{'步骤':<16}{'次数':>6}{'错误率':>8}{'p50':>8}{'p90':>8}{'p95':>8}{'p99':>8}{'最大':>8}  (秒)")
+        for name, step in result["steps"].items():
+            print(f"{name:<16}{step['count']:>6}{step['error_rate']:>8.1%}{step['p50']:>8.2f}{step['p90']:>8.2f}"
+                  f"{step['p95']:>8.2f}{step['p99']:>8.2f}{step['max']:>8.2f}")
+        slowest = sorted(result["actions"].items(), key=lambda item: -item[1]["p95"])[:10]
+        if slowest:
+            print("页面操作 p95 耗时(前10):")
+            for action, stats in slowest:
+                print(f"{stats['p95']:>8.2f}  {action} ({stats['count']} 次)")
+        for message, count in result["errors"].items():
+            print(f"错误 x{count}: {message}")
+        print(f"压测结果已保存: {path}")
+        return 1 if result["error_rate"] > load_config.get("max_error_rate", 0.05) else 0
+
+    def run_benchmark(self, args):
+        """在本地静态复刻页面上对 BasePage 基础操作做基准测试，并与基线比较"""
+        import tempfile
+        from conftest import launch_driver, safe_close_driver
+        from utils.benchmark import BenchmarkRunner, environment_info, run_base_page_benchmarks
+        from utils.config_manager import ConfigManager
+        from utils.stub_server import StaticSiteServer
+
+        config = ConfigManager.get_instance()
+        bench_config = config._config.get("benchmark", {})
+        runner = BenchmarkRunner(args.benchmark or bench_config.get("iterations", 30), bench_config.get("warmup", 3))
+        fixture_dir = self.project_root / bench_config.get("fixture_dir", "data/fixture_app")
+        baseline_path = self.project_root / bench_config.get("baseline", "data/benchmark_baseline.json")
+
+        driver = launch_driver(args.browser, True, config._config)
+        try:
+            with StaticSiteServer(str(fixture_dir)) as site, tempfile.TemporaryDirectory() as work_dir:
+                run_base_page_benchmarks(runner, driver, site.url, work_dir)
+            environment = environment_info(driver)
+        finally:
+            safe_close_driver(driver, args.fast_close)
+
+        baseline = BenchmarkRunner.load_baseline(str(baseline_path))
+        comparison = runner.compare(baseline or {}, bench_config.get("tolerance", 1.25),
+                                    bench_config.get("min_delta_ms", 5))
+        output = self.project_root / bench_config.get("output_dir", "reports/benchmark") / \
+            f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        runner.save(str(output), environment=environment, comparison=comparison)
+
+        print("-" * 60)
+        print(f"{'操作':<30}{'p50(ms)':>10}{'p95(ms)':>10}{'失败':>6}{'基线p50':>10}{'倍数':>8}")
+        compared = {item["name"]: item for item in comparison}
+        for name, result in runner.results.items():
+            item = compared.get(name)
+            base = f"{item['baseline_p50']:>10.1f}{item['ratio']:>8.2f}" if item else f"{'-':>10}{'-':>8}"
+            flag = "  退化" if item and item["regression"] else ""
+            print(f"{name:<30}{result['p50']:>10.1f}{result['p95']:>10.1f}{result['failures']:>6}{base}{flag}")
+        print(f"基准测试结果已保存: {output}")
+
+        if args.update_baseline:
+            runner.save(str(baseline_path), environment=environment)
+            print(f"基线已更新: {baseline_path}")
+            return 0
+        if baseline is None:
+            print(f"未找到基线 {baseline_path}，使用 --update-baseline 保存本次结果作为基线")
+            return 0
+        regressions = [item["name"] for item in comparison if item["regression"]]
+        failures = [name for name, result in runner.results.items() if result["failures"]]
+        if regressions:
+            print(f"性能退化: {', '.join(regressions)}")
+        if failures:
+            print(f"执行失败: {', '.join(failures)}")
+        return 1 if regressions or failures else 0
+
     def generate_allure_report(self):
         """生成Allure报告"""
         print("生成Allure报告...")
@@ -307,6 +516,31 @@ def main():
   
   # 启动Allure报告服务
   python run_tests.py --serve-report
+  
+  # 4个进程并行，按历史耗时均衡分配用例
+  python run_tests.py --parallel 4 --balance
+  
+  # CI 分3台机器运行，本机运行第1片
+  python run_tests.py --shard 1/3
+  
+  # 录制UAT后台接口响应，之后离线回放只验证界面
+  python run_tests.py --cassette record
+  python run_tests.py --cassette replay
+  
+  # 查看最近20次运行的耗时趋势与步骤退化
+  python run_tests.py --history 20
+  
+  # 10个无头浏览器并发压测，30秒内爬坡，每个用户运行5分钟
+  python run_tests.py --load 10 --ramp-up 30 --duration 300
+  
+  # 在本地后台页面替身上离线验证压测流程
+  python run_tests.py --load 3 --stub
+  
+  # BasePage 基础操作基准测试(每个操作50次)，与基线比较
+  python run_tests.py --benchmark 50
+  
+  # 清理共享环境中遗留的自动化测试数据
+  python run_tests.py --env uat --sweep-orphans
         """
     )
     
@@ -332,6 +566,16 @@ def main():
     parser.add_argument("--parallel", type=int,
                        help="并行执行进程数 (需要pytest-xdist)")
     
+    parser.add_argument("--balance", action="store_true",
+                       help="按历史耗时(LPT)把用例均衡分配到各并行进程，配合 --parallel 使用")
+    
+    parser.add_argument("--shard",
+                       help="按历史耗时分片，只运行第 i 片，如 1/3（用于CI多机并行）")
+    
+    parser.add_argument("--cassette", choices=["off", "record", "replay"],
+                       help="接口录制回放: record 录制页面的 XHR/fetch 响应，replay 从录制文件回放这些响应；"
+                            "页面、脚本与会话级登录仍访问真实环境，回放不能离线运行")
+    
     parser.add_argument("--reruns", type=int, default=0,
                        help="失败重跑次数")
     
@@ -358,6 +602,38 @@ def main():
     parser.add_argument("--fast-close", action="store_true",
                        help="启用快速关闭模式，强制终止浏览器进程避免关闭缓慢（推荐）")
     
+    parser.add_argument("--history", type=int, nargs="?", const=10,
+                       help="展示最近 N 次(默认10)运行的结果、用例耗时趋势与步骤 p95 退化后退出")
+    
+    # 压测参数
+    parser.add_argument("--load", type=int, nargs="?", const=0,
+                       help="并发压测模式，N 为虚拟用户数(默认取 load.users)，运行登录与Gift页面流程后输出吞吐量、耗时分位数与错误率")
+    
+    parser.add_argument("--ramp-up", type=float,
+                       help="压测爬坡时间(秒)，虚拟用户在此时间内均匀启动")
+    
+    parser.add_argument("--think-time", type=float, nargs=2, metavar=("MIN", "MAX"),
+                       help="压测步骤之间的随机思考时间范围(秒)")
+    
+    parser.add_argument("--iterations", type=int,
+                       help="压测中每个虚拟用户的迭代次数")
+    
+    parser.add_argument("--duration", type=float,
+                       help="压测最长运行时间(秒)")
+    
+    parser.add_argument("--stub", action="store_true",
+                       help="压测本地后台页面替身而不是真实环境，用于离线验证压测流程")
+    
+    # 基准测试参数
+    parser.add_argument("--benchmark", type=int, nargs="?", const=0,
+                       help="在本地静态复刻页面上对 BasePage 基础操作做基准测试，N 为每个操作的执行次数(默认取 benchmark.iterations)")
+    
+    parser.add_argument("--update-baseline", action="store_true",
+                       help="将本次基准测试结果保存为基线，配合 --benchmark 使用")
+    
+    parser.add_argument("--sweep-orphans", action="store_true",
+                       help="按 api.cleanup.sweep_prefixes 清理环境中遗留的测试数据后退出")
+    
     args = parser.parse_args()
     
     # 创建测试运行器
@@ -368,6 +644,22 @@ def main():
         runner.serve_allure_report(args.port)
         return
     
+    # 如果只是查看运行历史
+    if args.history:
+        sys.exit(runner.show_history(args.history))
+    
+    # 基准测试模式
+    if args.benchmark is not None:
+        sys.exit(runner.run_benchmark(args))
+    
+    # 压测模式
+    if args.load is not None:
+        sys.exit(runner.run_load(args))
+    
+    # 如果只是清理遗留数据
+    if args.sweep_orphans:
+        sys.exit(runner.sweep_orphans(args.env))
+    
     # 运行测试
     exit_code = runner.run_tests(args)
     sys.exit(exit_code)
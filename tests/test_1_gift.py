@@ -8,10 +8,16 @@ import allure
 import time
 from selenium.webdriver.common.by import By
 from page_objects.gift_page import GiftPage
-from data.test_data import GIFT_TEST_DATA, COPY_GIFT_TEST_DATA
+from data.test_data import COPY_GIFT_TEST_DATA
+from utils.data_seeder import with_unique_names
+from utils.config_manager import ConfigManager
 from utils.log_manager import logger
 
 
+# 启用接口造数时 Copy 用例使用接口创建的Gift，不再依赖 test_add_gift
+SEED_ENABLED = ConfigManager.get_instance()._config.get('api', {}).get('seed', {}).get('enabled', False)
+
+
 @allure.epic("Gift管理")
 @allure.feature("Gift功能")
 class TestGift:
@@ -29,8 +35,7 @@ class TestGift:
     @allure.title("测试创建Gift功能")
     @allure.description("测试用户是否能够成功创建Gift")
     @allure.severity(allure.severity_level.CRITICAL)
-    @pytest.mark.run(order=1)  # 第一个执行
-    def test_add_gift(self, session_logged_in_driver):
+    def test_add_gift(self, session_logged_in_driver, ui_gift_data, entity_registry):
         """
         测试User能否正常创建Gift
         
@@ -48,14 +53,15 @@ class TestGift:
         # 初始化Gift页面对象
         gift_page = GiftPage(session_logged_in_driver)
         
-        # 获取测试数据
-        add_gift_data = GIFT_TEST_DATA["add_auto_gift"]
+        # 获取测试数据（名称带本次会话唯一的后缀）
+        add_gift_data = ui_gift_data
 
         # 执行创建Gift操作
         result = gift_page.add_gift(add_gift_data)
         
         # 验证结果
         assert result, "创建Gift失败"
+        entity_registry.register("gift", name=add_gift_data["gift_name_en"])
         logger.info("Gift创建测试通过")
 
 
@@ -63,8 +69,8 @@ class TestGift:
     @allure.title("测试Copy Gift功能")
     @allure.description("测试用户是否能够成功Copy Gift")
     @allure.severity(allure.severity_level.CRITICAL)
-    @pytest.mark.run(order=2)  # 第二个执行
-    def test_copy_gift(self, session_logged_in_driver):
+    @pytest.mark.depends_on("test_add_gift", condition=not SEED_ENABLED)  # 未开启接口造数时复制 test_add_gift 创建的Gift
+    def test_copy_gift(self, session_logged_in_driver, seeded_gift, entity_registry):
         """
         测试User能否正常Copy Gift
         
@@ -84,12 +90,12 @@ class TestGift:
         gift_page = GiftPage(session_logged_in_driver)
         
         # 获取测试数据
-        copy_gift_data = COPY_GIFT_TEST_DATA["copy_auto_gift"]
-        add_gift_data = GIFT_TEST_DATA["add_auto_gift"]
+        copy_gift_data = with_unique_names(COPY_GIFT_TEST_DATA["copy_auto_gift"])
 
-        # 执行创建Gift操作
-        result = gift_page.copy_gift(copy_gift_data,add_gift_data)
+        # 执行Copy Gift操作（被复制的Gift由 seeded_gift 准备）
+        result = gift_page.copy_gift(copy_gift_data, seeded_gift)
 
         # 验证结果
         assert result, "Copy Gift失败"
+        entity_registry.register("gift", name=copy_gift_data["gift_name_en"])
         logger.info("Gift Copy测试通过")
\ No newline at end of file
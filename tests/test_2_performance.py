@@ -0,0 +1,59 @@
+"""
+页面性能测试用例
+按 config.yaml 中 performance.budgets 断言关键页面的加载耗时
+"""
+
+import pytest
+import allure
+from page_objects.gift_page import GiftPage
+from data.test_data import GIFT_TEST_DATA
+from utils.page_performance import PerformanceRecorder
+from utils.log_manager import logger
+
+
+@allure.epic("Gift管理")
+@allure.feature("页面性能")
+@pytest.mark.performance
+class TestGiftPerformance:
+    """Gift页面性能测试类"""
+
+    @allure.story("创建页性能")
+    @allure.title("测试Gift创建页在预算内可交互")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.ui
+    def test_create_page_budget(self, session_logged_in_driver, page_performance):
+        """
+        测试Gift创建页的加载性能
+
+        步骤:
+        1. 打开Gift创建页面，等待表单可交互
+        2. 断言 gift/create 的性能指标不超过预算
+        """
+        ready = GiftPage(session_logged_in_driver).open_create_page(GIFT_TEST_DATA["add_auto_gift"]["gift_create_url"])
+        assert ready, "Gift创建页表单未加载"
+        for record in page_performance.records():
+            logger.info(f"{record['label']} 可交互耗时: {record['interactive_ms']:.0f}ms")
+        page_performance.assert_budgets()
+
+
+@allure.epic("测试框架")
+@allure.feature("页面性能")
+@pytest.mark.framework
+class TestPerformanceBudgets:
+    """性能预算检查测试类(离线)"""
+
+    @allure.story("性能预算")
+    @allure.title("测试超出预算的指标会被报告")
+    def test_budget_violations(self):
+        """预算按标签或路径片段匹配，只报告超出上限的指标"""
+        recorder = PerformanceRecorder(enabled=False, budgets={"gift/create": {"interactive_ms": 2000}})
+        records = [
+            {"label": "gift/create", "path": "/gift/create", "interactive_ms": 2500.0,
+             "resources": {"count": 12, "transfer_size": 0}},
+            {"label": "gift/list", "path": "/gift/list", "interactive_ms": 3000.0},
+            {"label": "gift", "path": "/#/gift/create", "interactive_ms": 1500.0},
+        ]
+        violations = recorder.check_budgets(records)
+        assert violations == ["gift/create interactive_ms=2500 超出预算 2000"]
+        assert recorder.check_budgets(records, {"gift/create": {"resource_count": 10}}) == \
+            ["gift/create resource_count=12 超出预算 10"]
@@ -0,0 +1,44 @@
+"""
+接口录制文件测试
+请求匹配键、重复请求的顺序回放与录制文件读写
+"""
+
+import os
+import pytest
+import allure
+from utils.api_cassette import Cassette, cassette_path
+
+
+@allure.epic("测试框架")
+@allure.feature("接口录制回放")
+@pytest.mark.framework
+class TestCassette:
+    """接口录制文件测试类"""
+
+    def test_match_ignores_host_and_cache_busting_params(self, tmp_path):
+        """匹配不区分域名与查询参数顺序，忽略配置的防缓存参数"""
+        cassette = Cassette(str(tmp_path / "c.json"), ignore_params=["_"])
+        cassette.add("GET", "https://uat.example.com/api/gift?title=a&page=1&_=1", None, 200, [], b"[]")
+        entry = cassette.match("GET", "http://127.0.0.1/api/gift?page=1&title=a&_=2")
+        assert entry is not None and entry["status"] == 200
+        assert cassette.match("GET", "http://127.0.0.1/api/gift?page=2&title=a") is None
+
+    def test_repeated_requests_replay_in_order(self, tmp_path):
+        """同一请求录制多次时按顺序回放，用完后重复最后一次；请求体不同时退回按URL匹配"""
+        path = str(tmp_path / "env" / "c.json")
+        cassette = Cassette(path)
+        cassette.add("POST", "https://uat/api/gift", '{"n": 1}', 201, [{"name": "Content-Length", "value": "2"}], b"1")
+        cassette.add("POST", "https://uat/api/gift", '{"n": 2}', 201, [], b"2")
+        cassette.save()
+
+        replay = Cassette(path)
+        assert replay.entries[0]["headers"] == []
+        assert replay.match("POST", "https://uat/api/gift", '{"n": 2}')["body"] == "Mg=="
+        bodies = [replay.match("POST", "https://uat/api/gift", '{"n": 3}')["body"] for _ in range(3)]
+        assert bodies == ["MQ==", "Mg==", "Mg=="]
+        assert Cassette(path, load=False).entries == []
+
+    def test_cassette_path_per_test(self):
+        """录制文件按 环境/测试模块/用例名 存放"""
+        path = cassette_path("cassettes", "uat", "tests/test_1_gift.py::TestGift::test_add_gift[a b]")
+        assert path == os.path.join("cassettes", "uat", "tests", "test_1_gift", "TestGift.test_add_gift_a_b_.json")
@@ -0,0 +1,103 @@
+"""
+接口数据准备与清理测试
+使用本地 CMS 桩服务离线验证接口客户端、数据准备与清理逻辑
+"""
+
+import time
+import pytest
+import allure
+import requests
+from utils.api_client import CmsApiClient
+from utils.data_seeder import DataSeeder
+from utils.entity_registry import EntityRegistry
+from utils.stub_server import CmsStubServer
+from data.test_data import GIFT_TEST_DATA
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """启动本地 CMS 桩服务"""
+    with CmsStubServer(username="tester", password="secret") as server:
+        yield server
+
+
+@pytest.fixture
+def stub_client(stub_server):
+    """连接桩服务的接口客户端"""
+    client = CmsApiClient(stub_server.url, username="tester", password="secret")
+    yield client
+    client.close()
+
+
+@allure.epic("测试框架")
+@allure.feature("接口数据准备")
+@pytest.mark.api
+@pytest.mark.framework
+class TestApiSeeding:
+    """接口数据准备测试类"""
+
+    def test_seed_gift_creates_unique_gift(self, stub_server, stub_client):
+        """通过接口创建的Gift名称唯一，并携带接口返回的id"""
+        seeder = DataSeeder(stub_client)
+        first = seeder.seed_gift(GIFT_TEST_DATA["add_auto_gift"])
+        second = seeder.seed_gift(GIFT_TEST_DATA["add_auto_gift"])
+
+        assert first["id"] != second["id"]
+        assert first["gift_name_en"] != second["gift_name_en"]
+        assert first["gift_name_en"].startswith(GIFT_TEST_DATA["add_auto_gift"]["gift_name_en"])
+        stored = stub_client.get_gift(first["id"])
+        assert stored["title"]["en"] == first["gift_name_en"]
+        assert stored["pointsNeeded"] == int(GIFT_TEST_DATA["add_auto_gift"]["points"])
+
+    def test_delete_gift(self, stub_server, stub_client):
+        """删除后的Gift无法再查询"""
+        gift = DataSeeder(stub_client).seed_gift(GIFT_TEST_DATA["add_auto_gift"])
+        stub_client.delete_gift(gift["id"])
+
+        with pytest.raises(requests.HTTPError):
+            stub_client.get_gift(gift["id"])
+
+    def test_invalid_credentials_rejected(self, stub_server):
+        """账号错误时登录失败"""
+        client = CmsApiClient(stub_server.url, username="tester", password="wrong")
+        with pytest.raises(requests.HTTPError):
+            client.create_gift({})
+        client.close()
+
+
+@allure.epic("测试框架")
+@allure.feature("接口数据清理")
+@pytest.mark.api
+@pytest.mark.framework
+class TestEntityCleanup:
+    """测试数据批量清理测试类"""
+
+    def test_cleanup_deletes_registered_entities(self, stub_server, stub_client):
+        """按 id 与按名称登记的数据都会被删除，会话开始前创建的同名数据保留"""
+        older = stub_client.create_gift({"title": {"en": "UI Created Gift"}, "createdAt": int((time.time() - 3600) * 1000)})
+        registry = EntityRegistry()
+        seeded = DataSeeder(stub_client, registry).seed_gift(GIFT_TEST_DATA["add_auto_gift"])
+        ui_gift = stub_client.create_gift({"title": {"en": "UI Created Gift"}})
+        registry.register("gift", name="UI Created Gift")
+
+        result = registry.cleanup(stub_client, batch_size=1, max_workers=2)
+
+        assert result == {"deleted": 2, "failed": []}
+        assert str(seeded["id"]) not in stub_server.store["gift"]
+        assert str(ui_gift["id"]) not in stub_server.store["gift"]
+        assert str(older["id"]) in stub_server.store["gift"]
+        assert registry.entities() == []
+
+    def test_sweep_orphans_by_prefix(self, stub_server, stub_client):
+        """逐页清理名称以指定前缀开头的旧数据，保留刚创建的数据"""
+        old = int((time.time() - 7200) * 1000)
+        orphans = [stub_client.create_gift({"title": {"en": f"Sweep Me {i}"}, "createdAt": old}) for i in range(5)]
+        keep = stub_client.create_gift({"title": {"en": "Keep Sweep Me"}, "createdAt": old})
+        running = stub_client.create_gift({"title": {"en": "Sweep Me running"}})
+
+        result = EntityRegistry().sweep_orphans(stub_client, ["Sweep Me"], min_age=3600, page_size=2)
+
+        assert result["deleted"] == 5 and result["skipped"] == 1
+        assert all(str(gift["id"]) not in stub_server.store["gift"] for gift in orphans)
+        assert str(keep["id"]) in stub_server.store["gift"]
+        assert str(running["id"]) in stub_server.store["gift"]
@@ -0,0 +1,54 @@
+"""
+基准测试工具测试
+计时统计、基线比较，以及 data/fixture_app 静态复刻站点能否正常提供页面
+"""
+
+import os
+import pytest
+import allure
+import requests
+from utils.benchmark import BenchmarkRunner
+from utils.stub_server import StaticSiteServer
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fixture_app")
+
+
+@allure.epic("测试框架")
+@allure.feature("基准测试")
+@pytest.mark.framework
+class TestBenchmarkRunner:
+    """基准测试运行器测试类"""
+
+    def test_measure_counts_failures(self):
+        """返回 False 或抛出异常都计为失败，预热不计入结果"""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) % 3 == 0:
+                raise RuntimeError("boom")
+            return len(calls) % 3 != 1
+
+        result = BenchmarkRunner(iterations=6, warmup=2).measure("flaky", flaky)
+        assert len(calls) == 8
+        assert result["iterations"] == 6
+        assert result["failures"] == 4
+        assert result["min"] <= result["p50"] <= result["p95"] <= result["max"]
+
+    def test_compare_flags_only_significant_regressions(self):
+        """p50 超过基线倍数且差值超过阈值才算退化，基线中没有的操作不比较"""
+        runner = BenchmarkRunner()
+        runner.results = {"slow": {"p50": 40.0}, "jitter": {"p50": 3.0}, "new": {"p50": 1.0}}
+        baseline = {"slow": {"p50": 20.0}, "jitter": {"p50": 1.0}}
+        comparison = {item["name"]: item for item in runner.compare(baseline, tolerance=1.25, min_delta_ms=5)}
+        assert comparison["slow"]["regression"] and comparison["slow"]["ratio"] == 2.0
+        assert not comparison["jitter"]["regression"]
+        assert "new" not in comparison
+
+    def test_static_site_serves_fixture_pages(self):
+        """静态站点提供登录页、Gift表单与列表的复刻"""
+        with StaticSiteServer(FIXTURE_DIR) as site:
+            assert 'id="username"' in requests.get(site.url + "login.html").text
+            assert 'id="thumbnailImage"' in requests.get(site.url + "gift_form.html").text
+            assert "ant-table-tbody" in requests.get(site.url + "gift_list.html").text
@@ -0,0 +1,41 @@
+"""
+浏览器磁盘缓存测试
+在临时目录中检查缓存槽位的独占、复用与按最近使用时间淘汰
+"""
+
+import os
+import pytest
+import allure
+from utils.browser_cache import BrowserCache
+
+
+@allure.epic("测试框架")
+@allure.feature("浏览器磁盘缓存")
+@pytest.mark.framework
+class TestBrowserCache:
+    """浏览器磁盘缓存测试类"""
+
+    def test_slots_are_exclusive_and_reused(self, tmp_path):
+        """同时使用的浏览器分配不同槽位，释放后优先复用最近使用的槽位"""
+        cache = BrowserCache(str(tmp_path), slot_size_mb=1)
+        first, second = cache.acquire(), cache.acquire()
+        assert first != second
+        assert f"--disk-cache-dir={first}" in cache.chrome_arguments(first)
+        cache.release(first)
+        os.utime(os.path.join(first, ".last_used"), (1, 1))
+        cache.release(second)
+        assert cache.acquire() == second
+
+    def test_evict_removes_least_recently_used_idle_slots(self, tmp_path):
+        """超过总大小上限时从最久未使用的空闲槽位开始删除，正在使用的槽位保留"""
+        cache = BrowserCache(str(tmp_path), max_size_mb=1)
+        slots = [cache.acquire() for _ in range(3)]
+        for index, slot in enumerate(slots):
+            with open(os.path.join(slot, "data"), "wb") as f:
+                f.write(b"0" * 400 * 1024)
+            if index < 2:
+                cache.release(slot)
+                os.utime(os.path.join(slot, ".last_used"), (index + 1, index + 1))
+        assert cache.evict() == 1
+        assert not os.path.exists(slots[0])
+        assert os.path.exists(slots[1]) and os.path.exists(slots[2])
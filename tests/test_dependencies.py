@@ -0,0 +1,95 @@
+"""
+用例依赖测试
+depends_on 标记的解析、排序与依赖链分组，用模拟的用例对象代替 pytest 收集结果
+"""
+
+import pytest
+import allure
+from utils.test_dependencies import chain_groups, order_items, resolve_dependencies
+
+
+class FakeItem:
+    """只包含依赖解析用到的属性的用例"""
+
+    def __init__(self, name, *marks, module="tests/test_m.py", cls="TestA"):
+        self.name = self.originalname = name
+        self.module = module
+        self.cls = cls
+        self.nodeid = f"{module}::{cls}::{name}"
+        self.marks = [mark.mark for mark in marks]
+
+    def iter_markers(self, name):
+        return (mark for mark in self.marks if mark.name == name)
+
+    def __repr__(self):
+        return self.name
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+@allure.epic("测试框架")
+@allure.feature("用例依赖")
+@pytest.mark.framework
+class TestDependencies:
+    """用例依赖测试类"""
+
+    def test_missing_target_is_ignored(self):
+        """依赖的用例未收集到(如被 -k 过滤)时忽略该依赖"""
+        items = [FakeItem("test_copy", pytest.mark.depends_on("test_add"))]
+        assert resolve_dependencies(items) == {}
+
+    def test_false_condition_is_ignored(self):
+        """condition 为假的标记不生效"""
+        add = FakeItem("test_add")
+        copy = FakeItem("test_copy", pytest.mark.depends_on("test_add", condition=False))
+        assert resolve_dependencies([add, copy]) == {}
+
+    def test_prefers_same_class_then_nodeid(self):
+        """同名用例优先匹配同一个类；包含 "::" 时按 nodeid 匹配"""
+        other = FakeItem("test_add", cls="TestB")
+        add = FakeItem("test_add")
+        copy = FakeItem("test_copy", pytest.mark.depends_on("test_add"))
+        edit = FakeItem("test_edit", pytest.mark.depends_on("test_m.py::TestB::test_add"))
+        dependencies = resolve_dependencies([other, add, copy, edit])
+        assert dependencies[copy] == [add]
+        assert dependencies[edit] == [other]
+
+    def test_cycle_is_rejected(self):
+        """循环依赖无法排序"""
+        a = FakeItem("test_a", pytest.mark.depends_on("test_b"))
+        b = FakeItem("test_b", pytest.mark.depends_on("test_a"))
+        items = [a, b]
+        with pytest.raises(ValueError, match="循环依赖"):
+            order_items(items, resolve_dependencies(items))
+
+    def test_prerequisites_move_before_dependents(self):
+        """前置用例排到依赖它的用例之前，传递依赖同样生效"""
+        copy = FakeItem("test_copy", pytest.mark.depends_on("test_add"))
+        delete = FakeItem("test_delete", pytest.mark.depends_on("test_copy"))
+        add = FakeItem("test_add")
+        items = [delete, copy, add]
+        assert names(order_items(items, resolve_dependencies(items))) == ["test_add", "test_copy", "test_delete"]
+
+    def test_order_is_stable_without_dependencies(self):
+        """没有依赖时保持收集顺序"""
+        items = [FakeItem(f"test_{i}") for i in (3, 1, 2)]
+        assert order_items(items, resolve_dependencies(items)) == items
+        assert chain_groups(items, {}) == {}
+
+    def test_transitive_chains_merge_into_one_group(self):
+        """通过依赖相连的用例归为同一条链，链名按首次出现的顺序编号"""
+        login = FakeItem("test_login")
+        add = FakeItem("test_add")
+        copy = FakeItem("test_copy", pytest.mark.depends_on("test_add"))
+        edit = FakeItem("test_edit", pytest.mark.depends_on("test_login"))
+        delete = FakeItem("test_delete", pytest.mark.depends_on("test_copy", "test_edit"))
+        search = FakeItem("test_search")
+        report = FakeItem("test_report", pytest.mark.depends_on("test_search"))
+        items = [login, add, copy, edit, delete, search, report]
+
+        groups = chain_groups(items, resolve_dependencies(items))
+
+        assert {groups[item] for item in (login, add, copy, edit, delete)} == {"chain0"}
+        assert groups[search] == groups[report] == "chain1"
@@ -0,0 +1,72 @@
+"""
+压测运行器测试
+在本地后台页面替身上用 requests 会话代替浏览器，离线验证并发、统计与错误率
+"""
+
+import pytest
+import allure
+import requests
+from utils.load_runner import LoadRunner
+from utils.stub_server import CmsStubServer
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """启动带模拟耗时的本地 CMS 桩服务"""
+    with CmsStubServer(username="tester", password="secret", latency=0.01) as server:
+        yield server
+
+
+@allure.epic("测试框架")
+@allure.feature("并发压测")
+@pytest.mark.framework
+class TestLoadRunner:
+    """压测运行器测试类"""
+
+    def test_concurrent_users_report_throughput_and_percentiles(self, stub_server):
+        """每个虚拟用户登录一次后按迭代执行业务步骤，汇总各步骤次数与耗时分位数"""
+        def login(session, user, iteration):
+            response = session.post(stub_server.url + "/auth/login", json={"username": "tester", "password": "secret"})
+            session.headers["Authorization"] = f"Bearer {response.json()['data']['token']}"
+            return response.ok
+
+        def open_create_page(session, user, iteration):
+            return "pointsNeeded" in session.get(stub_server.site_url + "gift/create").text
+
+        def search_gift(session, user, iteration):
+            return session.get(stub_server.url + "/gift", params={"title": "Auto"}).ok
+
+        result = LoadRunner(
+            driver_factory=requests.Session,
+            driver_closer=lambda session: session.close(),
+            setup_steps=[("login", login)],
+            steps=[("gift/create", open_create_page), ("gift/search", search_gift)],
+            users=4,
+            ramp_up=0.2,
+            iterations=3
+        ).run()
+
+        assert result["iterations"] == 12 and result["failed_iterations"] == 0
+        assert result["error_rate"] == 0
+        assert result["steps"]["login"]["count"] == 4
+        assert result["steps"]["gift/search"]["count"] == 12
+        assert result["steps"]["gift/search"]["p50"] >= 0.01
+        assert result["throughput"] > 0
+
+    def test_failed_step_abandons_iteration(self, stub_server):
+        """步骤失败计入错误率，本次迭代的剩余步骤不再执行"""
+        def unauthorized_search(session, user, iteration):
+            return session.get(stub_server.url + "/gift").ok
+
+        result = LoadRunner(
+            driver_factory=requests.Session,
+            driver_closer=lambda session: session.close(),
+            steps=[("gift/search", unauthorized_search), ("never", lambda *args: True)],
+            users=2,
+            iterations=2
+        ).run()
+
+        assert result["failed_iterations"] == 4
+        assert result["steps"]["gift/search"]["error_rate"] == 1
+        assert "never" not in result["steps"]
+        assert result["errors"] == {"gift/search: 返回失败": 4}
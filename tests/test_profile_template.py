@@ -0,0 +1,84 @@
+"""
+模板浏览器 profile 测试
+用模拟的登录函数代替浏览器，检查模板的构建、克隆与失效后重建
+"""
+
+import os
+import time
+import pytest
+import allure
+from utils.profile_template import ProfileTemplate
+
+
+def fake_builder(cookies):
+    """模拟在 user-data-dir 中登录：写入 profile 文件与 Chrome 的单实例锁"""
+    calls = []
+
+    def build(user_data_dir):
+        calls.append(user_data_dir)
+        os.makedirs(os.path.join(user_data_dir, "Default"))
+        with open(os.path.join(user_data_dir, "Default", "Cookies"), "w") as f:
+            f.write("session")
+        with open(os.path.join(user_data_dir, "SingletonLock"), "w") as f:
+            f.write("host-1")
+        return cookies
+
+    return build, calls
+
+
+@allure.epic("测试框架")
+@allure.feature("模板浏览器profile")
+@pytest.mark.framework
+class TestProfileTemplate:
+    """模板浏览器 profile 测试类"""
+
+    def test_clone_is_independent_copy_without_runtime_locks(self, tmp_path):
+        """模板只构建一次，克隆不包含单实例锁，修改克隆不影响模板"""
+        template = ProfileTemplate(str(tmp_path))
+        build, calls = fake_builder([{"name": "sid", "expiry": time.time() + 3600}])
+        assert template.ensure("uat", build) and template.ensure("uat", build)
+        assert len(calls) == 1
+
+        clone = template.clone("uat")
+        assert not os.path.lexists(os.path.join(clone, "SingletonLock"))
+        with open(os.path.join(clone, "Default", "Cookies"), "w") as f:
+            f.write("changed")
+        with open(os.path.join(template.template_dir("uat"), "Default", "Cookies")) as f:
+            assert f.read() == "session"
+        template.remove_clone(clone)
+        assert not os.path.exists(clone)
+
+    def test_rebuild_when_logged_out_or_cookie_expired(self, tmp_path):
+        """登录态失效后不再克隆，下次 ensure 重建；登录 cookie 即将过期的模板视为过期，构建失败时不可用"""
+        template = ProfileTemplate(str(tmp_path))
+        build, calls = fake_builder([{"name": "sid", "expiry": time.time() + 30}])
+        assert template.ensure("uat", build)
+        assert not template.is_fresh("uat") and template.clone("uat") is None
+
+        build, calls = fake_builder([{"name": "sid"}])
+        template.ensure("uat", build)
+        template.invalidate("uat")
+        assert template.clone("uat") is None
+        assert template.ensure("uat", build) and len(calls) == 2
+
+        assert not template.ensure("qa", lambda user_data_dir: None)
+        assert template.template_dir("qa") is None
+
+    def test_rebuild_publishes_new_version_and_prunes_unreferenced(self, tmp_path):
+        """重建发布新版本目录并切换指针；旧版本在有克隆正在复制时保留，之后的 ensure 删除"""
+        template = ProfileTemplate(str(tmp_path))
+        build, calls = fake_builder([{"name": "sid"}])
+        template.ensure("uat", build)
+        old = template.template_dir("uat")
+        copying = os.path.join(str(tmp_path), "uat", "clones", f"{os.path.basename(old)}.1-1.pending")
+        os.makedirs(os.path.dirname(copying))
+        open(copying, "w").close()
+
+        template.invalidate("uat")
+        assert template.ensure("uat", build)
+        new = template.template_dir("uat")
+        assert new != old and os.path.isdir(new) and os.path.isdir(old)
+
+        os.remove(copying)
+        assert template.ensure("uat", build) and len(calls) == 2
+        assert not os.path.exists(old) and os.path.isdir(new)
@@ -0,0 +1,63 @@
+"""
+运行历史测试
+百分位数按最近秩法计算，压测与基准测试的统计也依赖它
+"""
+
+import pytest
+import allure
+from utils.run_history import StepTimer, percentile, timed_action
+
+
+class FakePage:
+    """嵌套调用 timed_action 方法的页面对象"""
+
+    @timed_action
+    def inner(self):
+        return "done"
+
+    @timed_action
+    def outer(self):
+        return self.inner()
+
+
+@allure.epic("测试框架")
+@allure.feature("运行历史")
+@pytest.mark.framework
+class TestPercentile:
+    """百分位数测试类"""
+
+    @pytest.mark.parametrize("count, pct, expected", [
+        (20, 95, 19), (60, 95, 57), (100, 95, 95), (100, 50, 50), (10, 90, 9), (1, 99, 1), (3, 0, 1),
+    ])
+    def test_nearest_rank(self, count, pct, expected):
+        """取第 ceil(pct/100*n) 小的值，pct/100*n 为奇数整数时不能多取一位"""
+        assert percentile([float(v) for v in range(count, 0, -1)], pct) == expected
+
+    def test_empty_values(self):
+        """没有数据时返回None"""
+        assert percentile([], 95) is None
+
+
+@allure.epic("测试框架")
+@allure.feature("运行历史")
+@pytest.mark.framework
+class TestStepTimer:
+    """步骤计时测试类"""
+
+    def test_only_outermost_action_is_timed(self):
+        """内部调用的 timed_action 方法不重复计时"""
+        timer = StepTimer.get_instance()
+        timer.drain()
+        assert FakePage().outer() == "done"
+        FakePage().inner()
+        assert [step for _, step, _ in timer.drain()] == ["FakePage.outer", "FakePage.inner"]
+
+    def test_discard_drops_earlier_attempts(self):
+        """重跑前丢弃该用例之前记录的步骤，其他用例不受影响"""
+        timer = StepTimer.get_instance()
+        timer.drain()
+        timer.record("open", 1.0, test_id="t::a")
+        timer.record("open", 2.0, test_id="t::b")
+        timer.discard("t::a")
+        timer.record("open", 3.0, test_id="t::a")
+        assert timer.drain() == [("t::b", "open", 2.0), ("t::a", "open", 3.0)]
@@ -0,0 +1,114 @@
+"""
+用例分片与 xdist 调度测试
+LPT 装箱、分片参数解析与依赖链分组都是纯函数，不需要浏览器
+"""
+
+import pytest
+import allure
+from utils.test_durations import DurationHistory, lpt_partition, split_group
+from utils.xdist_scheduling import LptScheduling
+
+
+class XdistConfig:
+    """调度器只从 config 读取 --tx(由 -n 生成)"""
+
+    def __init__(self, workers):
+        self.workers = workers
+
+    def getvalue(self, name):
+        return [f"{self.workers}*popen"] if name == "tx" else None
+
+
+def loads(groups, durations, default=1.0):
+    """各组的预计总耗时"""
+    return [sum(durations.get(split_group(test_id)[0], default) for test_id in group) for group in groups]
+
+
+@allure.epic("测试框架")
+@allure.feature("用例分片")
+@pytest.mark.framework
+class TestLptPartition:
+    """LPT 装箱与分片参数测试类"""
+
+    def test_longest_first_balances_bins(self):
+        """按耗时从长到短放入最空的组：7/5/4/3/3 分两组得到 10 与 12，组内保持原有顺序"""
+        durations = {"a": 7, "b": 5, "c": 4, "d": 3, "e": 3}
+        groups = lpt_partition(list("abcde"), 2, durations)
+        assert groups == [["a", "d"], ["b", "c", "e"]]
+        assert max(loads(groups, durations)) == 12
+
+    def test_same_input_same_partition(self):
+        """相同输入总是得到相同划分，各分片独立计算结果一致"""
+        test_ids = [f"t{i}" for i in range(9)]
+        durations = {test_id: 2.0 for test_id in test_ids}
+        assert lpt_partition(test_ids, 3, durations) == lpt_partition(list(test_ids), 3, dict(durations))
+
+    def test_unknown_duration_uses_default(self):
+        """没有历史记录的用例按 default 估计耗时"""
+        groups = lpt_partition(["known", "new1", "new2"], 2, {"known": 10}, default=5)
+        assert groups == [["known"], ["new1", "new2"]]
+
+    def test_default_duration_is_median(self, tmp_path):
+        """耗时历史的默认值为中位数，没有历史时为1秒"""
+        history = DurationHistory(str(tmp_path / "durations.json"))
+        assert history.default_duration() == 1.0
+        for test_id, seconds in (("a", 1), ("b", 9), ("c", 4)):
+            history.record(test_id, seconds)
+        assert history.default_duration() == 4
+
+    def test_loadgroup_chain_is_packed_together(self):
+        """带 "@分组" 后缀的用例作为整体装箱，耗时按原始 nodeid 查找"""
+        test_ids = ["m.py::add@chain0", "m.py::copy@chain0", "m.py::login", "m.py::search"]
+        durations = {"m.py::add": 3, "m.py::copy": 3, "m.py::login": 4, "m.py::search": 1}
+        groups = lpt_partition(test_ids, 2, durations)
+        assert ["m.py::add@chain0", "m.py::copy@chain0"] in groups
+        assert sorted(loads(groups, durations)) == [5, 6]
+
+    def test_explicit_groups(self):
+        """groups 参数指定的用例分在一起"""
+        groups = lpt_partition(["a", "b", "c"], 3, {"a": 1, "b": 1, "c": 1}, groups={"a": "g", "c": "g"})
+        assert ["a", "c"] in groups and ["b"] in groups
+
+    @pytest.mark.parametrize("test_id, expected", [
+        ("m.py::test_x@chain0", ("m.py::test_x", "chain0")),
+        ("m.py::test_x", ("m.py::test_x", None)),
+        ("m.py::test_x[user@host]", ("m.py::test_x[user@host]", None)),
+        ("m.py::test_x[user@host]@chain1", ("m.py::test_x[user@host]", "chain1")),
+    ])
+    def test_split_group(self, test_id, expected):
+        """只拆分参数化 id 之后的 "@分组" 后缀"""
+        assert split_group(test_id) == expected
+
+    def test_parse_shard(self):
+        """i/N 解析为 (i, N)，未指定时返回None"""
+        assert DurationHistory.parse_shard("2/3") == (2, 3)
+        assert DurationHistory.parse_shard(None) is None
+
+    @pytest.mark.parametrize("value", ["0/3", "4/3", "1/0", "abc", "1/2/3", "1-3"])
+    def test_parse_shard_rejects_invalid(self, value):
+        """序号超出范围或格式不正确时报错"""
+        with pytest.raises(ValueError):
+            DurationHistory.parse_shard(value)
+
+
+@allure.epic("测试框架")
+@allure.feature("用例分片")
+@pytest.mark.framework
+class TestLptScheduling:
+    """xdist LPT 调度器测试类"""
+
+    def test_scopes_follow_partition(self, tmp_path):
+        """每个 LPT 分组作为一个 scope 发给同一个 worker，依赖链不拆开"""
+        history = DurationHistory(str(tmp_path / "durations.json"))
+        for test_id, seconds in (("m.py::slow", 10), ("m.py::add", 3), ("m.py::copy", 3), ("m.py::fast", 1)):
+            history.record(test_id, seconds)
+        scheduler = LptScheduling(XdistConfig(2), history=history)
+        scheduler.collection = ["m.py::slow", "m.py::add@chain0", "m.py::copy@chain0", "m.py::fast"]
+        scheduler.assigned_work = {"gw0": {}, "gw1": {}}
+
+        scopes = {test_id: scheduler._split_scope(test_id) for test_id in scheduler.collection}
+
+        assert scopes["m.py::add@chain0"] == scopes["m.py::copy@chain0"]
+        assert scopes["m.py::slow"] != scopes["m.py::add@chain0"]
+        assert scopes["m.py::fast"] == scopes["m.py::add@chain0"]
+        assert set(scopes.values()) == {"lpt0", "lpt1"}
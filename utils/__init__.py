@@ -4,8 +4,35 @@
 - 配置管理
 - 日志记录
 - 截图工具
+- 登录态缓存
+- 浏览器驱动池
+- 浏览器进程回收
+- 浏览器共享磁盘缓存
+- 模板浏览器 profile
+- 接口数据准备与清理
+- 用例耗时历史与分片
+- SQLite 运行历史与步骤计时
+- 页面性能采集与预算
+- 并发压测
+- BasePage 基础操作基准测试
+- 接口录制回放
 """
 
 from .log_manager import LogManager, logger
 from .config_manager import ConfigManager
-from .screenshot_manager import ScreenshotManager, screenshot
\ No newline at end of file
+from .screenshot_manager import ScreenshotManager, screenshot
+from .screenshot_store import ScreenshotStore
+from .session_cache import SessionCache
+from .driver_pool import DriverPool
+from .process_reaper import ProcessReaper
+from .browser_cache import BrowserCache
+from .profile_template import ProfileTemplate
+from .api_client import CmsApiClient
+from .data_seeder import DataSeeder
+from .entity_registry import EntityRegistry
+from .test_durations import DurationHistory
+from .run_history import RunHistory, StepTimer
+from .page_performance import PerformanceRecorder
+from .load_runner import LoadRunner
+from .benchmark import BenchmarkRunner
+from .api_cassette import Cassette, FetchInterceptor
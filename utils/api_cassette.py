@@ -0,0 +1,235 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import trio
+from .log_manager import logger
+
+
+# 回放时不参与匹配的响应头：正文已由 Chrome 解码，长度与编码由 fulfillRequest 重新计算
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+def cassette_path(root: str, env: str, test_id: str) -> str:
+    """
+    用例对应的录制文件路径：<root>/<env>/<模块路径>/<用例名>.json
+    Args:
+        test_id: 用例 nodeid，如 tests/test_1_gift.py::TestGift::test_add_gift
+    """
+    file_part, _, name_part = test_id.partition("::")
+    module = os.path.splitext(file_part)[0]
+    name = re.sub(r"[^\w.-]+", "_", name_part.replace("::", ".")) or "module"
+    return os.path.join(root, env, module, f"{name}.json")
+
+
+class Cassette:
+    """
+    单个用例的接口录制文件
+    按 请求方法 + 路径 + 排序后的查询参数(忽略时间戳等参数) + 请求体摘要 匹配，
+    同一请求录制了多次时按顺序回放，用完后重复最后一次
+    """
+
+    def __init__(self, path: str, ignore_params: Optional[List[str]] = None, load: bool = True):
+        """
+        Args:
+            path: 录制文件路径(JSON)
+            ignore_params: 匹配时忽略的查询参数，如防缓存的 "_"、"t"
+            load: 是否读取已有的录制文件，重新录制时为False
+        """
+        self.path = path
+        self.ignore_params = set(ignore_params or [])
+        self._lock = threading.Lock()
+        self.entries = []
+        self._cursor = {}
+        if load and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", [])
+
+    def key(self, method: str, url: str, post_data: Optional[str] = None, with_body: bool = True) -> str:
+        """请求的匹配键，不包含协议与域名，录制文件可以在不同环境之间复用"""
+        parts = urlsplit(url)
+        query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                                 if k not in self.ignore_params))
+        key = f"{method.upper()} {parts.path}?{query}"
+        if with_body and post_data:
+            key += " #" + hashlib.sha1(post_data.encode("utf-8")).hexdigest()[:12]
+        return key
+
+    def add(self, method: str, url: str, post_data: Optional[str], status: int,
+            headers: List[dict], body: bytes):
+        """追加一条录制的响应"""
+        entry = {
+            "key": self.key(method, url, post_data),
+            "loose_key": self.key(method, url, with_body=False),
+            "url": url,
+            "status": status,
+            "headers": [h for h in headers if h["name"].lower() not in _DROPPED_HEADERS],
+            "body": base64.b64encode(body).decode("ascii"),
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def match(self, method: str, url: str, post_data: Optional[str] = None) -> Optional[dict]:
+        """
+        查找回放的响应：优先完全匹配(含请求体)，其次只按方法与URL匹配
+        Returns:
+            dict: 录制条目，未录制时返回None
+        """
+        for key, field in ((self.key(method, url, post_data), "key"),
+                           (self.key(method, url, with_body=False), "loose_key")):
+            with self._lock:
+                candidates = [entry for entry in self.entries if entry[field] == key]
+                if not candidates:
+                    continue
+                index = self._cursor.get((field, key), 0)
+                self._cursor[(field, key)] = index + 1
+            return candidates[min(index, len(candidates) - 1)]
+        return None
+
+    def save(self):
+        """写回录制文件（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class FetchInterceptor:
+    """
+    通过 CDP Fetch 域拦截页面的 XHR/fetch 请求
+    record 模式在响应阶段读取正文写入 Cassette 后放行，replay 模式在请求阶段直接用 Cassette 中的响应完成请求
+    CDP 事件需要 websocket 连接，在后台线程中通过 selenium 的 bidi_connection(trio) 处理
+    """
+
+    def __init__(self, driver, cassette: Cassette, mode: str, url_patterns: Optional[List[str]] = None,
+                 passthrough_on_miss: bool = False):
+        """
+        Args:
+            driver: Chrome WebDriver实例
+            cassette: 录制文件
+            mode: record/replay
+            url_patterns: 拦截的URL通配符，默认拦截全部 XHR/fetch 请求
+            passthrough_on_miss: 回放时未录制的请求是否放行到真实后台，否则直接失败
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"不支持的录制回放模式: {mode}")
+        self.driver = driver
+        self.cassette = cassette
+        self.mode = mode
+        self.url_patterns = url_patterns or ["*"]
+        self.passthrough_on_miss = passthrough_on_miss
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = []
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._trio_token = None
+        self._cancel_scope = None
+
+    def start(self, timeout: float = 10) -> bool:
+        """
+        启动拦截并等待 Fetch 域启用
+        Returns:
+            bool: 是否启用成功，失败时不拦截，用例照常访问真实后台
+        """
+        self._thread = threading.Thread(target=self._run, name="cdp-fetch-interceptor", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._error:
+            logger.warning(f"启用 CDP Fetch 拦截失败: {self._error or '超时'}")
+            self.stop()
+            return False
+        logger.info(f"接口{'录制' if self.mode == RECORD else '回放'}已启用: {self.cassette.path}")
+        return True
+
+    def stop(self):
+        """停止拦截；录制模式下保存录制文件"""
+        if self._trio_token is not None and self._cancel_scope is not None:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except (RuntimeError, trio.RunFinishedError):
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self.mode == RECORD and self.cassette.entries:
+            self.cassette.save()
+            logger.info(f"已录制 {self.recorded} 个接口响应: {self.cassette.path}")
+        elif self.mode == REPLAY:
+            logger.info(f"回放 {self.replayed} 个接口响应，未录制 {len(self.missed)} 个")
+
+    def _run(self):
+        try:
+            trio.run(self._main)
+        except Exception as e:
+            self._error = str(e)
+            self._ready.set()
+
+    async def _main(self):
+        self._trio_token = trio.lowlevel.current_trio_token()
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            stage = devtools.fetch.RequestStage.RESPONSE if self.mode == RECORD else devtools.fetch.RequestStage.REQUEST
+            patterns = [
+                devtools.fetch.RequestPattern(url_pattern=pattern, resource_type=resource_type, request_stage=stage)
+                for pattern in self.url_patterns
+                for resource_type in (devtools.network.ResourceType.XHR, devtools.network.ResourceType.FETCH)
+            ]
+            with trio.CancelScope() as self._cancel_scope:
+                await session.execute(devtools.fetch.enable(patterns=patterns))
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    async for event in session.listen(devtools.fetch.RequestPaused):
+                        nursery.start_soon(self._handle, session, devtools, event)
+
+    async def _handle(self, session, devtools, event):
+        """处理一个被暂停的请求，异常时放行，避免页面请求一直挂起"""
+        request = event.request
+        try:
+            if self.mode == RECORD:
+                await self._record(session, devtools, event)
+                return
+            entry = self.cassette.match(request.method, request.url, request.post_data)
+            if entry is not None:
+                self.replayed += 1
+                await session.execute(devtools.fetch.fulfill_request(
+                    event.request_id,
+                    response_code=entry["status"],
+                    response_headers=[devtools.fetch.HeaderEntry(name=h["name"], value=h["value"])
+                                      for h in entry["headers"]],
+                    body=entry["body"]
+                ))
+                return
+            self.missed.append(f"{request.method} {request.url}")
+            logger.warning(f"回放未找到录制的响应: {request.method} {request.url}")
+            if self.passthrough_on_miss:
+                await session.execute(devtools.fetch.continue_request(event.request_id))
+            else:
+                await session.execute(devtools.fetch.fail_request(event.request_id, devtools.network.ErrorReason.FAILED))
+        except Exception as e:
+            logger.warning(f"处理拦截的请求失败 {request.url}: {str(e)}")
+            try:
+                await session.execute(devtools.fetch.continue_request(event.request_id))
+            except Exception:
+                pass
+
+    async def _record(self, session, devtools, event):
+        """读取响应正文写入录制文件后放行"""
+        request = event.request
+        status = event.response_status_code
+        if status is not None and not 300 <= status < 400:
+            body, base64_encoded = await session.execute(devtools.fetch.get_response_body(event.request_id))
+            data = base64.b64decode(body) if base64_encoded else body.encode("utf-8")
+            headers = [{"name": h.name, "value": h.value} for h in event.response_headers or []]
+            self.cassette.add(request.method, request.url, request.post_data, status, headers, data)
+            self.recorded += 1
+        await session.execute(devtools.fetch.continue_request(event.request_id))
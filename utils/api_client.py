@@ -0,0 +1,177 @@
+import threading
+from typing import Any, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config_manager import ConfigManager
+from .log_manager import logger
+
+
+class CmsApiClient:
+    """CMS 后台接口客户端：复用连接池的 requests.Session，用于准备和清理测试数据"""
+
+    def __init__(
+        self,
+        base_url: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 10,
+        pool_size: int = 10,
+        retries: int = 2,
+        paths: Optional[Dict[str, str]] = None,
+        token_field: str = "token",
+        search_param: str = "title",
+        page_param: str = "page",
+        page_size_param: str = "pageSize"
+    ):
+        """
+        初始化接口客户端
+        Args:
+            base_url: 接口基础URL
+            username: 登录用户名
+            password: 登录密码
+            timeout: 请求超时时间(秒)
+            pool_size: 连接池大小
+            retries: 连接失败或 5xx 时的重试次数
+            paths: 接口路径 {"login": ..., "gift": ...}，相对 base_url
+            token_field: 登录响应中 token 的字段名
+            search_param: 列表接口按名称模糊搜索的查询参数名
+            page_param: 列表接口的页码参数名(从1开始)
+            page_size_param: 列表接口的每页数量参数名
+        """
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.paths = {"login": "auth/login", "gift": "gift"}
+        self.paths.update(paths or {})
+        self.token_field = token_field
+        self.search_param = search_param
+        self.page_param = page_param
+        self.page_size_param = page_size_param
+
+        self.session = requests.Session()
+        # 仅对幂等请求按状态码重试，避免重复创建数据
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._logged_in = False
+        self._login_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, env: str = None) -> "CmsApiClient":
+        """根据环境配置创建客户端"""
+        config = ConfigManager.get_instance()
+        env_config = config.get_env_config(env)
+        api_config = config._config.get("api", {})
+        return cls(
+            base_url=env_config.get("api_base_url", ""),
+            username=env_config.get("username"),
+            password=env_config.get("password"),
+            timeout=api_config.get("timeout", env_config.get("timeout", 10)),
+            pool_size=api_config.get("pool_size", 10),
+            retries=api_config.get("retries", 2),
+            paths=api_config.get("paths"),
+            token_field=api_config.get("token_field", "token"),
+            search_param=api_config.get("search_param", "title"),
+            page_param=api_config.get("page_param", "page"),
+            page_size_param=api_config.get("page_size_param", "pageSize")
+        )
+
+    def _url(self, path: str) -> str:
+        """拼接完整URL"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, auth: bool = True, **kwargs) -> Any:
+        """
+        发送请求并返回响应数据（自动拆除 {"data": ...} 包装）
+        Args:
+            method: HTTP 方法
+            path: 相对 base_url 的路径
+            auth: 是否需要先登录
+        Raises:
+            requests.HTTPError: 响应状态码不是 2xx
+        """
+        if auth and not self._logged_in:
+            with self._login_lock:
+                if not self._logged_in:
+                    self.login()
+        kwargs.setdefault("timeout", self.timeout)
+        response = self.session.request(method, self._url(path), **kwargs)
+        response.raise_for_status()
+        if not response.content:
+            return None
+        body = response.json()
+        if isinstance(body, dict) and "data" in body:
+            return body["data"]
+        return body
+
+    def login(self):
+        """通过接口登录，并在后续请求中携带 token"""
+        logger.info(f"接口登录: {self.username}")
+        data = self.request("POST", self.paths["login"], auth=False,
+                            json={"username": self.username, "password": self.password})
+        token = data.get(self.token_field) if isinstance(data, dict) else None
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self._logged_in = True
+
+    def create_gift(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """创建Gift，返回接口返回的Gift数据"""
+        gift = self.request("POST", self.paths["gift"], json=payload)
+        logger.info(f"接口创建Gift成功: id={gift.get('id')}")
+        return gift
+
+    def get_gift(self, gift_id) -> Dict[str, Any]:
+        """查询Gift详情"""
+        return self.request("GET", f"{self.paths['gift']}/{gift_id}")
+
+    def delete_gift(self, gift_id):
+        """删除Gift"""
+        self.delete("gift", gift_id)
+
+    def search(self, kind: str, keyword: str, page: Optional[int] = None,
+               page_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        按名称模糊搜索资源
+        Args:
+            kind: 资源类型，对应 paths 中的键
+            keyword: 名称关键字
+            page: 页码(从1开始)，不传时使用接口默认分页
+            page_size: 每页数量
+        """
+        params = {self.search_param: keyword}
+        if page is not None:
+            params[self.page_param] = page
+        if page_size is not None:
+            params[self.page_size_param] = page_size
+        result = self.request("GET", self.paths[kind], params=params)
+        # 兼容分页结构 {"list": [...], "total": n}
+        if isinstance(result, dict):
+            result = result.get("list") or result.get("records") or result.get("items") or []
+        return result or []
+
+    def search_all(self, kind: str, keyword: str, page_size: int = 100, max_pages: int = 100) -> List[Dict[str, Any]]:
+        """
+        按名称模糊搜索资源并逐页读取全部结果
+        某页为空、不足一页或没有新数据(接口不支持分页参数)时停止
+        """
+        results, seen = [], set()
+        for page in range(1, max_pages + 1):
+            items = self.search(kind, keyword, page=page, page_size=page_size)
+            new_items = [item for item in items if item.get("id") not in seen]
+            seen.update(item.get("id") for item in new_items)
+            results.extend(new_items)
+            if not new_items or len(items) < page_size:
+                break
+        return results
+
+    def delete(self, kind: str, entity_id):
+        """删除资源"""
+        self.request("DELETE", f"{self.paths[kind]}/{entity_id}")
+        logger.info(f"接口删除{kind}成功: id={entity_id}")
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
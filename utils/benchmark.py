@@ -0,0 +1,189 @@
+import itertools
+import json
+import os
+import platform
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.common.by import By
+from .log_manager import logger
+from .run_history import StepTimer, percentile
+
+
+# 1x1 像素的 PNG，upload_thumbnail 基准测试的上传文件
+_PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360f8cfc0f01f0005000201e2b0a5"
+    "a10000000049454e44ae426082"
+)
+
+
+class BenchmarkRunner:
+    """微基准测试：重复执行操作并统计耗时(毫秒)，结果可与保存的基线比较"""
+
+    def __init__(self, iterations: int = 30, warmup: int = 3):
+        """
+        Args:
+            iterations: 每个用例计时的执行次数
+            warmup: 计时前的预热次数(不计入结果)
+        """
+        self.iterations = iterations
+        self.warmup = warmup
+        self.results = {}
+
+    def measure(self, name: str, func: Callable, iterations: Optional[int] = None) -> dict:
+        """
+        重复执行 func 并统计耗时，func 返回 False 或抛出异常计为失败
+        Returns:
+            dict: {iterations, failures, min, mean, p50, p95, max}，耗时单位为毫秒
+        """
+        iterations = iterations or self.iterations
+        for _ in range(self.warmup):
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"基准测试 {name} 预热失败: {str(e)}")
+        durations, failures = [], 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            try:
+                ok = func() is not False
+            except Exception as e:
+                logger.warning(f"基准测试 {name} 执行失败: {str(e)}")
+                ok = False
+            durations.append((time.perf_counter() - start) * 1000)
+            failures += not ok
+        result = {
+            "iterations": iterations,
+            "failures": failures,
+            "min": min(durations),
+            "mean": sum(durations) / len(durations),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "max": max(durations),
+        }
+        self.results[name] = result
+        logger.info(f"基准测试 {name}: p50 {result['p50']:.1f}ms，p95 {result['p95']:.1f}ms，失败 {failures} 次")
+        return result
+
+    def compare(self, baseline: Dict[str, dict], tolerance: float = 1.25, min_delta_ms: float = 5) -> List[dict]:
+        """
+        按 p50 与基线比较
+        Args:
+            baseline: 基线结果 {用例名: 统计}
+            tolerance: p50 超过基线的倍数视为退化
+            min_delta_ms: 忽略 p50 差值小于该值(毫秒)的用例，避免抖动误报
+        Returns:
+            list: 每个共同用例的比较结果，regression 为 True 表示退化
+        """
+        comparison = []
+        for name, result in self.results.items():
+            base = baseline.get(name)
+            if not base or not base.get("p50"):
+                continue
+            ratio = result["p50"] / base["p50"]
+            comparison.append({
+                "name": name,
+                "baseline_p50": base["p50"],
+                "p50": result["p50"],
+                "ratio": ratio,
+                "regression": ratio > tolerance and result["p50"] - base["p50"] >= min_delta_ms,
+            })
+        return comparison
+
+    def save(self, path: str, **extra) -> str:
+        """将结果写入 JSON 文件，extra 中的字段一并写入"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(extra, created=datetime.now().isoformat(timespec="seconds"),
+                           iterations=self.iterations, warmup=self.warmup, results=self.results),
+                      f, ensure_ascii=False, indent=2)
+        return path
+
+    @staticmethod
+    def load_baseline(path: str) -> Optional[Dict[str, dict]]:
+        """读取基线文件中的结果，文件不存在时返回None"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+
+
+def run_base_page_benchmarks(runner: BenchmarkRunner, driver, site_url: str, work_dir: str) -> Dict[str, dict]:
+    """
+    在本地静态复刻页面(data/fixture_app)上对 BasePage 基础操作做基准测试
+    Args:
+        runner: 基准测试运行器
+        driver: WebDriver实例
+        site_url: 静态站点基础URL
+        work_dir: 上传文件与截图的临时目录
+    Returns:
+        dict: runner.results
+    """
+    from page_objects.gift_page import GiftPage, today
+    from page_objects.login_page import LoginPage
+    from .config_manager import ConfigManager
+    from .screenshot_manager import ScreenshotManager
+
+    os.makedirs(work_dir, exist_ok=True)
+    counter = itertools.count()
+    page = GiftPage(driver)
+
+    page.navigate(site_url + "login.html")
+    runner.measure("find_element.login", lambda: page.find_element(LoginPage.USERNAME_INPUT))
+
+    page.navigate(site_url + "gift_form.html")
+    runner.measure("find_element.gift_form", lambda: page.find_element(GiftPage.GIFT_NAME_EN))
+    runner.measure("clear_and_input_text", lambda: page.clear_and_input_text(
+        GiftPage.GIFT_NAME_EN, f"Benchmark Gift {next(counter)}"))
+
+    thumbnail = os.path.join(work_dir, "thumbnail.png")
+    with open(thumbnail, "wb") as f:
+        f.write(_PIXEL_PNG)
+    runner.measure("upload_thumbnail", lambda: page.upload_thumbnail(thumbnail))
+
+    start_date = today()
+    end_date = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+    runner.measure("set_form_value.DatePicker", lambda: page.set_form_value(
+        [end_date], GiftPage.EXPIRY_DATE_ICON, "DatePicker", confirm=True))
+    runner.measure("set_form_value.RangePicker", lambda: page.set_form_value(
+        [start_date, end_date], GiftPage.SHOWING_DATE_ICON, "RangePicker"))
+
+    report_config = ConfigManager.get_instance().get_report_config()
+    screenshots = ScreenshotManager(
+        os.path.join(work_dir, "screenshots"),
+        image_format=report_config.get("screenshot_format", "png"),
+        quality=report_config.get("screenshot_quality", 80),
+        clip=report_config.get("screenshot_clip", "viewport"),
+        # 胶片条默认只在失败重跑时记录，基准测试总是测量记录缩略帧的开销
+        frames=dict(report_config.get("filmstrip") or {}, enabled=True)
+    )
+    # 测试线程上的耗时：抓取截图并放入写入队列
+    runner.measure("screenshot.take_screenshot", lambda: screenshots.take_screenshot(
+        driver, "benchmark", allure_attach=False) is not None)
+    runner.measure("screenshot.record_frame", lambda: screenshots.record_frame(driver, "benchmark", test_id="benchmark"))
+    screenshots.wait_all()
+
+    page.navigate(site_url + "gift_list.html")
+    # 交替滚动到表格最后一行与第一行的Copy按钮，与 copy_gift 中的水平滚动参数一致
+    targets = itertools.cycle([
+        (By.XPATH, '(//tbody[@class="ant-table-tbody"]//button[.="Copy"])[last()]'),
+        (By.XPATH, '(//tbody[@class="ant-table-tbody"]//button[.="Copy"])[1]'),
+    ])
+    runner.measure("scroll_to_element", lambda: page.scroll_to_element(
+        locator=next(targets), direction="right", offset=100, timeout=10))
+
+    # 基准测试的页面操作不写入运行历史
+    StepTimer.get_instance().drain()
+    return runner.results
+
+
+def environment_info(driver) -> dict:
+    """基准测试的运行环境，用于判断结果是否可与基线比较"""
+    capabilities = getattr(driver, "capabilities", {}) or {}
+    return {
+        "browser": capabilities.get("browserName"),
+        "browser_version": capabilities.get("browserVersion"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
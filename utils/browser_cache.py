@@ -0,0 +1,175 @@
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from .config_manager import ConfigManager
+from .log_manager import logger
+
+if sys.platform.startswith('win'):
+    import msvcrt
+else:
+    import fcntl
+
+
+def try_lock_file(path: str):
+    """
+    非阻塞地获取文件锁，进程退出时操作系统自动释放
+    Returns:
+        file: 持有锁的文件对象，已被其他进程锁定时返回None
+    """
+    handle = open(path, "a+")
+    try:
+        if sys.platform.startswith('win'):
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+    except OSError:
+        handle.close()
+        return None
+
+
+def unlock_file(handle):
+    """释放文件锁"""
+    try:
+        if sys.platform.startswith('win'):
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    finally:
+        handle.close()
+
+
+def _dir_size(path: str) -> int:
+    """目录下所有文件的总大小(字节)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BrowserCache:
+    """
+    跨运行保留的浏览器 HTTP 磁盘缓存
+    Chrome 的磁盘缓存不能被多个浏览器进程同时使用，因此缓存目录分为多个槽位，
+    每个浏览器通过文件锁独占一个槽位(同一台机器上的 xdist worker 之间也互斥)，优先复用最近使用的空闲槽位；
+    每个槽位由 Chrome 按 --disk-cache-size 限制大小，所有槽位的总大小超过上限时按最近使用时间淘汰空闲槽位
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例，未启用时返回None"""
+        if cls._instance is None:
+            config = ConfigManager.get_instance().get_browser_config().get("disk_cache", {})
+            if not config.get("enabled", False):
+                return None
+            cls._instance = BrowserCache(
+                config.get("dir", "cache/browser"),
+                slot_size_mb=config.get("slot_size_mb", 256),
+                max_size_mb=config.get("max_size_mb", 1024)
+            )
+        return cls._instance
+
+    def __init__(self, root: str, slot_size_mb: int = 256, max_size_mb: int = 1024):
+        """
+        Args:
+            root: 缓存根目录
+            slot_size_mb: 单个槽位(单个浏览器)的缓存上限(MB)
+            max_size_mb: 所有槽位的总大小上限(MB)
+        """
+        self.root = os.path.abspath(root)
+        self.slot_size = slot_size_mb * 1024 * 1024
+        self.max_size = max_size_mb * 1024 * 1024
+        self._slots_dir = os.path.join(self.root, "slots")
+        self._locks_dir = os.path.join(self.root, "locks")
+        os.makedirs(self._slots_dir, exist_ok=True)
+        os.makedirs(self._locks_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._held: Dict[str, object] = {}
+
+    def _slot_names(self) -> List[str]:
+        """已有的槽位名，按最近使用时间倒序"""
+        names = [name for name in os.listdir(self._slots_dir) if name.startswith("slot-")]
+        return sorted(names, key=lambda name: -self._last_used(name))
+
+    def _last_used(self, name: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(self._slots_dir, name, ".last_used"))
+        except OSError:
+            return 0.0
+
+    def acquire(self) -> str:
+        """
+        独占一个空闲槽位，没有空闲槽位时新建
+        Returns:
+            str: 槽位目录，作为 Chrome 的 --disk-cache-dir
+        """
+        with self._lock:
+            names = self._slot_names()
+            index = 0
+            existing = set(names)
+            while f"slot-{index}" in existing:
+                index += 1
+            for name in names + [f"slot-{index}"]:
+                handle = try_lock_file(os.path.join(self._locks_dir, f"{name}.lock"))
+                if handle is None:
+                    continue
+                slot = os.path.join(self._slots_dir, name)
+                os.makedirs(slot, exist_ok=True)
+                self._held[slot] = handle
+                logger.info(f"使用浏览器磁盘缓存槽位: {slot}")
+                return slot
+        # 新建的槽位恰好被其他进程抢先锁定，重试
+        return self.acquire()
+
+    def release(self, slot: Optional[str]):
+        """浏览器进程退出后释放槽位，并记录最近使用时间"""
+        with self._lock:
+            handle = self._held.pop(slot, None)
+        if handle is None:
+            return
+        try:
+            with open(os.path.join(slot, ".last_used"), "w") as f:
+                f.write(str(time.time()))
+        except OSError:
+            pass
+        unlock_file(handle)
+
+    def chrome_arguments(self, slot: str) -> List[str]:
+        """槽位对应的 Chrome 启动参数"""
+        return [f"--disk-cache-dir={slot}", f"--disk-cache-size={self.slot_size}"]
+
+    def evict(self) -> int:
+        """
+        总大小超过上限时，按最近使用时间从旧到新删除空闲槽位，正在使用的槽位不会删除
+        Returns:
+            int: 删除的槽位数
+        """
+        sizes = {name: _dir_size(os.path.join(self._slots_dir, name)) for name in self._slot_names()}
+        total = sum(sizes.values())
+        evicted = 0
+        for name in reversed(list(sizes)):
+            if total <= self.max_size:
+                break
+            handle = try_lock_file(os.path.join(self._locks_dir, f"{name}.lock"))
+            if handle is None:
+                continue
+            try:
+                shutil.rmtree(os.path.join(self._slots_dir, name), ignore_errors=True)
+            finally:
+                unlock_file(handle)
+            total -= sizes[name]
+            evicted += 1
+        if evicted:
+            logger.info(f"浏览器磁盘缓存超过上限，淘汰 {evicted} 个槽位，剩余 {total / 1024 / 1024:.0f}MB")
+        return evicted
@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Any, Dict
+from .api_client import CmsApiClient
+from .entity_registry import EntityRegistry
+from .log_manager import logger
+
+
+def build_gift_payload(gift_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将 GIFT_TEST_DATA 格式的测试数据转换为创建Gift接口的请求体
+    字段名与 Gift 创建表单中的控件 id 保持一致
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    return {
+        "rewardRemark": gift_data.get("remarks", "自动化测试备注"),
+        "pointsNeeded": int(gift_data.get("points", 100)),
+        "categoryCodeList": [gift_data.get("category", "Hotel")],
+        "showingDate": gift_data.get("showing_date", [today, today]),
+        "reservationDate": gift_data.get("redemption_date", [today, today]),
+        "expiryDate": gift_data.get("expiry_date", today),
+        "highlighted": gift_data.get("highlighted", True),
+        "giftSource": gift_data.get("gift_source", "Purchase"),
+        "value": int(gift_data.get("value", 0)),
+        "cost": int(gift_data.get("cost", 0)),
+        "skuQuota": int(gift_data.get("sku_number", 1)),
+        "title": {
+            "en": gift_data.get("gift_name_en"),
+            "zh-hk": gift_data.get("gift_name_zh_hk"),
+            "zh-cn": gift_data.get("gift_name_zh"),
+        },
+        "skuList": [{
+            "mallCode": gift_data.get("mall", "Citywalk"),
+            "location": [gift_data.get("location", "BSX")],
+            "stock": int(gift_data.get("stock", 1)),
+            "tagEn": gift_data.get("tag_en", "Citywalk"),
+            "tagTc": gift_data.get("tag_tc", "荃新天地"),
+            "tagSc": gift_data.get("tag_sc", "荃新天地"),
+        }],
+    }
+
+
+def with_unique_names(gift_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    在各语言名称后追加时间戳，避免并行用例或同一环境上的其他运行按名称搜索、清理时互相干扰
+    Returns:
+        dict: 名称已追加后缀的测试数据副本
+    """
+    unique = dict(gift_data)
+    suffix = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    for key in ("gift_name_en", "gift_name_zh_hk", "gift_name_zh"):
+        if unique.get(key):
+            unique[key] = f"{unique[key]} {suffix}"
+    return unique
+
+
+class DataSeeder:
+    """测试前置数据准备：通过后台接口直接创建数据，跳过耗时的界面操作"""
+
+    def __init__(self, client: CmsApiClient, registry: EntityRegistry = None):
+        """
+        Args:
+            client: CMS 接口客户端
+            registry: 测试数据登记表，创建的数据会登记以便会话结束时清理
+        """
+        self.client = client
+        self.registry = registry
+
+    def seed_gift(self, gift_data: Dict[str, Any], unique: bool = True) -> Dict[str, Any]:
+        """
+        通过接口创建Gift
+        Args:
+            gift_data: GIFT_TEST_DATA 格式的测试数据
+            unique: 是否在名称后追加时间戳，避免并行用例按名称搜索时互相干扰
+        Returns:
+            dict: 与 gift_data 同格式的数据，附带接口返回的 id，可直接传给 GiftPage
+        """
+        seeded = with_unique_names(gift_data) if unique else dict(gift_data)
+        gift = self.client.create_gift(build_gift_payload(seeded))
+        seeded["id"] = gift.get("id")
+        if self.registry:
+            self.registry.register("gift", entity_id=seeded["id"], name=seeded.get("gift_name_en"))
+        logger.info(f"已通过接口准备Gift: {seeded.get('gift_name_en')} (id={seeded['id']})")
+        return seeded
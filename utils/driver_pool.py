@@ -0,0 +1,172 @@
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+from selenium.webdriver.remote.webdriver import WebDriver
+from .log_manager import logger
+
+
+class DriverPool:
+    """浏览器驱动池：后台预热浏览器，归还时重置状态而不是关闭，减少冷启动开销"""
+
+    def __init__(
+        self,
+        factory: Callable[[], WebDriver],
+        closer: Callable[[WebDriver], None],
+        size: int = 2,
+        max_uses: int = 20
+    ):
+        """
+        初始化驱动池
+        Args:
+            factory: 创建新浏览器的函数
+            closer: 关闭浏览器的函数
+            size: 预热的浏览器数量
+            max_uses: 单个浏览器最多复用次数，达到后关闭并补充新的浏览器，0 表示不限制
+        """
+        self._factory = factory
+        self._closer = closer
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: "queue.Queue[WebDriver]" = queue.Queue()
+        self._uses: Dict[WebDriver, int] = {}
+        self._lock = threading.Lock()
+        self._spawning: List[threading.Thread] = []
+        self._closed = False
+
+    def warm_up(self):
+        """在后台线程中启动 size 个浏览器"""
+        for _ in range(self.size):
+            self._spawn_async()
+
+    def _spawn_async(self):
+        """在后台线程中创建一个浏览器放入空闲队列"""
+        thread = threading.Thread(target=self._spawn, name="driver-pool-spawn", daemon=True)
+        with self._lock:
+            self._spawning = [t for t in self._spawning if t.is_alive()]
+            self._spawning.append(thread)
+        thread.start()
+
+    def _spawn(self):
+        """创建浏览器并放入空闲队列"""
+        try:
+            driver = self._factory()
+        except Exception as e:
+            logger.error(f"预热浏览器失败: {str(e)}")
+            return
+        if self._closed:
+            self._closer(driver)
+            return
+        self._idle.put(driver)
+        logger.info("预热浏览器已就绪")
+
+    def _has_pending_spawn(self) -> bool:
+        """是否还有正在启动的浏览器"""
+        with self._lock:
+            return any(t.is_alive() for t in self._spawning)
+
+    def acquire(self, timeout: Optional[float] = 30) -> WebDriver:
+        """
+        获取一个浏览器
+        优先使用空闲浏览器；若有浏览器正在预热则等待其就绪，否则同步创建
+        """
+        driver = None
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            if self._has_pending_spawn():
+                try:
+                    driver = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    logger.warning("等待预热浏览器超时，同步创建浏览器")
+        if driver is None:
+            driver = self._factory()
+        with self._lock:
+            self._uses[driver] = self._uses.get(driver, 0) + 1
+        return driver
+
+    def owns(self, driver: WebDriver) -> bool:
+        """driver 是否由本池分配"""
+        with self._lock:
+            return driver in self._uses
+
+    def release(self, driver: WebDriver):
+        """
+        归还浏览器：清除所有源的 cookies 与存储并换用新标签页后放回空闲队列
+        达到复用上限或重置失败时关闭该浏览器，并在后台补充一个新的
+        """
+        with self._lock:
+            uses = self._uses.get(driver, 0)
+        exhausted = self.max_uses and uses >= self.max_uses
+        if not self._closed and not exhausted and self._reset(driver):
+            self._idle.put(driver)
+            return
+
+        logger.info(f"回收浏览器(已使用{uses}次)")
+        with self._lock:
+            self._uses.pop(driver, None)
+        self._closer(driver)
+        if not self._closed:
+            self._spawn_async()
+
+    def _reset(self, driver: WebDriver) -> bool:
+        """
+        清理浏览器状态，返回是否成功
+        cookies 与各标签页访问过的源的 localStorage/IndexedDB/缓存等通过 CDP 清除，
+        旧标签页全部关闭、换用新标签页以丢弃 sessionStorage；不支持 CDP 的浏览器无法清除其他源的状态，不复用
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return False
+        try:
+            origins: Set[str] = set()
+            handles = driver.window_handles
+            for handle in handles:
+                driver.switch_to.window(handle)
+                origins.update(self._visited_origins(driver))
+            driver.switch_to.new_window("tab")
+            fresh = driver.current_window_handle
+            for handle in handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in origins:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            return True
+        except Exception as e:
+            logger.warning(f"重置浏览器状态失败: {str(e)}")
+            return False
+
+    @staticmethod
+    def _visited_origins(driver: WebDriver) -> Set[str]:
+        """当前标签页导航历史中的 http(s) 源"""
+        history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+        origins = set()
+        for entry in history.get("entries", []):
+            parts = urlsplit(entry.get("url", ""))
+            if parts.scheme in ("http", "https"):
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+        return origins
+
+    def shutdown(self):
+        """关闭池中所有浏览器，包括未归还的(如 fixture 异常中止时)"""
+        self._closed = True
+        with self._lock:
+            spawning = list(self._spawning)
+        for thread in spawning:
+            thread.join(timeout=30)
+        closed = set()
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._closer(driver)
+            closed.add(driver)
+        with self._lock:
+            checked_out = [driver for driver in self._uses if driver not in closed]
+            self._uses.clear()
+        for driver in checked_out:
+            logger.warning("会话结束时浏览器仍未归还，直接关闭")
+            self._closer(driver)
+        logger.info("浏览器驱动池已关闭")
@@ -0,0 +1,198 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from .api_client import CmsApiClient
+from .log_manager import logger
+
+
+def entity_name(item: Dict[str, Any]) -> str:
+    """取接口返回数据的名称，多语言标题取英文"""
+    title = item.get("title", item.get("name", ""))
+    if isinstance(title, dict):
+        return title.get("en", "")
+    return title or ""
+
+
+# 接口返回数据中常见的创建时间字段
+_CREATED_FIELDS = ("createdAt", "createTime", "created_at", "createDate", "gmtCreate")
+
+
+def entity_created_at(item: Dict[str, Any]) -> Optional[float]:
+    """
+    取接口返回数据的创建时间
+    Returns:
+        float: 时间戳(秒)，没有可识别的创建时间时返回None
+    """
+    for field in _CREATED_FIELDS:
+        value = item.get(field)
+        if value in (None, ""):
+            continue
+        if isinstance(value, (int, float)):
+            # 13 位为毫秒时间戳
+            return value / 1000 if value > 1e11 else float(value)
+        text = str(value).strip().replace("Z", "+00:00")
+        for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, "%Y-%m-%d %H:%M:%S")):
+            try:
+                return parse(text).timestamp()
+            except ValueError:
+                continue
+    return None
+
+
+class EntityRegistry:
+    """测试数据登记表：记录用例创建的数据，会话结束时通过接口批量删除"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例"""
+        if cls._instance is None:
+            cls._instance = EntityRegistry()
+        return cls._instance
+
+    def __init__(self):
+        """初始化登记表"""
+        self._entities: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # 按名称登记的数据只清理此后创建的，避免删除其他运行中同名的数据
+        self.started_at = time.time()
+
+    def register(self, kind: str, entity_id: Any = None, name: Optional[str] = None):
+        """
+        登记一条测试数据
+        Args:
+            kind: 资源类型，如 gift
+            entity_id: 数据 id（接口创建时已知）
+            name: 数据名称（界面创建时只知道名称，清理时按名称查出 id）
+        """
+        if entity_id is None and not name:
+            raise ValueError("登记测试数据时必须提供 id 或名称")
+        with self._lock:
+            self._entities.append({"kind": kind, "id": entity_id, "name": name})
+        logger.info(f"登记测试数据: {kind} id={entity_id} name={name}")
+
+    def entities(self) -> List[Dict[str, Any]]:
+        """已登记的数据"""
+        with self._lock:
+            return list(self._entities)
+
+    def clear(self):
+        """清空登记表"""
+        with self._lock:
+            self._entities = []
+
+    def cleanup(self, client: CmsApiClient, batch_size: int = 20, max_workers: int = 5,
+                clock_skew: float = 300) -> Dict[str, Any]:
+        """
+        删除所有已登记的数据
+        按名称登记的数据逐页查出全部同名数据，只删除登记表创建之后创建的，缺少创建时间的不删除
+        Args:
+            client: CMS 接口客户端
+            batch_size: 每批删除数量
+            max_workers: 每批内并发删除的线程数
+            clock_skew: 允许的本机与服务端时钟偏差(秒)
+        Returns:
+            dict: {"deleted": 删除数量, "failed": [删除失败的数据]}
+        """
+        created_after = self.started_at - clock_skew
+        targets = []
+        for entity in self.entities():
+            if entity["id"] is not None:
+                targets.append((entity["kind"], entity["id"]))
+                continue
+            # 界面创建的数据按名称精确匹配查出 id
+            try:
+                matches = [item for item in client.search_all(entity["kind"], entity["name"])
+                           if entity_name(item) == entity["name"]]
+            except Exception as e:
+                logger.warning(f"查询待清理数据失败 {entity['name']}: {str(e)}")
+                continue
+            for item in matches:
+                created_at = entity_created_at(item)
+                if created_at is None or created_at < created_after:
+                    logger.info(f"保留非本次会话创建的同名数据: {entity['name']} id={item['id']}")
+                    continue
+                targets.append((entity["kind"], item["id"]))
+
+        result = self._delete_all(client, dict.fromkeys(targets), batch_size, max_workers)
+        self.clear()
+        return result
+
+    def sweep_orphans(self, client: CmsApiClient, prefixes: Iterable[str], kind: str = "gift",
+                      min_age: float = 3600, batch_size: int = 20, max_workers: int = 5,
+                      page_size: int = 100, max_passes: int = 10) -> Dict[str, Any]:
+        """
+        按名称前缀清理历史遗留的测试数据
+        逐页查询全部匹配的数据，删除后重新查询，直到没有新的可删除数据；
+        只删除创建时间早于 min_age 的数据，避免删除同一环境上正在运行的用例所用的数据
+        Args:
+            client: CMS 接口客户端
+            prefixes: 名称前缀列表，如 ["Auto Test Gift"]
+            kind: 资源类型
+            min_age: 只删除创建超过该时长(秒)的数据，没有创建时间的数据不删除
+            page_size: 查询的每页数量
+            max_passes: 最多查询删除的轮数
+        Returns:
+            dict: {"deleted": 删除数量, "failed": [删除失败的数据], "skipped": 因太新或缺少创建时间而保留的数量}
+        """
+        prefixes = list(prefixes)
+        cutoff = time.time() - min_age
+        seen, skipped = set(), set()
+        deleted, failed = 0, []
+        for _ in range(max_passes):
+            targets = {}
+            for prefix in prefixes:
+                try:
+                    items = client.search_all(kind, prefix, page_size=page_size)
+                except Exception as e:
+                    logger.warning(f"按前缀查询遗留数据失败 {prefix}: {str(e)}")
+                    continue
+                for item in items:
+                    key = (kind, item["id"])
+                    if key in seen or not entity_name(item).startswith(prefix):
+                        continue
+                    seen.add(key)
+                    created_at = entity_created_at(item)
+                    if created_at is None or created_at > cutoff:
+                        skipped.add(key)
+                        continue
+                    targets[key] = None
+            if not targets:
+                break
+            logger.info(f"按前缀 {prefixes} 找到 {len(targets)} 条遗留数据")
+            result = self._delete_all(client, targets, batch_size, max_workers)
+            deleted += result["deleted"]
+            failed.extend(result["failed"])
+        if skipped:
+            logger.info(f"保留 {len(skipped)} 条创建不足 {min_age} 秒或缺少创建时间的数据")
+        return {"deleted": deleted, "failed": failed, "skipped": len(skipped)}
+
+    @staticmethod
+    def _delete_all(client: CmsApiClient, targets: Dict, batch_size: int, max_workers: int) -> Dict[str, Any]:
+        """分批并发删除"""
+        targets = list(targets)
+        deleted, failed = 0, []
+
+        def delete(target):
+            kind, entity_id = target
+            try:
+                client.delete(kind, entity_id)
+                return True
+            except Exception as e:
+                logger.warning(f"删除测试数据失败 {kind} id={entity_id}: {str(e)}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="entity-cleanup") as executor:
+            for start in range(0, len(targets), batch_size):
+                batch = targets[start:start + batch_size]
+                for target, ok in zip(batch, executor.map(delete, batch)):
+                    if ok:
+                        deleted += 1
+                    else:
+                        failed.append({"kind": target[0], "id": target[1]})
+
+        logger.info(f"测试数据清理完成: 删除 {deleted} 条, 失败 {len(failed)} 条")
+        return {"deleted": deleted, "failed": failed}
@@ -0,0 +1,211 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from .log_manager import logger
+from .run_history import StepTimer, percentile
+
+
+# 步骤函数: fn(driver, 虚拟用户序号, 迭代序号)，返回 False 或抛出异常视为失败
+Step = Tuple[str, Callable]
+
+
+def _describe_error(e: Exception) -> str:
+    """异常的单行描述"""
+    message = str(e).strip().splitlines()
+    return f"{type(e).__name__}: {message[0]}" if message else type(e).__name__
+
+
+class LoadStats:
+    """并发压测的统计：每个步骤的耗时、失败次数与错误信息"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._errors = {}
+        self._messages = Counter()
+        self.iterations = 0
+        self.failed_iterations = 0
+
+    def record(self, step: str, seconds: float, error: Optional[str] = None):
+        """记录一次步骤执行"""
+        with self._lock:
+            self._samples.setdefault(step, []).append(seconds)
+            if error:
+                self._errors[step] = self._errors.get(step, 0) + 1
+                self._messages[f"{step}: {error}"] += 1
+
+    def finish_iteration(self, ok: bool):
+        """记录一次迭代(完整业务流程)是否成功"""
+        with self._lock:
+            self.iterations += 1
+            self.failed_iterations += not ok
+
+    @staticmethod
+    def describe(durations: List[float]) -> Dict[str, float]:
+        """耗时分布(秒)：均值、p50/p90/p95/p99 与最大值"""
+        return {
+            "mean": sum(durations) / len(durations),
+            "p50": percentile(durations, 50),
+            "p90": percentile(durations, 90),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+            "max": max(durations),
+        }
+
+    def summary(self, elapsed: float) -> dict:
+        """汇总吞吐量、各步骤耗时分位数与错误率"""
+        with self._lock:
+            steps = {}
+            for step, durations in self._samples.items():
+                errors = self._errors.get(step, 0)
+                steps[step] = dict(self.describe(durations), count=len(durations), errors=errors,
+                                   error_rate=errors / len(durations))
+            total = sum(len(durations) for durations in self._samples.values())
+            return {
+                "elapsed": elapsed,
+                "iterations": self.iterations,
+                "failed_iterations": self.failed_iterations,
+                "throughput": self.iterations / elapsed if elapsed > 0 else 0.0,
+                "error_rate": sum(self._errors.values()) / total if total else 0.0,
+                "steps": steps,
+                "errors": dict(self._messages.most_common(20)),
+            }
+
+
+class LoadRunner:
+    """
+    并发压测运行器：多个虚拟用户各自使用一个浏览器，按爬坡计划依次启动，
+    先执行一次准备步骤(如登录)，再循环执行业务步骤，步骤之间随机思考时间
+    """
+
+    def __init__(self, driver_factory: Callable, steps: List[Step], setup_steps: Optional[List[Step]] = None,
+                 users: int = 1, ramp_up: float = 0, think_time: Tuple[float, float] = (0, 0),
+                 iterations: Optional[int] = 1, duration: Optional[float] = None,
+                 driver_closer: Optional[Callable] = None):
+        """
+        Args:
+            driver_factory: 创建浏览器的函数，每个虚拟用户调用一次
+            steps: 每次迭代依次执行的业务步骤 [(步骤名, 函数)]
+            setup_steps: 每个虚拟用户开始时执行一次的准备步骤，失败时该用户退出
+            users: 并发虚拟用户数
+            ramp_up: 爬坡时间(秒)，虚拟用户在此时间内均匀启动
+            think_time: 步骤之间的思考时间范围(秒) (最小, 最大)
+            iterations: 每个虚拟用户的迭代次数，为空时只受 duration 限制
+            duration: 最长运行时间(秒)，从第一个用户启动开始计算
+            driver_closer: 关闭浏览器的函数，默认调用 driver.quit()
+        """
+        if iterations is None and duration is None:
+            raise ValueError("iterations 与 duration 至少需要指定一个")
+        self.driver_factory = driver_factory
+        self.steps = steps
+        self.setup_steps = setup_steps or []
+        self.users = max(1, users)
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.iterations = iterations
+        self.duration = duration
+        self.driver_closer = driver_closer or (lambda driver: driver.quit())
+        self.stats = LoadStats()
+        self._deadline = None
+
+    def _think(self):
+        low, high = self.think_time
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def _expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _run_step(self, name: str, func: Callable, driver, user: int, iteration: int) -> bool:
+        """执行并计时一个步骤，返回是否成功"""
+        start = time.perf_counter()
+        error = None
+        try:
+            if func(driver, user, iteration) is False:
+                error = "返回失败"
+        except Exception as e:
+            error = _describe_error(e)
+        self.stats.record(name, time.perf_counter() - start, error)
+        if error:
+            logger.warning(f"虚拟用户{user} 步骤 {name} 失败: {error}")
+        return error is None
+
+    def _user(self, user: int):
+        """单个虚拟用户：按爬坡计划等待启动，执行准备步骤后循环执行业务步骤"""
+        time.sleep(self.ramp_up * user / self.users)
+        if self._expired():
+            return
+        start = time.perf_counter()
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            self.stats.record("driver", time.perf_counter() - start, _describe_error(e))
+            logger.error(f"虚拟用户{user} 创建浏览器失败: {_describe_error(e)}")
+            return
+        self.stats.record("driver", time.perf_counter() - start)
+        try:
+            for name, func in self.setup_steps:
+                if not self._run_step(name, func, driver, user, 0):
+                    return
+            iteration = 0
+            while (self.iterations is None or iteration < self.iterations) and not self._expired():
+                ok = True
+                for name, func in self.steps:
+                    self._think()
+                    if not self._run_step(name, func, driver, user, iteration):
+                        # 步骤失败后页面状态不确定，放弃本次迭代的剩余步骤
+                        ok = False
+                        break
+                self.stats.finish_iteration(ok)
+                iteration += 1
+        finally:
+            try:
+                self.driver_closer(driver)
+            except Exception as e:
+                logger.warning(f"虚拟用户{user} 关闭浏览器失败: {str(e)}")
+
+    def run(self) -> dict:
+        """
+        运行压测并等待所有虚拟用户结束
+        Returns:
+            dict: LoadStats.summary 的结果，另含配置与页面对象操作(timed_action)的耗时分布
+        """
+        logger.info(f"开始压测: {self.users} 个虚拟用户，爬坡 {self.ramp_up} 秒，"
+                    f"迭代 {self.iterations or '不限'} 次，时长 {self.duration or '不限'} 秒")
+        step_timer = StepTimer.get_instance()
+        step_timer.drain()
+        started = time.monotonic()
+        if self.duration is not None:
+            self._deadline = started + self.duration
+        threads = [threading.Thread(target=self._user, args=(user,), name=f"load-user-{user}", daemon=True)
+                   for user in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result = self.stats.summary(time.monotonic() - started)
+        actions = {}
+        for _, action, seconds in step_timer.drain():
+            actions.setdefault(action, []).append(seconds)
+        result["actions"] = {action: dict(LoadStats.describe(durations), count=len(durations))
+                             for action, durations in actions.items()}
+        result.update(users=self.users, ramp_up=self.ramp_up, think_time=list(self.think_time),
+                      iterations_per_user=self.iterations, duration=self.duration)
+        logger.info(f"压测结束: {result['iterations']} 次迭代，吞吐量 {result['throughput']:.2f} 次/秒，"
+                    f"错误率 {result['error_rate']:.1%}")
+        return result
+
+    @staticmethod
+    def save(result: dict, output_dir: str) -> str:
+        """将压测结果写入 output_dir/load_<时间戳>.json"""
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        return path
@@ -1,15 +1,24 @@
+import atexit
+import glob
 import logging
 import os
+import queue
+import re
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
 
+# 日志记录的起始行，以 asctime 默认格式开头
+_RECORD_START = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}")
+
+
 class LogManager:
     """统一的日志管理类"""
     
     _instance = None
     _logger = None
+    _listener = None
     
     @classmethod
     def get_instance(cls):
@@ -24,47 +33,59 @@ class LogManager:
             self._setup_logging()
     
     def _setup_logging(self):
-        """配置日志系统"""
+        """
+        配置日志系统
+        所有处理器挂在 QueueListener 上：测试线程只把日志放入队列，格式化与文件/控制台写入在后台线程完成。
+        处理器统一挂在根 logger 上，TestAutomation 与 conftest 中 logging.* 的日志共用同一条管道
+        """
         try:
             # 创建日志目录
             log_dir = "logs"
             os.makedirs(log_dir, exist_ok=True)
             
-            # 生成日志文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            log_file = os.path.join(log_dir, f"test_{timestamp}.log")
-            
-            # 创建日志记录器
-            self._logger = logging.getLogger("TestAutomation")
-            self._logger.setLevel(logging.INFO)
+            # 生成日志文件名：xdist 主进程与 worker 共用同一个运行标识，worker 写各自的文件，会话结束时合并
+            # 运行标识带进程号，同一秒启动的多个运行(如并行的 CI 分片)不会共用日志与运行历史记录
+            self.run_id = os.environ.setdefault(
+                "CMS_LOG_RUN_ID", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+            )
+            self.worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+            suffix = f"_{self.worker_id}" if self.worker_id else ""
+            self.log_file = os.path.join(log_dir, f"test_{self.run_id}{suffix}.log")
             
             # 文件处理器
             # 使用轮转日志处理器，限制单个文件大小为5MB，最多保留3个备份
-            file_handler = RotatingFileHandler(
-                log_file, encoding="utf-8", maxBytes=5*1024*1024, backupCount=3
+            self._file_handler = RotatingFileHandler(
+                self.log_file, encoding="utf-8", maxBytes=5*1024*1024, backupCount=3
             )
-            file_handler.setLevel(logging.INFO)
+            self._file_handler.setLevel(logging.INFO)
             
             # 控制台处理器
             console_handler = logging.StreamHandler()
             console_handler.setLevel(logging.INFO)
             
-            # 格式化器
-            formatter = logging.Formatter(
-                "%(asctime)s - %(levelname)s - %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S"
-            )
-            # 添加日志来源信息
+            # 格式化器，包含日志来源信息
             formatter = logging.Formatter(
                 "%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s",
             )
-            
-            file_handler.setFormatter(formatter)
+            self._file_handler.setFormatter(formatter)
             console_handler.setFormatter(formatter)
             
-            # 添加处理器
-            self._logger.addHandler(file_handler)
-            self._logger.addHandler(console_handler)
+            # 后台线程负责格式化与写入
+            log_queue = queue.SimpleQueue()
+            self._listener = QueueListener(
+                log_queue, self._file_handler, console_handler, respect_handler_level=True
+            )
+            self._listener.start()
+            atexit.register(self.stop)
+            
+            root_logger = logging.getLogger()
+            root_logger.setLevel(logging.INFO)
+            self._queue_handler = QueueHandler(log_queue)
+            root_logger.addHandler(self._queue_handler)
+            
+            # 创建日志记录器，不单独挂处理器，通过根 logger 输出
+            self._logger = logging.getLogger("TestAutomation")
+            self._logger.setLevel(logging.INFO)
             
             self.info("日志系统初始化完成")
             
@@ -72,6 +93,59 @@ class LogManager:
             print(f"初始化日志系统失败: {str(e)}")
             raise
     
+    def stop(self):
+        """
+        停止后台日志线程，写完队列中剩余的日志并刷新到磁盘
+        之后的日志改为在调用线程中直接写入，xdist worker 在会话结束时调用，保证主进程合并时日志已完整落盘
+        """
+        if self._listener is None:
+            return
+        root_logger = logging.getLogger()
+        # 先挂上直接写入的处理器再摘掉队列，停止过程中产生的日志不会丢失
+        for handler in self._listener.handlers:
+            root_logger.addHandler(handler)
+        root_logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        self._listener = None
+        self._file_handler.flush()
+    
+    def merge_worker_logs(self) -> int:
+        """
+        将本次运行各 xdist worker 的日志按时间合并追加到主日志文件，并删除 worker 日志
+        Returns:
+            int: 合并的 worker 日志文件数
+        """
+        pattern = os.path.join(os.path.dirname(self.log_file), f"test_{self.run_id}_gw*.log*")
+        worker_files = sorted(glob.glob(pattern))
+        if not worker_files:
+            return 0
+        
+        entries = []
+        for path in worker_files:
+            worker = re.search(r"_(gw\d+)\.log", path).group(1)
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    # 以时间戳开头的行是新记录，其余行(如异常堆栈)归入上一条记录
+                    if _RECORD_START.match(line) or not entries:
+                        entries.append([line[:23], worker, line])
+                    else:
+                        entries[-1][2] += line
+        entries.sort(key=lambda entry: entry[0])
+        
+        self._file_handler.acquire()
+        try:
+            self._file_handler.flush()
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(f"===== 合并 {len(worker_files)} 个 xdist worker 日志 =====\n")
+                for _, worker, text in entries:
+                    f.write(f"[{worker}] {text}")
+        finally:
+            self._file_handler.release()
+        
+        for path in worker_files:
+            os.remove(path)
+        return len(worker_files)
+    
     def debug(self, message: str, *args, **kwargs):
         """记录调试级别日志"""
         self._logger.debug(message, *args, **kwargs)
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from .config_manager import ConfigManager
+from .log_manager import logger
+from .run_history import StepTimer
+
+
+# 采集页面性能数据：since 为空时是整页导航(从导航开始计时)，否则是 SPA 路由切换(从 since 计时)
+# 可交互时刻取 fetch/XHR 请求数最近一次归零的时刻(BasePage 的网络钩子)，不包含 wait_for_network_idle 的静默等待，
+# 整页导航时不早于 load 事件；页面没有在导航时挂载网络钩子时退回采集时刻
+_COLLECT_SCRIPT = """
+var since = arguments[0], now = performance.now();
+var network = window.__cmsNetwork;
+// 钩子不是在导航时挂载的(如非 Chromium 驱动在页面加载后才注入)，idleAt 只是注入时刻，退回采集时刻
+var tracked = network && network.fromStart && network.pending === 0 && network.idleAt !== null;
+var readyAt = tracked ? network.idleAt : now;
+var nav = performance.getEntriesByType('navigation')[0];
+if (since === null && nav && nav.loadEventEnd) { readyAt = Math.max(readyAt, nav.loadEventEnd); }
+var result = {
+    url: location.href,
+    path: location.pathname + location.hash,
+    spa: since !== null,
+    interactive_ms: since === null ? readyAt : Math.max(0, readyAt - since),
+    interactive_source: tracked ? 'network_idle' : 'capture'
+};
+if (since === null) {
+    if (nav) {
+        result.navigation = {
+            ttfb_ms: nav.responseStart,
+            dom_interactive_ms: nav.domInteractive,
+            dom_content_loaded_ms: nav.domContentLoadedEventEnd,
+            load_ms: nav.loadEventEnd,
+            transfer_size: nav.transferSize
+        };
+    }
+    result.paint = {};
+    performance.getEntriesByType('paint').forEach(function (entry) {
+        result.paint[entry.name.replace(/-/g, '_') + '_ms'] = entry.startTime;
+    });
+}
+var resources = performance.getEntriesByType('resource').filter(function (entry) {
+    return entry.startTime >= (since || 0);
+});
+var byType = {}, transfer = 0;
+resources.forEach(function (entry) {
+    byType[entry.initiatorType] = (byType[entry.initiatorType] || 0) + 1;
+    transfer += entry.transferSize || 0;
+});
+result.resources = {
+    count: resources.length,
+    transfer_size: transfer,
+    by_type: byType,
+    slowest: resources.slice().sort(function (a, b) { return b.duration - a.duration; }).slice(0, 5)
+        .map(function (entry) {
+            return { name: entry.name, type: entry.initiatorType, duration_ms: entry.duration };
+        })
+};
+// 默认只缓存250条资源记录，调大以免长流程中后续请求丢失
+if (performance.setResourceTimingBufferSize) { performance.setResourceTimingBufferSize(1000); }
+return result;
+"""
+
+
+def flatten_metrics(record: dict) -> Dict[str, float]:
+    """把一条记录展开为 {指标名: 数值}，用于与预算比较"""
+    metrics = {"interactive_ms": record.get("interactive_ms")}
+    metrics.update(record.get("navigation") or {})
+    metrics.update(record.get("paint") or {})
+    resources = record.get("resources") or {}
+    metrics["resource_count"] = resources.get("count")
+    metrics["resource_transfer_size"] = resources.get("transfer_size")
+    return {name: value for name, value in metrics.items() if isinstance(value, (int, float))}
+
+
+class PerformanceRecorder:
+    """
+    页面性能记录器
+    BasePage 在整页导航和 SPA 路由切换后采集 Navigation/Resource/Paint Timing，
+    按用例保存在内存中，会话结束时写出 JSON，performance 用例可按配置的预算断言
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例"""
+        if cls._instance is None:
+            config = ConfigManager.get_instance()._config.get("performance", {})
+            cls._instance = PerformanceRecorder(
+                enabled=config.get("enabled", True),
+                output_dir=config.get("output_dir", "reports/performance"),
+                budgets=config.get("budgets")
+            )
+        return cls._instance
+
+    def __init__(self, enabled: bool = True, output_dir: str = "reports/performance",
+                 budgets: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        Args:
+            enabled: 是否采集
+            output_dir: JSON 结果目录
+            budgets: 性能预算 {页面标签或路径片段: {指标名: 上限}}
+        """
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.budgets = budgets or {}
+        self._lock = threading.Lock()
+        self._records = []
+
+    def capture(self, driver, label: Optional[str] = None, since: Optional[float] = None) -> Optional[dict]:
+        """
+        采集当前页面的性能数据
+        Args:
+            driver: WebDriver实例
+            label: 页面标签，默认使用页面路径
+            since: SPA 路由切换开始时的 performance.now()，为空时按整页导航采集
+        Returns:
+            dict: 性能记录，未启用或采集失败时返回None
+        """
+        if not self.enabled:
+            return None
+        try:
+            record = driver.execute_script(_COLLECT_SCRIPT, since)
+        except Exception as e:
+            logger.warning(f"采集页面性能数据失败: {str(e)}")
+            return None
+        record["label"] = label or record.get("path")
+        record["test"] = StepTimer.current_test_id()
+        record["time"] = datetime.now().isoformat(timespec="milliseconds")
+        with self._lock:
+            self._records.append(record)
+        logger.info(f"页面性能 {record['label']}: 可交互 {record['interactive_ms']:.0f}ms，"
+                    f"请求 {record['resources']['count']} 个")
+        return record
+
+    def records(self, test_id: Optional[str] = None) -> List[dict]:
+        """返回某个用例(默认当前用例)的性能记录，test_id 为空字符串时返回全部"""
+        test_id = StepTimer.current_test_id() if test_id is None else test_id
+        with self._lock:
+            return [record for record in self._records if not test_id or record["test"] == test_id]
+
+    def check_budgets(self, records: Optional[List[dict]] = None,
+                      budgets: Optional[Dict[str, Dict[str, float]]] = None) -> List[str]:
+        """
+        检查性能记录是否超出预算，预算键与记录的标签相同或包含在页面路径中即适用
+        Returns:
+            list: 超出预算的描述，全部满足时为空
+        """
+        records = self.records() if records is None else records
+        budgets = self.budgets if budgets is None else budgets
+        violations = []
+        for record in records:
+            metrics = flatten_metrics(record)
+            for key, limits in budgets.items():
+                if key != record["label"] and key not in (record.get("path") or ""):
+                    continue
+                for name, limit in limits.items():
+                    value = metrics.get(name)
+                    if value is not None and value > limit:
+                        violations.append(f"{record['label']} {name}={value:.0f} 超出预算 {limit}")
+        return violations
+
+    def assert_budgets(self, budgets: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        断言当前用例采集到的页面都满足预算
+        Args:
+            budgets: 覆盖配置中的预算
+        Raises:
+            AssertionError: 存在超出预算的指标，或当前用例没有采集到性能数据
+        """
+        records = self.records()
+        assert records, "当前用例没有采集到页面性能数据"
+        violations = self.check_budgets(records, budgets)
+        assert not violations, "页面性能超出预算: " + "; ".join(violations)
+
+    def save(self, run_id: str, worker_id: Optional[str] = None) -> Optional[str]:
+        """
+        将本进程的性能记录写入 JSON 文件
+        Returns:
+            str: 文件路径，没有记录时返回None
+        """
+        with self._lock:
+            records = list(self._records)
+        if not records:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        suffix = f"_{worker_id}" if worker_id else ""
+        path = os.path.join(self.output_dir, f"perf_{run_id}{suffix}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"run_id": run_id, "worker": worker_id, "budgets": self.budgets, "records": records},
+                      f, ensure_ascii=False, indent=2)
+        logger.info(f"页面性能数据已保存: {path}")
+        return path
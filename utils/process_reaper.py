@@ -0,0 +1,146 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from selenium.webdriver.remote.webdriver import WebDriver
+from .log_manager import logger
+
+
+def service_popen_kwargs() -> Dict:
+    """
+    chromedriver 的启动参数：放入独立进程组，Chrome 作为其子进程也在同一组内
+    关闭时只需终止该进程组，不会影响其他 xdist worker 的浏览器
+    """
+    if sys.platform.startswith('win'):
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+class ProcessReaper:
+    """按会话回收浏览器进程：先限时 quit，超时后只终止该 driver 自己的进程树"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例"""
+        if cls._instance is None:
+            cls._instance = ProcessReaper()
+        return cls._instance
+
+    def __init__(self, max_workers: int = 4):
+        """初始化进程回收器"""
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="driver-reaper")
+        self._processes: Dict[WebDriver, Dict[str, Optional[int]]] = {}
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def register(self, driver: WebDriver):
+        """记录 driver 对应的 chromedriver PID 与进程组"""
+        try:
+            pid = driver.service.process.pid
+        except AttributeError:
+            logger.warning("无法获取 chromedriver 进程号，关闭时仅执行 quit")
+            return
+        pgid = None
+        if hasattr(os, "getpgid"):
+            try:
+                pgid = os.getpgid(pid)
+            except OSError:
+                pgid = None
+            # 未能放入独立进程组时不能按组终止，否则会杀掉测试进程自身
+            if pgid == os.getpgrp():
+                pgid = None
+        with self._lock:
+            self._processes[driver] = {"pid": pid, "pgid": pgid}
+        logger.info(f"记录浏览器进程: chromedriver pid={pid}, pgid={pgid}")
+
+    def close(self, driver: WebDriver, timeout: float = 10) -> Future:
+        """
+        异步关闭 driver，立即返回，不阻塞 fixture 的 teardown
+        Args:
+            driver: WebDriver实例
+            timeout: 等待 quit 完成的最长时间(秒)，超时后终止进程树
+        """
+        with self._lock:
+            process = self._processes.pop(driver, None)
+        future = self._executor.submit(self._close, driver, process, timeout)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+        return future
+
+    def _close(self, driver: WebDriver, process: Optional[Dict[str, Optional[int]]], timeout: float):
+        """执行限时 quit，失败或超时则终止进程树"""
+        errors = []
+        quit_thread = threading.Thread(target=self._quit, args=(driver, errors), daemon=True)
+        quit_thread.start()
+        quit_thread.join(timeout=timeout)
+        if quit_thread.is_alive():
+            logger.warning(f"quit操作超过{timeout}秒，终止浏览器进程树")
+        elif not errors:
+            # quit 正常完成时 selenium 已回收 chromedriver，记录的进程号可能已被其他进程复用
+            return
+        if process and self._has_processes(driver, process):
+            self._kill_tree(process)
+
+    @staticmethod
+    def _quit(driver: WebDriver, errors: list):
+        """调用 driver.quit()，异常记录到 errors"""
+        try:
+            driver.quit()
+        except Exception as e:
+            errors.append(e)
+            logger.warning(f"关闭浏览器时出错: {str(e)}")
+
+    @staticmethod
+    def _has_processes(driver: WebDriver, process: Dict[str, Optional[int]]) -> bool:
+        """
+        driver 的进程树是否还有存活的进程
+        quit 抛出异常时 selenium 已停止 chromedriver，但 Chrome 子进程可能仍留在进程组中，因此按进程组判断；
+        进程组内还有进程时组号不会被复用，可以安全地按组终止
+        没有独立进程组(Windows)时只能看 chromedriver 是否仍在运行，已退出时不能再按进程号终止
+        """
+        if process["pgid"]:
+            try:
+                os.killpg(process["pgid"], 0)
+                return True
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                # 组号已属于其他用户的进程，不是本 driver 的进程树
+                return False
+        try:
+            return driver.service.process.poll() is None
+        except AttributeError:
+            return False
+
+    @staticmethod
+    def _kill_tree(process: Dict[str, Optional[int]]):
+        """终止单个 driver 的进程树"""
+        pid, pgid = process["pid"], process["pgid"]
+        try:
+            if sys.platform.startswith('win'):
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)],
+                               capture_output=True, check=False, timeout=5)
+            elif pgid:
+                os.killpg(pgid, signal.SIGKILL)
+            else:
+                os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            return
+        except Exception as e:
+            logger.error(f"终止浏览器进程失败(pid={pid}): {str(e)}")
+            return
+        logger.info(f"已终止浏览器进程树: pid={pid}, pgid={pgid}")
+
+    def wait_all(self, timeout: Optional[float] = 30):
+        """等待所有关闭任务完成，在会话结束时调用"""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending = []
+        if pending:
+            wait(pending, timeout=timeout)
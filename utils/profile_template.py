@@ -0,0 +1,256 @@
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from .browser_cache import try_lock_file, unlock_file
+from .config_manager import ConfigManager
+from .log_manager import logger
+
+
+# Chrome 运行时的单实例锁文件，不能带入克隆的 profile
+_RUNTIME_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+
+
+def _clone_command(src: str, dst: str) -> Optional[List[str]]:
+    """支持写时复制(reflink/clonefile)的平台上的复制命令"""
+    if sys.platform.startswith("linux"):
+        return ["cp", "-a", "--reflink=always", src, dst]
+    if sys.platform == "darwin":
+        return ["cp", "-cR", src, dst]
+    return None
+
+
+def clone_tree(src: str, dst: str) -> str:
+    """
+    复制目录：文件系统支持时使用写时复制(btrfs/xfs 的 reflink、APFS 的 clonefile)，否则逐个复制文件
+    Returns:
+        str: 使用的方式 reflink/copy
+    """
+    command = _clone_command(src, dst)
+    if command:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode == 0:
+            method = "reflink"
+        else:
+            shutil.rmtree(dst, ignore_errors=True)
+            command = None
+    if not command:
+        shutil.copytree(src, dst, symlinks=True, ignore=shutil.ignore_patterns(*_RUNTIME_FILES))
+        method = "copy"
+    for name in _RUNTIME_FILES:
+        path = os.path.join(dst, name)
+        if os.path.lexists(path):
+            os.remove(path)
+    return method
+
+
+class ProfileTemplate:
+    """
+    按环境保存的模板 Chrome user-data-dir：已登录、缓存已预热、首次运行提示已关闭
+    每个新浏览器使用模板的克隆，模板超过有效期或登录态过期/失效时重建
+    模板按版本保存为不可变目录 template-<构建时间>，由 current.json 原子地指向当前版本；
+    构建在文件锁内进行，xdist worker 之间只会有一个构建模板，克隆只在锁内登记后即在锁外复制
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例，未启用时返回None"""
+        if cls._instance is None:
+            config = ConfigManager.get_instance().get_browser_config().get("profile_template", {})
+            if not config.get("enabled", False):
+                return None
+            cls._instance = ProfileTemplate(
+                config.get("dir", "cache/profiles"),
+                ttl=config.get("ttl", 21600)
+            )
+        return cls._instance
+
+    def __init__(self, root: str, ttl: int = 21600):
+        """
+        Args:
+            root: 模板与克隆的根目录，克隆与模板在同一文件系统上才能使用写时复制
+            ttl: 模板有效期(秒)
+        """
+        self.root = os.path.abspath(root)
+        self.ttl = ttl
+        os.makedirs(self.root, exist_ok=True)
+
+    def _env_dir(self, env: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^\w.-]", "_", env))
+
+    def _clones_dir(self, env: str) -> str:
+        return os.path.join(self._env_dir(env), "clones")
+
+    def _pointer_path(self, env: str) -> str:
+        return os.path.join(self._env_dir(env), "current.json")
+
+    def _read_pointer(self, env: str) -> Optional[dict]:
+        """读取当前版本指针 {version, built_at, expires_at}，不存在或损坏时返回None"""
+        try:
+            with open(self._pointer_path(env), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def template_dir(self, env: str) -> Optional[str]:
+        """环境当前版本的模板目录，尚未构建时返回None"""
+        pointer = self._read_pointer(env)
+        if not pointer or not pointer.get("version"):
+            return None
+        return os.path.join(self._env_dir(env), pointer["version"])
+
+    @contextmanager
+    def _locked(self, env: str, timeout: float = 300):
+        """独占环境的模板锁，构建耗时较长，其他 worker 轮询等待"""
+        os.makedirs(self._env_dir(env), exist_ok=True)
+        path = os.path.join(self._env_dir(env), ".lock")
+        deadline = time.time() + timeout
+        handle = try_lock_file(path)
+        while handle is None:
+            if time.time() > deadline:
+                raise TimeoutError(f"等待模板 profile 锁超时: {path}")
+            time.sleep(0.2)
+            handle = try_lock_file(path)
+        try:
+            yield
+        finally:
+            unlock_file(handle)
+
+    def _fresh_version(self, env: str) -> Optional[str]:
+        """当前版本未超过有效期且登录 cookie 未过期时返回版本名，否则返回None"""
+        pointer = self._read_pointer(env)
+        if not pointer or not pointer.get("version"):
+            return None
+        now = time.time()
+        if now - pointer.get("built_at", 0) > self.ttl:
+            return None
+        # 预留一分钟，避免克隆后用例执行过程中登录态过期
+        if pointer.get("expires_at") and pointer["expires_at"] < now + 60:
+            return None
+        if not os.path.isdir(os.path.join(self._env_dir(env), pointer["version"])):
+            return None
+        return pointer["version"]
+
+    def is_fresh(self, env: str) -> bool:
+        """模板存在、未超过有效期，且登录 cookie 未过期"""
+        return self._fresh_version(env) is not None
+
+    def ensure(self, env: str, builder: Callable[[str], Optional[list]]) -> bool:
+        """
+        模板不可用时构建新版本并切换指针，旧版本在没有克隆引用后删除
+        Args:
+            env: 环境名
+            builder: 在给定的 user-data-dir 中启动浏览器并登录，关闭浏览器后返回登录后的 cookies，失败返回None
+        Returns:
+            bool: 模板是否可用
+        """
+        with self._locked(env):
+            self._remove_stale_clones(env)
+            if self.is_fresh(env):
+                self._prune_versions(env)
+                return True
+            logger.info(f"开始构建模板 profile: {env}")
+            start = time.time()
+            build_dir = tempfile.mkdtemp(prefix="build-", dir=self._env_dir(env))
+            try:
+                cookies = builder(build_dir)
+            except Exception as e:
+                logger.error(f"构建模板 profile 失败: {str(e)}")
+                cookies = None
+            if cookies is None:
+                shutil.rmtree(build_dir, ignore_errors=True)
+                return False
+            for name in _RUNTIME_FILES:
+                path = os.path.join(build_dir, name)
+                if os.path.lexists(path):
+                    os.remove(path)
+            expiries = [cookie["expiry"] for cookie in cookies if cookie.get("expiry")]
+            version = f"template-{time.time_ns()}"
+            template = os.path.join(self._env_dir(env), version)
+            os.replace(build_dir, template)
+            pointer = {"version": version, "built_at": time.time(), "expires_at": min(expiries) if expiries else None}
+            tmp_path = f"{self._pointer_path(env)}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(pointer, f)
+            os.replace(tmp_path, self._pointer_path(env))
+            self._prune_versions(env)
+            logger.info(f"模板 profile 构建完成: {template}，耗时 {time.time() - start:.1f} 秒")
+            return True
+
+    def clone(self, env: str) -> Optional[str]:
+        """
+        克隆模板作为一个浏览器的 user-data-dir
+        锁内只读取当前版本并登记克隆，复制在锁外进行，旧版本在登记存在期间不会被删除
+        Returns:
+            str: 克隆目录，模板不可用时返回None(使用全新的临时 profile)
+        """
+        with self._locked(env):
+            version = self._fresh_version(env)
+            if version is None:
+                return None
+            os.makedirs(self._clones_dir(env), exist_ok=True)
+            clone_dir = os.path.join(self._clones_dir(env), f"{version}.{os.getpid()}-{time.time_ns()}")
+            pending = f"{clone_dir}.pending"
+            open(pending, "w").close()
+        start = time.perf_counter()
+        try:
+            method = clone_tree(os.path.join(self._env_dir(env), version), clone_dir)
+        except OSError as e:
+            logger.warning(f"克隆模板 profile 失败: {str(e)}")
+            shutil.rmtree(clone_dir, ignore_errors=True)
+            return None
+        finally:
+            os.remove(pending)
+        logger.info(f"已克隆模板 profile({method}，{(time.perf_counter() - start) * 1000:.0f}ms): {clone_dir}")
+        return clone_dir
+
+    def remove_clone(self, clone_dir: Optional[str]):
+        """浏览器进程退出后删除克隆"""
+        if clone_dir:
+            shutil.rmtree(clone_dir, ignore_errors=True)
+
+    def invalidate(self, env: str):
+        """模板的登录态已失效，下次构建时重建"""
+        try:
+            os.remove(self._pointer_path(env))
+            logger.info(f"模板 profile 已失效: {env}")
+        except FileNotFoundError:
+            pass
+
+    def _prune_versions(self, env: str):
+        """删除不是当前版本且没有克隆(含正在复制的)引用的旧版本，需持有环境锁"""
+        pointer = self._read_pointer(env) or {}
+        try:
+            clones = os.listdir(self._clones_dir(env))
+        except FileNotFoundError:
+            clones = []
+        for path in glob.glob(os.path.join(self._env_dir(env), "template-*")):
+            version = os.path.basename(path)
+            if version == pointer.get("version"):
+                continue
+            if any(name.startswith(f"{version}.") for name in clones):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _remove_stale_clones(self, env: str, max_age: float = 86400):
+        """删除异常退出时遗留的克隆、复制登记与未完成的构建目录"""
+        paths = glob.glob(os.path.join(self._clones_dir(env), "*"))
+        paths += glob.glob(os.path.join(self._env_dir(env), "build-*"))
+        for path in paths:
+            try:
+                if time.time() - os.path.getmtime(path) > max_age:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        os.remove(path)
+            except OSError:
+                pass
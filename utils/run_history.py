@@ -0,0 +1,250 @@
+import functools
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+import allure_commons
+from .log_manager import logger
+from .test_durations import split_group
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT,
+    finished_at TEXT,
+    env TEXT,
+    exitstatus INTEGER
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id TEXT,
+    nodeid TEXT,
+    outcome TEXT,
+    duration REAL,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT,
+    nodeid TEXT,
+    step TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS idx_steps_step ON steps (step, run_id);
+"""
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """计算百分位数(最近秩法)，values 为空时返回None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class StepTimer:
+    """
+    收集当前进程内的步骤耗时
+    @allure.step 通过 allure 插件钩子计时，BasePage 操作通过 timed_action 装饰器计时
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例，首次创建时注册到 allure 插件管理器"""
+        if cls._instance is None:
+            cls._instance = StepTimer()
+            allure_commons.plugin_manager.register(cls._instance)
+        return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self._records = []
+
+    @staticmethod
+    def current_test_id() -> str:
+        """当前用例的 nodeid（去掉 xdist 分组后缀）"""
+        return split_group(os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0])[0]
+
+    def record(self, step: str, seconds: float, test_id: Optional[str] = None):
+        """记录一次步骤耗时"""
+        test_id = self.current_test_id() if test_id is None else test_id
+        with self._lock:
+            self._records.append((test_id, step, seconds))
+
+    def discard(self, test_id: str):
+        """丢弃用例已记录的步骤耗时，失败重跑时只保留最后一次执行的步骤"""
+        with self._lock:
+            self._records = [record for record in self._records if record[0] != test_id]
+
+    def drain(self) -> List[tuple]:
+        """取出并清空已记录的步骤耗时 [(nodeid, 步骤, 秒)]"""
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._started[uuid] = (title, time.perf_counter())
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        started = self._started.pop(uuid, None)
+        if started:
+            self.record(f"step: {started[0]}", time.perf_counter() - started[1])
+
+
+# 当前线程中正在执行的 timed_action 层数
+_action_depth = threading.local()
+
+
+def timed_action(func):
+    """
+    装饰页面对象方法，记录每次调用的耗时，步骤名为 类名.方法名
+    只记录最外层的操作，内部调用的其他 timed_action 方法不重复计时
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_action_depth, "value", 0)
+        _action_depth.value = depth + 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _action_depth.value = depth
+            if depth == 0:
+                StepTimer.get_instance().record(func.__qualname__, time.perf_counter() - start)
+    return wrapper
+
+
+class RunHistory:
+    """基于 SQLite 的运行历史：每次运行的结果、用例耗时与步骤耗时"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # WAL 模式允许 xdist worker 与主进程同时写入
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def save_run(self, run_id: str, started_at: str, finished_at: str, env: str, exitstatus: int,
+                 tests: Dict[str, tuple]):
+        """
+        保存一次运行及其用例结果
+        Args:
+            tests: {nodeid: (结果, 耗时秒)}
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, started_at, finished_at, env, exitstatus) VALUES (?, ?, ?, ?, ?)",
+                (run_id, started_at, finished_at, env, int(exitstatus))
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO tests (run_id, nodeid, outcome, duration) VALUES (?, ?, ?, ?)",
+                [(run_id, nodeid, outcome, duration) for nodeid, (outcome, duration) in tests.items()]
+            )
+        logger.info(f"运行历史已保存: {run_id}，{len(tests)} 个用例")
+
+    def save_steps(self, run_id: str, steps: List[tuple]):
+        """
+        保存步骤耗时
+        Args:
+            steps: [(nodeid, 步骤, 耗时秒)]
+        """
+        if not steps:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO steps (run_id, nodeid, step, duration) VALUES (?, ?, ?, ?)",
+                [(run_id, nodeid, step, duration) for nodeid, step, duration in steps]
+            )
+
+    def recent_runs(self, limit: int = 10) -> List[dict]:
+        """最近的运行及其通过/失败/跳过数与总耗时，按时间倒序"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT r.run_id, r.started_at, r.env, r.exitstatus,
+                       COUNT(t.nodeid),
+                       SUM(t.outcome = 'passed'), SUM(t.outcome = 'failed'), SUM(t.outcome = 'skipped'),
+                       COALESCE(SUM(t.duration), 0)
+                FROM runs r LEFT JOIN tests t ON t.run_id = r.run_id
+                GROUP BY r.run_id ORDER BY r.run_id DESC LIMIT ?
+            """, (limit,)).fetchall()
+        keys = ("run_id", "started_at", "env", "exitstatus", "total", "passed", "failed", "skipped", "duration")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def test_trends(self, limit: int = 10) -> List[dict]:
+        """最近 limit 次运行中每个用例的平均耗时、最近一次耗时与失败次数"""
+        run_ids = [run["run_id"] for run in self.recent_runs(limit)]
+        if not run_ids:
+            return []
+        placeholders = ",".join("?" * len(run_ids))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"""
+                SELECT nodeid, run_id, outcome, duration FROM tests
+                WHERE run_id IN ({placeholders}) ORDER BY run_id
+            """, run_ids).fetchall()
+        trends = {}
+        for nodeid, run_id, outcome, duration in rows:
+            trend = trends.setdefault(nodeid, {"nodeid": nodeid, "durations": [], "failed": 0})
+            trend["durations"].append(duration)
+            trend["latest"] = duration
+            trend["failed"] += outcome == "failed"
+        for trend in trends.values():
+            trend["average"] = sum(trend["durations"]) / len(trend["durations"])
+        return sorted(trends.values(), key=lambda t: -t["average"])
+
+    def step_regressions(self, baseline_runs: int = 10, ratio: float = 1.2, min_seconds: float = 0.05) -> List[dict]:
+        """
+        对比最近一次运行与之前 baseline_runs 次运行的步骤 p95 耗时
+        Args:
+            baseline_runs: 作为基线的历史运行次数
+            ratio: 最近一次 p95 超过基线 p95 的倍数
+            min_seconds: 忽略 p95 差值小于该值的步骤，避免毫秒级抖动
+        Returns:
+            list: 退化的步骤，按倍数倒序
+        """
+        with closing(self._connect()) as conn:
+            run_ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT run_id FROM steps ORDER BY run_id DESC LIMIT ?", (baseline_runs + 1,)
+            )]
+            if len(run_ids) < 2:
+                return []
+            placeholders = ",".join("?" * len(run_ids))
+            rows = conn.execute(
+                f"SELECT run_id, step, duration FROM steps WHERE run_id IN ({placeholders})", run_ids
+            ).fetchall()
+        latest_run = run_ids[0]
+        latest, baseline = {}, {}
+        for run_id, step, duration in rows:
+            (latest if run_id == latest_run else baseline).setdefault(step, []).append(duration)
+
+        regressions = []
+        for step, durations in latest.items():
+            latest_p95 = percentile(durations, 95)
+            baseline_p95 = percentile(baseline.get(step, []), 95)
+            if not baseline_p95:
+                continue
+            if latest_p95 > baseline_p95 * ratio and latest_p95 - baseline_p95 >= min_seconds:
+                regressions.append({
+                    "step": step,
+                    "baseline_p95": baseline_p95,
+                    "latest_p95": latest_p95,
+                    "ratio": latest_p95 / baseline_p95,
+                    "samples": len(durations),
+                })
+        return sorted(regressions, key=lambda r: -r["ratio"])
@@ -1,95 +1,416 @@
+import base64
+import html
 import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Optional, Union
+from typing import Optional, Tuple
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import WebDriverException
 import allure
+from .config_manager import ConfigManager
 from .log_manager import logger
+from .screenshot_store import ScreenshotStore, looks_same, perceptual_hash
+
+
+# 截图格式 -> (Allure 附件类型, 文件扩展名)，Allure 没有内置 WebP 类型，直接使用 MIME 类型
+_IMAGE_FORMATS = {
+    "png": (allure.attachment_type.PNG, "png"),
+    "jpeg": (allure.attachment_type.JPG, "jpg"),
+    "webp": ("image/webp", "webp"),
+}
+
+# 元素相对文档的位置，用作 CDP 截图的裁剪区域
+_ELEMENT_RECT_SCRIPT = """
+var rect = arguments[0].getBoundingClientRect();
+return { x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height };
+"""
+
+# 当前可视区域相对文档的位置
+_VIEWPORT_RECT_SCRIPT = """
+return { x: window.scrollX, y: window.scrollY, width: window.innerWidth, height: window.innerHeight };
+"""
+
+# 失败时输出的胶片条页面
+_FILMSTRIP_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 12px; }}
+.strip {{ display: flex; gap: 8px; overflow-x: auto; }}
+figure {{ margin: 0; flex: none; }}
+figure img {{ border: 1px solid #ccc; display: block; }}
+figcaption {{ font-size: 12px; color: #555; }}
+</style></head>
+<body><h3>{title}</h3><div class="strip">
+{frames}
+</div></body></html>
+"""
+
+# 整个文档的尺寸
+_PAGE_RECT_SCRIPT = """
+var doc = document.documentElement;
+return { x: 0, y: 0, width: doc.scrollWidth, height: doc.scrollHeight };
+"""
+
+
+class _ScreenshotJob:
+    """待写入的截图任务"""
+
+    def __init__(self, test_id: str, name: str, filename: str, data: bytes, image_format: str, allure_attach: bool):
+        self.test_id = test_id
+        self.name = name
+        self.filename = filename
+        self.filepath = None
+        self.data = data
+        self.image_format = image_format
+        self.allure_attach = allure_attach
+        self.future = Future()
 
 
 class ScreenshotManager:
-    """统一的截图管理类"""
+    """
+    统一的截图管理类
+    测试线程只负责抓取截图数据并放入有界队列，后台线程负责去重和写文件；
+    Allure 按线程记录当前用例，附件在测试线程生成报告时(attach_pending)统一添加。
+    JPEG/WebP 格式与裁剪通过 Chrome 的 Page.captureScreenshot 完成，不支持时回退到 PNG
+    """
     
     _instance = None
     
     @classmethod
-    def get_instance(cls, screenshot_dir: str):
+    def get_instance(cls, screenshot_dir: str, **kwargs):
         """单例模式获取实例"""
         if cls._instance is None:
-            cls._instance = ScreenshotManager(screenshot_dir)
+            cls._instance = ScreenshotManager(screenshot_dir, **kwargs)
         return cls._instance
     
-    def __init__(self, screenshot_dir: str):
-        """初始化截图管理器"""
+    def __init__(
+        self,
+        screenshot_dir: str,
+        max_pending: int = 16,
+        max_workers: int = 2,
+        image_format: str = "png",
+        quality: int = 80,
+        clip: str = "viewport",
+        frames: Optional[dict] = None,
+        phash_threshold: int = 4
+    ):
+        """
+        初始化截图管理器
+        Args:
+            screenshot_dir: 截图保存目录
+            max_pending: 队列中等待写入的截图上限，队列满时测试线程等待
+            max_workers: 后台写入线程数
+            image_format: 截图格式 png/jpeg/webp
+            quality: JPEG/WebP 压缩质量(0-100)
+            clip: 未指定元素时的截图范围 viewport(可视区域)/page(整个页面)
+            frames: 关键操作缩略帧配置 {"enabled", "on_rerun", "count", "scale", "quality"}，失败时输出为胶片条；
+                    每帧需要两次同步的 CDP 调用，enabled 为 false 时只在 enable_frames 指定的用例(如失败重跑)中记录
+            phash_threshold: 胶片条中相邻两帧感知哈希的汉明距离不超过该值时合并为一帧，负数时不合并；
+                             截图文件只按内容完全相同去重
+        """
+        if image_format not in _IMAGE_FORMATS:
+            raise ValueError(f"不支持的截图格式: {image_format}，可选: {', '.join(_IMAGE_FORMATS)}")
+        if clip not in ("viewport", "page"):
+            raise ValueError(f"不支持的截图范围: {clip}，可选: viewport, page")
         self.screenshot_dir = screenshot_dir
+        self.store = ScreenshotStore(screenshot_dir)
+        self.phash_threshold = phash_threshold
+        self.image_format = image_format
+        self.quality = quality
+        self.clip = clip
+        frames = frames or {}
+        self.frames_enabled = frames.get("enabled", False)
+        self.frames_on_rerun = frames.get("on_rerun", False)
+        self.frame_count = frames.get("count", 8)
+        self.frame_scale = frames.get("scale", 0.25)
+        self.frame_quality = frames.get("quality", 40)
         os.makedirs(self.screenshot_dir, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        # 每个用例已引用的截图对象 {test_id: set(对象路径)} 与未添加到报告的任务 {test_id: [job]}
+        self._digests = {}
+        self._pending = {}
+        # 每个用例最近的缩略帧 {test_id: deque[(时间, 操作, 数据)]}，以及未全局启用时单独记录缩略帧的用例
+        self._frames = {}
+        self._frame_tests = set()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"screenshot-writer-{i}", daemon=True)
+            for i in range(max(1, max_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    @staticmethod
+    def current_test_id() -> str:
+        """当前用例的 nodeid，不在用例中时为空字符串"""
+        return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0]
     
     def take_screenshot(
         self,
         driver: WebDriver,
         name: str,
-        allure_attach: bool = True
-    ) -> Optional[Union[bytes, str]]:
+        allure_attach: bool = True,
+        test_id: Optional[str] = None,
+        once_per_test: bool = False,
+        element: Optional[WebElement] = None
+    ) -> Optional[str]:
         """
-        获取页面截图
+        获取页面截图，写文件与去重在后台完成
         Args:
             driver: WebDriver实例
             name: 截图名称
             allure_attach: 是否添加到Allure报告
+            element: 只截取该元素所在区域
+            test_id: 所属用例，默认当前用例
+            once_per_test: 用例已有截图时不再截图（失败钩子使用，避免同一失败产生两份截图）
         Returns:
-            bytes或str: 截图数据或文件路径，失败则返回None
+            str: 截图名称(文件由后台按内容保存，对应关系记录在 index.jsonl)，失败或跳过则返回None
         """
+        test_id = self.current_test_id() if test_id is None else test_id
+        if once_per_test and self.has_screenshot(test_id):
+            logger.info(f"用例已有截图，跳过: {name}")
+            return None
         try:
-            # 生成文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{name}_{timestamp}.png"
-            filepath = os.path.join(self.screenshot_dir, filename)
-            
             # 获取截图
-            screenshot_data = self._capture_screenshot(driver)
+            screenshot_data, image_format = self._capture_screenshot(driver, element)
             if not screenshot_data:
                 return None
-                
-            # 保存文件
-            with open(filepath, "wb") as f:
-                f.write(screenshot_data)
-                
-            # 添加到Allure报告
-            if allure_attach:
-                with allure.step(f"截图: {name}"):
-                    allure.attach(
-                        screenshot_data,
-                        name=filename,
-                        attachment_type=allure.attachment_type.PNG
-                    )
-                    
-            logger.screenshot_log(f"截图已保存: {name}", filepath)
-            logger.info(f"截图保存路径: {self.screenshot_dir}")
-            logger.info(f"截图文件名: {filename}")
-            return filepath
+            
+            # 生成文件名
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{name}_{timestamp}.{_IMAGE_FORMATS[image_format][1]}"
+            
+            job = _ScreenshotJob(test_id, name, filename, screenshot_data, image_format, allure_attach)
+            # 不在用例中(压测、基准测试)时没有报告可添加，也不会有 finish_test 释放记录，只写文件
+            if test_id:
+                with self._lock:
+                    self._pending.setdefault(test_id, []).append(job)
+            self._queue.put(job)
+            return filename
             
         except Exception as e:
             logger.error(f"截图失败 {name}: {str(e)}")
             return None
     
-    def _capture_screenshot(self, driver: WebDriver) -> Optional[bytes]:
+    def has_screenshot(self, test_id: str) -> bool:
+        """用例是否已有截图（含尚未写入的）"""
+        with self._lock:
+            return bool(self._pending.get(test_id) or self._digests.get(test_id))
+    
+    def _work(self):
+        """后台线程：按内容去重并写入文件"""
+        while True:
+            job = self._queue.get()
+            try:
+                job.future.set_result(self._save(job))
+            except Exception as e:
+                logger.error(f"保存截图失败 {job.name}: {str(e)}")
+                job.future.set_result(False)
+            finally:
+                self._queue.task_done()
+    
+    def _save(self, job: _ScreenshotJob) -> bool:
+        """按内容保存截图，同一用例中引用同一对象的截图只添加一次到报告"""
+        job.filepath, created = self.store.put(
+            job.data, _IMAGE_FORMATS[job.image_format][1], job.filename, job.test_id
+        )
+        duplicate = False
+        if job.test_id:
+            with self._lock:
+                seen = self._digests.setdefault(job.test_id, set())
+                duplicate = job.filepath in seen
+                seen.add(job.filepath)
+        if duplicate:
+            logger.info(f"截图与本用例已有截图相同，跳过: {job.name}")
+            return False
+        if created:
+            logger.screenshot_log(f"截图已保存: {job.name}", job.filepath)
+        else:
+            logger.screenshot_log(f"截图与已保存的截图相同，复用: {job.name}", job.filepath)
+        return True
+    
+    def attach_pending(self, test_id: Optional[str] = None, timeout: float = 10):
+        """
+        等待用例的截图写入完成，并在当前(测试)线程中添加到Allure报告
+        Args:
+            test_id: 用例 nodeid，默认当前用例
+            timeout: 等待单个截图写入的超时时间(秒)
+        """
+        test_id = self.current_test_id() if test_id is None else test_id
+        with self._lock:
+            jobs = self._pending.pop(test_id, [])
+        for job in jobs:
+            try:
+                saved = job.future.result(timeout=timeout)
+            except Exception as e:
+                logger.warning(f"等待截图写入超时 {job.name}: {str(e)}")
+                continue
+            if saved and job.allure_attach:
+                attachment_type, extension = _IMAGE_FORMATS[job.image_format]
+                allure.attach(
+                    job.data,
+                    name=job.filename,
+                    attachment_type=attachment_type,
+                    extension=extension
+                )
+    
+    def record_frame(self, driver: WebDriver, label: str, test_id: Optional[str] = None):
+        """
+        在内存中记录一帧缩小后的可视区域截图，只保留最近 frame_count 帧，不写磁盘
+        Args:
+            driver: WebDriver实例
+            label: 操作描述，如 "打开页面"、"点击 (xpath, ...)"
+            test_id: 所属用例，默认当前用例
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return
+        test_id = self.current_test_id() if test_id is None else test_id
+        # 不在用例中时没有失败报告会用到缩略帧
+        if not test_id or (not self.frames_enabled and test_id not in self._frame_tests):
+            return
+        try:
+            rect = driver.execute_script(_VIEWPORT_RECT_SCRIPT)
+            result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "jpeg",
+                "quality": self.frame_quality,
+                "clip": dict(rect, scale=self.frame_scale),
+            })
+        except Exception as e:
+            logger.debug(f"记录缩略帧失败 {label}: {str(e)}")
+            return
+        frame = (datetime.now().strftime("%H:%M:%S.%f")[:-3], label, result["data"])
+        with self._lock:
+            self._frames.setdefault(test_id, deque(maxlen=self.frame_count)).append(frame)
+    
+    def enable_frames(self, test_id: str):
+        """为单个用例记录缩略帧(直到 finish_test)，用于全局未启用时只在失败重跑中记录"""
+        with self._lock:
+            self._frame_tests.add(test_id)
+    
+    def dump_frames(self, test_id: Optional[str] = None, name: str = "filmstrip", allure_attach: bool = True) -> Optional[str]:
+        """
+        将用例最近的缩略帧写成胶片条 HTML 并添加到Allure报告，用于失败用例
+        Args:
+            test_id: 用例 nodeid，默认当前用例
+            name: 文件名前缀
+            allure_attach: 是否添加到Allure报告
+        Returns:
+            str: 胶片条文件路径，没有缩略帧时返回None
+        """
+        test_id = self.current_test_id() if test_id is None else test_id
+        with self._lock:
+            frames = list(self._frames.pop(test_id, []))
+        if not frames:
+            return None
+        frames = self._merge_similar_frames(frames)
+        figures = "\n".join(
+            f'<figure><img src="data:image/jpeg;base64,{data}">'
+            f'<figcaption>{index}. {html.escape(when)} {html.escape(label)}</figcaption></figure>'
+            for index, (when, label, data) in enumerate(frames, 1)
+        )
+        content = _FILMSTRIP_HTML.format(title=html.escape(test_id or name), frames=figures)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(self.screenshot_dir, f"{name}_filmstrip_{timestamp}.html")
+        try:
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(content)
+        except OSError as e:
+            logger.error(f"保存胶片条失败 {name}: {str(e)}")
+            return None
+        if allure_attach:
+            allure.attach(content, name=os.path.basename(filepath), attachment_type=allure.attachment_type.HTML)
+        logger.screenshot_log(f"失败前 {len(frames)} 帧操作截图已保存", filepath)
+        return filepath
+    
+    def _merge_similar_frames(self, frames):
+        """相邻且看不出区别的帧(如点击后页面未变化)合并为一帧，保留最后一帧的画面，操作描述依次列出"""
+        if self.phash_threshold < 0:
+            return frames
+        merged, previous = [], None
+        for when, label, data in frames:
+            current = perceptual_hash(base64.b64decode(data))
+            if merged and looks_same(previous, current, self.phash_threshold):
+                first_when, first_label, _ = merged[-1]
+                merged[-1] = (first_when, f"{first_label} → {label}", data)
+            else:
+                merged.append((when, label, data))
+            previous = current
+        return merged
+    
+    def finish_test(self, test_id: Optional[str] = None):
+        """用例结束，释放该用例的去重记录与缩略帧"""
+        test_id = self.current_test_id() if test_id is None else test_id
+        with self._lock:
+            self._digests.pop(test_id, None)
+            self._pending.pop(test_id, None)
+            self._frames.pop(test_id, None)
+            self._frame_tests.discard(test_id)
+    
+    def wait_all(self):
+        """等待队列中的截图全部写入"""
+        self._queue.join()
+    
+    def _capture_screenshot(self, driver: WebDriver, element: Optional[WebElement] = None) -> Tuple[Optional[bytes], str]:
         """
         捕获屏幕截图
         Args:
             driver: WebDriver实例
+            element: 只截取该元素所在区域
         Returns:
-            bytes: 截图数据
+            tuple: (截图数据, 实际格式)
         """
         try:
-            return driver.get_screenshot_as_png()
+            if self.image_format != "png" or element is not None or self.clip != "viewport":
+                data = self._capture_with_cdp(driver, element)
+                if data:
+                    return data, self.image_format
+            if element is not None:
+                return element.screenshot_as_png, "png"
+            return driver.get_screenshot_as_png(), "png"
         except WebDriverException as e:
             logger.error(f"获取截图数据失败: {str(e)}")
-            return None
+            return None, "png"
         except Exception as e:
             logger.error(f"截图过程发生未知错误: {str(e)}")
+            return None, "png"
+    
+    def _capture_with_cdp(self, driver: WebDriver, element: Optional[WebElement] = None) -> Optional[bytes]:
+        """
+        通过 Page.captureScreenshot 截取压缩/裁剪后的截图，浏览器不支持 CDP 时返回None
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return None
+        params = {"format": self.image_format}
+        if self.image_format != "png":
+            params["quality"] = self.quality
+        try:
+            # 元素可能已失效(StaleElementReference)，取位置失败时同样回退到 PNG 截图
+            if element is not None or self.clip == "page":
+                rect = driver.execute_script(_ELEMENT_RECT_SCRIPT, element) if element is not None \
+                    else driver.execute_script(_PAGE_RECT_SCRIPT)
+                params["clip"] = dict(rect, scale=1)
+                params["captureBeyondViewport"] = True
+            result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+        except WebDriverException as e:
+            logger.warning(f"CDP 截图失败，回退到 PNG 截图: {str(e)}")
             return None
+        return base64.b64decode(result["data"])
 
 
 # 创建全局截图管理器实例
+_report_config = ConfigManager.get_instance().get_report_config()
 screenshot_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "screenshots"))
-screenshot = ScreenshotManager.get_instance(screenshot_dir)
+screenshot = ScreenshotManager.get_instance(
+    screenshot_dir,
+    max_pending=_report_config.get("screenshot_queue_size", 16),
+    max_workers=_report_config.get("screenshot_workers", 2),
+    image_format=_report_config.get("screenshot_format", "png"),
+    quality=_report_config.get("screenshot_quality", 80),
+    clip=_report_config.get("screenshot_clip", "viewport"),
+    frames=_report_config.get("filmstrip"),
+    phash_threshold=_report_config.get("screenshot_phash_threshold", 4)
+)
@@ -0,0 +1,129 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional, Tuple
+from .log_manager import logger
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # 缺少 Pillow/NumPy 时胶片条不合并相似的帧
+    np = None
+    Image = None
+
+
+# 感知哈希相近时，缩略灰度图的平均像素差不超过该值才视为同一张图（dHash 只比较明暗方向，区分不了整体亮度）
+_MAX_THUMB_DIFF = 8
+
+# index.jsonl 超过该大小时在打开存储时轮转为 index.jsonl.1
+_MAX_INDEX_BYTES = 5 * 1024 * 1024
+
+
+def perceptual_hash(data: bytes) -> Optional[Tuple[Tuple[int, int], int, bytes]]:
+    """
+    计算图片的差异哈希(dHash)：缩放为 9x8 灰度图，逐行比较相邻像素的明暗
+    Args:
+        data: 图片数据
+    Returns:
+        tuple: (原图尺寸, 64位哈希, 9x8 灰度缩略图)，缺少依赖或无法解码时返回None
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            size = image.size
+            pixels = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    except Exception as e:
+        logger.warning(f"计算截图感知哈希失败: {str(e)}")
+        return None
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return size, int(np.packbits(bits).view(">u8")[0]), pixels.astype(np.uint8).tobytes()
+
+
+def looks_same(a, b, threshold: int = 4) -> bool:
+    """
+    两张图片的感知哈希(perceptual_hash 的返回值)是否相近到肉眼看不出区别
+    只用于胶片条缩略帧；失败截图中细小的报错提示也有意义，不能按感知哈希合并
+    Args:
+        threshold: 汉明距离阈值，负数时总是返回False
+    """
+    if a is None or b is None or threshold < 0 or a[0] != b[0]:
+        return False
+    if bin(a[1] ^ b[1]).count("1") > threshold:
+        return False
+    diff = np.abs(np.frombuffer(a[2], dtype=np.uint8).astype(np.int16)
+                  - np.frombuffer(b[2], dtype=np.uint8).astype(np.int16)).mean()
+    return diff <= _MAX_THUMB_DIFF
+
+
+class ScreenshotStore:
+    """
+    按内容寻址的截图存储
+    截图以内容哈希命名保存在 objects/ 下，内容完全相同的截图只保存一份(包括多次运行之间)，
+    每次截图作为一条引用记录在 index.jsonl 中，索引过大时轮转
+    """
+
+    def __init__(self, root: str, max_index_bytes: int = _MAX_INDEX_BYTES):
+        """
+        Args:
+            root: 存储根目录
+            max_index_bytes: 索引文件大小上限，超过时轮转为 index.jsonl.1(只保留一份旧索引)
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_file = os.path.join(root, "index.jsonl")
+        self.max_index_bytes = max_index_bytes
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._rotate_index()
+
+    def _rotate_index(self):
+        """
+        索引超过上限时改名为 index.jsonl.1
+        每条记录都重新打开文件追加，其他 worker 正在写入的记录会落在轮转后的文件中，不会丢失
+        """
+        try:
+            if os.path.getsize(self.index_file) > self.max_index_bytes:
+                os.replace(self.index_file, f"{self.index_file}.1")
+                logger.info(f"截图索引超过 {self.max_index_bytes} 字节，已轮转")
+        except OSError:
+            pass
+
+    def put(self, data: bytes, extension: str, name: str, test_id: str = "") -> Tuple[str, bool]:
+        """
+        保存截图
+        Args:
+            data: 图片数据
+            extension: 文件扩展名
+            name: 截图名称，记录在索引中
+            test_id: 所属用例
+        Returns:
+            tuple: (对象路径, 是否新写入了文件)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.objects_dir, digest[:2], f"{digest}.{extension}")
+        created = False
+        with self._lock:
+            # 对象按内容命名，已存在(本次或之前的运行、其他 xdist worker 写入)即可复用
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                created = True
+
+        record = {
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "test": test_id,
+            "name": name,
+            "digest": digest,
+            "object": os.path.relpath(path, self.root).replace(os.sep, "/"),
+        }
+        with self._lock:
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return path, created
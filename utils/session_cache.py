@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+from .config_manager import ConfigManager
+from .log_manager import logger
+
+
+class SessionCache:
+    """登录态磁盘缓存：按 环境+用户名 保存 cookies 与 localStorage，供新建的 driver 直接注入"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """单例模式获取实例"""
+        if cls._instance is None:
+            cache_config = ConfigManager.get_instance().get_test_config().get("session_cache", {})
+            cls._instance = SessionCache(
+                cache_dir=cache_config.get("dir", "cache/sessions"),
+                ttl=cache_config.get("ttl", 3600),
+                enabled=cache_config.get("enabled", True)
+            )
+        return cls._instance
+
+    def __init__(self, cache_dir: str, ttl: int = 3600, enabled: bool = True):
+        """
+        初始化登录态缓存
+        Args:
+            cache_dir: 缓存目录
+            ttl: 缓存有效期(秒)
+            enabled: 是否启用缓存
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.enabled = enabled
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, env: str, username: str) -> str:
+        """生成缓存文件路径"""
+        key = re.sub(r"[^\w.-]", "_", f"{env}_{username}")
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, env: str, username: str) -> Optional[Dict[str, Any]]:
+        """
+        读取未过期的登录态
+        Returns:
+            dict: 包含 cookies 与 local_storage 的登录态，不存在或已过期则返回None
+        """
+        if not self.enabled:
+            return None
+        path = self._path(env, username)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取登录态缓存失败: {str(e)}")
+            return None
+
+        if time.time() - state.get("saved_at", 0) > self.ttl:
+            logger.info(f"登录态缓存已过期: {path}")
+            return None
+        return state
+
+    def save(self, driver: WebDriver, env: str, username: str) -> bool:
+        """
+        保存当前 driver 的 cookies 与 localStorage
+        先写临时文件再原子替换，避免多个 xdist worker 同时写入时读到半个文件
+        """
+        if not self.enabled:
+            return False
+        path = self._path(env, username)
+        try:
+            state = {
+                "saved_at": time.time(),
+                "url": driver.current_url,
+                "cookies": driver.get_cookies(),
+                "local_storage": driver.execute_script(
+                    "var items = {};"
+                    "for (var i = 0; i < localStorage.length; i++) {"
+                    "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+                    "}"
+                    "return items;"
+                ),
+            }
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            logger.info(f"登录态已缓存: {path}")
+            return True
+        except Exception as e:
+            logger.warning(f"保存登录态缓存失败: {str(e)}")
+            return False
+
+    def restore(self, driver: WebDriver, env: str, username: str, url: str) -> bool:
+        """
+        将缓存的登录态注入 driver 并重新加载页面
+        cookie 只能写入当前域名，因此需要先打开目标站点
+        Returns:
+            bool: 是否成功注入（不代表服务端仍接受该会话）
+        """
+        state = self.load(env, username)
+        if not state:
+            return False
+        try:
+            driver.get(url)
+            now = time.time()
+            for cookie in state.get("cookies", []):
+                if cookie.get("expiry") and cookie["expiry"] < now:
+                    continue
+                driver.add_cookie(cookie)
+            driver.execute_script(
+                "var items = arguments[0];"
+                "Object.keys(items).forEach(function (key) { localStorage.setItem(key, items[key]); });",
+                state.get("local_storage", {})
+            )
+            driver.get(url)
+            logger.info(f"已注入缓存登录态: {env}/{username}")
+            return True
+        except WebDriverException as e:
+            logger.warning(f"注入缓存登录态失败: {str(e)}")
+            return False
+
+    def invalidate(self, env: str, username: str):
+        """删除缓存的登录态"""
+        try:
+            os.remove(self._path(env, username))
+            logger.info(f"已清除登录态缓存: {env}/{username}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"清除登录态缓存失败: {str(e)}")
@@ -0,0 +1,286 @@
+import functools
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlparse
+from .log_manager import logger
+
+
+# 后台页面的最小替身：元素 id/class 与真实页面一致，页面对象可以直接在上面运行
+_PAGE_SCRIPT = """
+<script>
+function api(method, path, body) {
+    return fetch('/api/' + path, {
+        method: method,
+        headers: {'Content-Type': 'application/json', 'Authorization': 'Bearer ' + localStorage.getItem('token')},
+        body: body ? JSON.stringify(body) : undefined
+    }).then(function (r) { return r.json(); });
+}
+</script>
+"""
+
+_PAGES = {
+    "/": _PAGE_SCRIPT + """
+<form id="login">
+  <input id="username"><input id="password" type="password">
+  <button type="submit" class="ant-btn ant-btn-block">Login</button>
+</form>
+<script>
+document.getElementById('login').onsubmit = function (e) {
+    e.preventDefault();
+    api('POST', 'auth/login', {
+        username: document.getElementById('username').value,
+        password: document.getElementById('password').value
+    }).then(function (r) {
+        if (!r.data.token) { return; }
+        localStorage.setItem('token', r.data.token);
+        document.body.innerHTML = '<button type="button" class="sino-btn"><span>Collect Gift</span></button>';
+    });
+};
+</script>
+""",
+    "/gift": _PAGE_SCRIPT + """
+<form id="search">
+  <div class="ant-col ant-form-item-control-wrapper"><input id="title"></div>
+  <button type="submit">Search</button>
+</form>
+<table><tbody id="rows"></tbody></table>
+<script>
+document.getElementById('search').onsubmit = function (e) {
+    e.preventDefault();
+    api('GET', 'gift?title=' + encodeURIComponent(document.getElementById('title').value)).then(function (r) {
+        document.getElementById('rows').innerHTML = r.data.map(function (gift) {
+            return '<tr><td>' + gift.id + '</td></tr>';
+        }).join('');
+    });
+};
+</script>
+""",
+    "/gift/create": _PAGE_SCRIPT + """
+<form id="gift">
+  <textarea id="rewardRemark"></textarea>
+  <input id="pointsNeeded">
+</form>
+<script>api('GET', 'gift');</script>
+""",
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """处理 CMS 接口请求：登录 + 任意资源的内存增删查，以及后台页面替身"""
+
+    # 资源路径: /<api前缀>/<资源名>[/<id>]
+    RESOURCE_PATH = re.compile(r"^/(?:api/)?(?P<resource>[\w-]+)(?:/(?P<id>[\w-]+))?/?$")
+
+    def log_message(self, format, *args):
+        """静默默认的 stderr 访问日志"""
+        pass
+
+    def _send(self, status: int, body: Any = None):
+        """发送 JSON 响应，配置了 latency 时先等待以模拟后台耗时"""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        payload = json.dumps({"data": body}, ensure_ascii=False).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_page(self, html: str):
+        """发送后台页面替身"""
+        payload = f"<!DOCTYPE html><html><body>{html}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Dict[str, Any]:
+        """读取请求体"""
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self):
+        """解析资源名与 id，未登录时返回401"""
+        parsed = urlparse(self.path)
+        if parsed.path.rstrip("/").endswith("auth/login"):
+            return "login", None, parsed
+        match = self.RESOURCE_PATH.match(parsed.path)
+        if not match:
+            self._send(404, {"message": "not found"})
+            return None, None, parsed
+        if self.headers.get("Authorization") != f"Bearer {self.server.token}":
+            self._send(401, {"message": "unauthorized"})
+            return None, None, parsed
+        return match.group("resource"), match.group("id"), parsed
+
+    def do_POST(self):
+        resource, _, _ = self._route()
+        if resource == "login":
+            body = self._read_json()
+            if (body.get("username"), body.get("password")) != self.server.credentials:
+                self._send(401, {"message": "invalid credentials"})
+                return
+            self._send(200, {"token": self.server.token})
+        elif resource:
+            item = dict({"createdAt": int(time.time() * 1000)}, **self._read_json(), id=next(self.server.ids))
+            self.server.store.setdefault(resource, {})[str(item["id"])] = item
+            self._send(201, item)
+
+    def do_GET(self):
+        page = _PAGES.get(urlparse(self.path).path.rstrip("/") or "/")
+        if page is not None:
+            self._send_page(page)
+            return
+        resource, item_id, parsed = self._route()
+        if not resource or resource == "login":
+            return
+        items = self.server.store.get(resource, {})
+        if item_id:
+            if item_id in items:
+                self._send(200, items[item_id])
+            else:
+                self._send(404, {"message": "not found"})
+            return
+        # 列表查询支持按任意顶层字段模糊过滤，字段为多语言字典时匹配任意语言；page/pageSize 为分页参数
+        filters = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        page = int(filters.pop("page", 1))
+        page_size = int(filters.pop("pageSize", 0))
+        result = [item for item in items.values()
+                  if all(self._matches(item.get(key), value) for key, value in filters.items())]
+        if page_size:
+            result = result[(page - 1) * page_size:page * page_size]
+        self._send(200, result)
+
+    @staticmethod
+    def _matches(field: Any, keyword: str) -> bool:
+        """字段值是否包含关键字"""
+        if isinstance(field, dict):
+            return any(keyword in str(value) for value in field.values())
+        return keyword in str(field)
+
+    def do_DELETE(self):
+        resource, item_id, _ = self._route()
+        if not resource or resource == "login":
+            return
+        if self.server.store.get(resource, {}).pop(str(item_id), None) is None:
+            self._send(404, {"message": "not found"})
+            return
+        self._send(204)
+
+
+class CmsStubServer:
+    """
+    本地 CMS 桩服务，在后台线程中运行
+    用于离线测试数据准备与清理逻辑，以及在后台页面替身上离线运行压测
+    """
+
+    def __init__(self, username: str = "stub", password: str = "stub", host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0):
+        """
+        Args:
+            username: 允许登录的用户名
+            password: 允许登录的密码
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+            latency: 每个接口响应前的等待时间(秒)，模拟后台耗时
+        """
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.credentials = (username, password)
+        self._server.token = "stub-token"
+        self._server.store = {}
+        self._server.ids = itertools.count(1)
+        self._server.latency = latency
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """服务基础URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    @property
+    def site_url(self) -> str:
+        """后台页面替身的基础URL(登录页)"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def store(self) -> Dict[str, Dict[str, Any]]:
+        """内存中的数据 {资源名: {id: 数据}}"""
+        return self._server.store
+
+    def start(self) -> "CmsStubServer":
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="cms-stub-server", daemon=True)
+        self._thread.start()
+        logger.info(f"CMS 桩服务已启动: {self.url}")
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class _StaticHandler(SimpleHTTPRequestHandler):
+    """静态文件请求处理，静默访问日志"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticSiteServer:
+    """本地静态站点服务，在后台线程中提供后台页面的静态复刻(如基准测试的 data/fixture_app)"""
+
+    def __init__(self, directory: str, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            directory: 站点根目录
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+        """
+        handler = functools.partial(_StaticHandler, directory=directory)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """站点基础URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StaticSiteServer":
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="static-site-server", daemon=True)
+        self._thread.start()
+        logger.info(f"静态站点服务已启动: {self.url}")
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
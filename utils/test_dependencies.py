@@ -0,0 +1,103 @@
+from typing import Dict, List
+from .log_manager import logger
+
+
+# 声明依赖的标记名：@pytest.mark.depends_on("test_add_gift")
+# condition 为假时忽略该标记，如 depends_on("test_add_gift", condition=not seed_enabled)
+DEPENDS_ON_MARKER = "depends_on"
+
+
+def _find_prerequisite(item, name, items):
+    """
+    按名称查找前置用例：包含 "::" 时按 nodeid(后缀)匹配，否则优先匹配同一个类、再匹配同一个模块中的同名用例
+    """
+    if "::" in name:
+        matches = [other for other in items if other.nodeid == name or other.nodeid.endswith("/" + name)]
+        return matches[0] if matches else None
+    same_module = [
+        other for other in items
+        if other.module is item.module and name in (other.name, getattr(other, "originalname", None))
+    ]
+    for other in same_module:
+        if other.cls is item.cls:
+            return other
+    return same_module[0] if same_module else None
+
+
+def resolve_dependencies(items) -> Dict[object, List[object]]:
+    """
+    解析用例声明的依赖，condition 为假的标记不生效
+    Returns:
+        dict: {用例: [前置用例]}，只包含声明了依赖的用例
+    """
+    dependencies = {}
+    for item in items:
+        marks = [mark for mark in item.iter_markers(DEPENDS_ON_MARKER) if mark.kwargs.get("condition", True)]
+        names = [name for mark in marks for name in mark.args]
+        names += [name for mark in marks for name in mark.kwargs.get("names", [])]
+        prerequisites = []
+        for name in names:
+            prerequisite = _find_prerequisite(item, name, items)
+            if prerequisite is None:
+                logger.warning(f"{item.nodeid} 依赖的用例 {name} 未收集到，忽略该依赖")
+            elif prerequisite is not item:
+                prerequisites.append(prerequisite)
+        if prerequisites:
+            dependencies[item] = prerequisites
+    return dependencies
+
+
+def order_items(items, dependencies) -> List[object]:
+    """
+    按依赖关系排序：前置用例排在依赖它的用例之前，其余用例保持原有顺序
+    Raises:
+        ValueError: 存在循环依赖
+    """
+    ordered, done, visiting = [], set(), set()
+
+    def visit(item, path):
+        if item in done:
+            return
+        if item in visiting:
+            raise ValueError("用例存在循环依赖: " + " -> ".join(other.nodeid for other in path + [item]))
+        visiting.add(item)
+        for prerequisite in dependencies.get(item, []):
+            visit(prerequisite, path + [item])
+        visiting.discard(item)
+        done.add(item)
+        ordered.append(item)
+
+    for item in items:
+        visit(item, [])
+    return ordered
+
+
+def chain_groups(items, dependencies) -> Dict[object, str]:
+    """
+    把通过依赖相连的用例归为同一条链，链名按首次出现的顺序编号，各 xdist worker 计算结果一致
+    Returns:
+        dict: {用例: 链名}，只包含属于某条链的用例
+    """
+    parent = {}
+
+    def find(item):
+        while parent.get(item, item) is not item:
+            item = parent[item]
+        return item
+
+    for item, prerequisites in dependencies.items():
+        for prerequisite in prerequisites:
+            root_a, root_b = find(item), find(prerequisite)
+            if root_a is not root_b:
+                parent[root_a] = root_b
+
+    members = set(dependencies)
+    for prerequisites in dependencies.values():
+        members.update(prerequisites)
+    names, groups = {}, {}
+    for item in items:
+        if item not in members:
+            continue
+        root = find(item)
+        groups[item] = names.setdefault(root, f"chain{len(names)}")
+    return groups
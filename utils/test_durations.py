@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from .log_manager import logger
+
+
+def split_group(test_id: str):
+    """
+    拆分 xdist loadgroup 模式下带分组后缀的 nodeid，如 "tests/a.py::test_x@chain0"
+    Returns:
+        tuple: (原始 nodeid, 分组名或None)
+    """
+    index = test_id.rfind("@")
+    if index > test_id.rfind("]"):
+        return test_id[:index], test_id[index + 1:]
+    return test_id, None
+
+
+def lpt_partition(
+    test_ids: List[str],
+    bins: int,
+    durations: Dict[str, float],
+    default: float = 1.0,
+    groups: Optional[Dict[str, str]] = None
+) -> List[List[str]]:
+    """
+    最长处理时间优先(LPT)装箱：按耗时从长到短，依次放入当前总耗时最小的分组
+    同一分组(依赖链)的用例作为一个整体装箱，相同输入总是得到相同结果，各分片/worker 独立计算也能得到一致的划分
+    Args:
+        test_ids: 用例 nodeid 列表
+        bins: 分组数
+        durations: 历史耗时 {nodeid: 秒}
+        default: 没有历史记录的用例的估计耗时
+        groups: 必须分在一起的用例 {nodeid: 分组名}，默认取 nodeid 的 "@分组" 后缀
+    Returns:
+        list: 每组的用例 nodeid 列表，组内保持原有顺序
+    """
+    groups = groups or {}
+    units, unit_loads = {}, {}
+    for test_id in test_ids:
+        base_id, group = split_group(test_id)
+        key = groups.get(test_id) or group or test_id
+        units.setdefault(key, []).append(test_id)
+        unit_loads[key] = unit_loads.get(key, 0.0) + durations.get(base_id, default)
+
+    bins = max(1, bins)
+    assigned = [set() for _ in range(bins)]
+    loads = [0.0] * bins
+    for key in sorted(units, key=lambda k: (-unit_loads[k], k)):
+        index = loads.index(min(loads))
+        assigned[index].update(units[key])
+        loads[index] += unit_loads[key]
+    return [[test_id for test_id in test_ids if test_id in members] for members in assigned]
+
+
+class DurationHistory:
+    """用例耗时历史：每次运行后按指数滑动平均更新，供分片与负载均衡使用"""
+
+    def __init__(self, path: str, smoothing: float = 0.5):
+        """
+        Args:
+            path: 历史文件路径(JSON)
+            smoothing: 新耗时的权重(0-1)，越大越偏向最近一次运行
+        """
+        self.path = path
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取用例耗时历史失败，忽略: {str(e)}")
+            return {}
+
+    def durations(self) -> Dict[str, float]:
+        """返回 {nodeid: 平均耗时(秒)}"""
+        with self._lock:
+            return {test_id: entry["duration"] for test_id, entry in self._data.items()}
+
+    def default_duration(self) -> float:
+        """没有历史记录的用例的估计耗时：已知耗时的中位数"""
+        values = sorted(self.durations().values())
+        return values[len(values) // 2] if values else 1.0
+
+    def record(self, test_id: str, seconds: float):
+        """记录一次运行的耗时"""
+        with self._lock:
+            entry = self._data.get(test_id)
+            if entry is None:
+                self._data[test_id] = {"duration": round(seconds, 3), "runs": 1}
+            else:
+                entry["duration"] = round(self.smoothing * seconds + (1 - self.smoothing) * entry["duration"], 3)
+                entry["runs"] += 1
+
+    def save(self):
+        """写回历史文件（先写临时文件再替换，避免中途退出留下损坏的文件）"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def partition(self, test_ids: List[str], bins: int, groups: Optional[Dict[str, str]] = None) -> List[List[str]]:
+        """按历史耗时将用例划分为 bins 组，groups 中同名分组的用例分在一起"""
+        return lpt_partition(test_ids, bins, self.durations(), self.default_duration(), groups)
+
+    @staticmethod
+    def parse_shard(value: Optional[str]):
+        """
+        解析 "i/N" 形式的分片参数(i 从1开始)
+        Returns:
+            tuple: (i, N)，value 为空时返回None
+        Raises:
+            ValueError: 格式不正确
+        """
+        if not value:
+            return None
+        try:
+            index, total = (int(part) for part in value.split("/"))
+        except ValueError:
+            raise ValueError(f"分片参数格式应为 i/N，实际: {value}")
+        if total < 1 or not 1 <= index <= total:
+            raise ValueError(f"分片序号超出范围: {value}")
+        return index, total
@@ -0,0 +1,36 @@
+from xdist.scheduler import LoadScopeScheduling
+from .log_manager import logger
+from .test_durations import split_group
+
+
+class LptScheduling(LoadScopeScheduling):
+    """
+    按历史耗时分配用例的 xdist 调度器
+    收集完成后用 LPT 装箱把用例分成与 worker 数相同的组，每组作为一个 scope 整体发给一个 worker，
+    使各 worker 的预计总耗时尽量接近；带 "@分组" 后缀的用例(依赖链)作为整体装箱
+    """
+
+    def __init__(self, config, log=None, history=None):
+        """
+        Args:
+            history: DurationHistory 实例
+        """
+        super().__init__(config, log)
+        self.history = history
+        self._groups = {}
+
+    def _split_scope(self, nodeid: str) -> str:
+        if not self._groups:
+            self._build_groups()
+        return self._groups.get(nodeid, nodeid)
+
+    def _build_groups(self):
+        """对完整的收集结果做一次装箱"""
+        durations = self.history.durations()
+        default = self.history.default_duration()
+        groups = self.history.partition(self.collection, len(self.nodes))
+        for index, test_ids in enumerate(groups):
+            for test_id in test_ids:
+                self._groups[test_id] = f"lpt{index}"
+            total = sum(durations.get(split_group(test_id)[0], default) for test_id in test_ids)
+            logger.info(f"worker 分组 lpt{index}: {len(test_ids)} 个用例，预计耗时 {total:.1f} 秒")